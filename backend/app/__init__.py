@@ -1,11 +1,59 @@
 """
 FastAPI application factory and initialization
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
+from app.core.metrics import metrics_registry, MetricsMiddleware, CONTENT_TYPE
+from app.core.profiling import ProfiledRoute, ProfilingMiddleware
+from app.core.startup import startup_timeline, startup_steps, FirstRequestMiddleware
+from app.core.database import db_pool
+from app.core.migrations import apply_migrations
+from app.core.async_database import init_async_pool, close_async_pool
 from app.routes import api_router
-from app.services import load_ai_model
+from app.utils import json_safe
+from app.services import (
+    start_model_loading,
+    get_model_status,
+    stop_model_watcher,
+    start_ingest_buffer,
+    stop_ingest_buffer,
+    warm_latest_cache,
+    init_rollups,
+    start_live_feed,
+    stop_live_feed,
+    start_allocation_tracking,
+    stop_allocation_tracking
+)
+
+def _open_database_pool() -> None:
+    """Open the minimum number of pooled MySQL connections"""
+    try:
+        db_pool.open()
+        print(f"✓ Database pool opened ({settings.DB_POOL_MIN_SIZE}-{settings.DB_POOL_MAX_SIZE} connections)")
+    except Exception as e:
+        print(f"✗ Failed to open database pool: {e}")
+
+def _apply_migrations() -> None:
+    """Apply pending schema migrations if MIGRATIONS_ENABLED"""
+    if not settings.MIGRATIONS_ENABLED:
+        return
+    try:
+        apply_migrations()
+    except Exception as e:
+        print(f"✗ Failed to apply schema migrations: {e}")
+
+# Blocking database work done before requests are accepted, in this order
+DATABASE_STARTUP_STEPS = (
+    ("database_pool", _open_database_pool),
+    ("migrations", _apply_migrations),
+    ("rollups", init_rollups),
+    ("latest_cache", warm_latest_cache),
+)
 
 def create_app() -> FastAPI:
     """
@@ -79,22 +127,71 @@ AI-powered weather forecasting system using Machine Learning.
         allow_headers=settings.CORS_HEADERS,
     )
     
+    # Record time to the first served request
+    app.add_middleware(FirstRequestMiddleware)
+    
+    # Time every request (outermost, so the timings include the other middleware)
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
+    
+    # Profile requests on demand and a sample of prediction/ingest requests
+    # (outside the metrics, so storing a profile is not counted as request time)
+    if settings.PROFILING_ENABLED:
+        app.add_middleware(
+            ProfilingMiddleware,
+            directory=settings.PROFILING_DIR,
+            sample_rate=settings.PROFILING_SAMPLE_RATE,
+            sample_paths=tuple(settings.PROFILING_SAMPLE_PATHS),
+            max_per_minute=settings.PROFILING_SAMPLE_MAX_PER_MINUTE,
+            interval=settings.PROFILING_INTERVAL,
+            max_files=settings.PROFILING_MAX_FILES
+        )
+    
+    # Validation errors echo the rejected input, which may be NaN or
+    # Infinity (sensor readings) and would break the default JSON response
+    @app.exception_handler(RequestValidationError)
+    async def validation_exception_handler(request: Request, exc: RequestValidationError):
+        return JSONResponse(status_code=422, content=json_safe(jsonable_encoder({"detail": exc.errors()})))
+    
     # Include API routes
     app.include_router(api_router)
+    app.router.route_class = ProfiledRoute
     
-    # Startup event: Load AI model
+    # Startup event: Start loading the AI model and open resources
     @app.on_event("startup")
     async def startup_event():
-        """Load AI model on application startup"""
+        """Start the AI model load and open resources on application startup"""
         print("=" * 60)
         print(f"Starting {settings.API_TITLE} v{settings.API_VERSION}")
         print("=" * 60)
-        load_ai_model()
+        # Before the model load, so its allocations are traced
+        start_allocation_tracking()
+        start_model_loading()
+        # In worker threads, so the event loop (and the model loader's
+        # callbacks) keep running while MySQL answers
+        for name, step in DATABASE_STARTUP_STEPS:
+            await run_in_threadpool(startup_steps.run, name, step)
+        await init_async_pool()
+        start_ingest_buffer()
+        start_live_feed()
+        seconds = startup_timeline.mark("accepting_requests")
+        print(f"✓ Accepting requests {seconds:.2f}s after start")
         print("=" * 60)
         print(f"Server running on http://{settings.HOST}:{settings.PORT}")
         print(f"API Documentation: http://{settings.HOST}:{settings.PORT}/docs")
         print("=" * 60)
     
+    # Shutdown event: Close pooled connections
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        """Flush buffered readings and close database connections on application shutdown"""
+        stop_model_watcher()
+        stop_live_feed()
+        stop_ingest_buffer()
+        await close_async_pool()
+        db_pool.close()
+        stop_allocation_tracking()
+    
     # Root endpoint
     @app.get("/", tags=["Root"])
     def read_root():
@@ -116,4 +213,43 @@ AI-powered weather forecasting system using Machine Learning.
             "version": settings.API_VERSION
         }
     
+    # Liveness probe: the worker process is serving requests
+    @app.get("/health/live", tags=["Health"])
+    def liveness_check():
+        """Liveness probe (does not depend on the AI model)"""
+        return {
+            "status": "alive",
+            "version": settings.API_VERSION,
+            "uptime_seconds": startup_timeline.snapshot()["uptime"]
+        }
+    
+    # Readiness probe: the AI model is loaded and warmed up
+    @app.get("/health/ready", tags=["Health"])
+    def readiness_check():
+        """Readiness probe (503 until the AI model is loaded and warmed up and the startup steps finished)"""
+        model = get_model_status()
+        ready = model["state"] == "ready" and not startup_steps.running
+        return JSONResponse(
+            status_code=200 if ready else 503,
+            content={
+                "status": "ready" if ready else "not_ready",
+                "model": model,
+                "startup": startup_timeline.snapshot(),
+                "startup_steps": startup_steps.snapshot()
+            }
+        )
+    
+    # Database pool statistics
+    @app.get("/health/db-pool", tags=["Health"])
+    def db_pool_stats():
+        """Database connection pool statistics"""
+        return db_pool.stats()
+    
+    # Prometheus metrics of this worker
+    if settings.METRICS_ENABLED:
+        @app.get("/metrics", tags=["Health"], include_in_schema=False)
+        def metrics():
+            """Request and stage timing histograms in the Prometheus text format"""
+            return Response(metrics_registry.render(), media_type=CONTENT_TYPE)
+    
     return app
@@ -2,6 +2,6 @@
 Core package initialization
 """
 from app.core.config import settings
-from app.core.database import get_db_connection, get_db, get_cursor
+from app.core.database import get_db_connection, get_db, get_cursor, db_pool, PoolTimeout
 
-__all__ = ['settings', 'get_db_connection', 'get_db', 'get_cursor']
+__all__ = ['settings', 'get_db_connection', 'get_db', 'get_cursor', 'db_pool', 'PoolTimeout']
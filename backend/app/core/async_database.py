@@ -0,0 +1,102 @@
+"""
+Async database connection pool and utilities
+
+Uses aiomysql so that route handlers can query MySQL without blocking the
+event loop or occupying a threadpool worker. The pool is created in the
+application startup event; when aiomysql is not installed or the pool
+cannot be created, is_async_db_ready() returns False and the services
+fall back to the synchronous pool in a worker thread.
+"""
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Optional
+from app.core.config import settings
+from app.core.metrics import stage_timer
+
+try:
+    import aiomysql
+except ImportError:  # optional dependency
+    aiomysql = None
+
+# Global async connection pool
+async_pool: Optional["aiomysql.Pool"] = None
+
+# Same stages as the synchronous pool (see /metrics)
+_ACQUIRE_TIMER = stage_timer("db.acquire")
+_COMMIT_TIMER = stage_timer("db.commit")
+
+async def init_async_pool() -> bool:
+    """
+    Create the async connection pool
+    
+    Returns:
+        bool: True if the pool was created
+    """
+    global async_pool
+    
+    if not settings.DB_ASYNC_ENABLED:
+        return False
+    if aiomysql is None:
+        print("✗ aiomysql is not installed, async database layer disabled")
+        return False
+    
+    try:
+        async_pool = await aiomysql.create_pool(
+            host=settings.DB_HOST,
+            port=settings.DB_PORT,
+            user=settings.DB_USER,
+            password=settings.DB_PASSWORD,
+            db=settings.DB_NAME,
+            minsize=settings.ASYNC_DB_POOL_MIN_SIZE,
+            maxsize=settings.ASYNC_DB_POOL_MAX_SIZE,
+            pool_recycle=int(settings.DB_POOL_MAX_LIFETIME),
+            autocommit=False,
+        )
+        print(f"✓ Async database pool opened ({settings.ASYNC_DB_POOL_MIN_SIZE}-{settings.ASYNC_DB_POOL_MAX_SIZE} connections)")
+        return True
+    except Exception as e:
+        async_pool = None
+        print(f"✗ Failed to open async database pool: {e}")
+        return False
+
+async def close_async_pool() -> None:
+    """Close the async connection pool"""
+    global async_pool
+    
+    if async_pool is not None:
+        async_pool.close()
+        await async_pool.wait_closed()
+        async_pool = None
+
+def is_async_db_ready() -> bool:
+    """Check whether the async pool can be used"""
+    return async_pool is not None
+
+@asynccontextmanager
+async def get_async_cursor() -> AsyncGenerator:
+    """
+    Async context manager for database cursor.
+    Automatically commits and returns the connection to the pool.
+    
+    Usage:
+        async with get_async_cursor() as cursor:
+            await cursor.execute("SELECT * FROM users")
+            results = await cursor.fetchall()
+    """
+    if async_pool is None:
+        raise RuntimeError("Async database pool is not initialized")
+    
+    with _ACQUIRE_TIMER.time():
+        conn = await async_pool.acquire()
+    try:
+        cursor = await conn.cursor()
+        try:
+            yield cursor
+            with _COMMIT_TIMER.time():
+                await conn.commit()
+        except Exception as e:
+            await conn.rollback()
+            raise e
+        finally:
+            await cursor.close()
+    finally:
+        await async_pool.release(conn)
@@ -23,6 +23,44 @@ class Settings:
     DB_NAME: str = os.getenv("DB_NAME", "weather_app_bd")
     DB_PORT: int = int(os.getenv("DB_PORT", "3306"))
     
+    # Database Connection Pool Settings
+    DB_POOL_MIN_SIZE: int = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+    DB_POOL_MAX_SIZE: int = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "10"))  # wait for a free connection
+    DB_POOL_IDLE_TIMEOUT: float = float(os.getenv("DB_POOL_IDLE_TIMEOUT", "300"))
+    DB_POOL_MAX_LIFETIME: float = float(os.getenv("DB_POOL_MAX_LIFETIME", "3600"))
+    DB_POOL_PING_INTERVAL: float = float(os.getenv("DB_POOL_PING_INTERVAL", "0"))  # 0 = ping on every checkout
+    DB_ASYNC_ENABLED: bool = os.getenv("DB_ASYNC_ENABLED", "true").lower() == "true"  # aiomysql pool for routes
+    ASYNC_DB_POOL_MIN_SIZE: int = int(os.getenv("ASYNC_DB_POOL_MIN_SIZE", "1"))
+    ASYNC_DB_POOL_MAX_SIZE: int = int(os.getenv("ASYNC_DB_POOL_MAX_SIZE", "5"))  # on top of DB_POOL_MAX_SIZE
+    
+    # Sensor Ingestion Settings
+    WEATHER_DEFAULT_LOCATION: str = os.getenv("WEATHER_DEFAULT_LOCATION", "")  # /create location, empty = column default
+    INGEST_BULK_MAX_ROWS: int = int(os.getenv("INGEST_BULK_MAX_ROWS", "5000"))  # readings per bulk request
+    INGEST_WRITE_BEHIND: bool = os.getenv("INGEST_WRITE_BEHIND", "false").lower() == "true"  # ack /create before commit
+    INGEST_QUEUE_SIZE: int = int(os.getenv("INGEST_QUEUE_SIZE", "10000"))
+    INGEST_BATCH_SIZE: int = int(os.getenv("INGEST_BATCH_SIZE", "500"))
+    INGEST_FLUSH_INTERVAL: float = float(os.getenv("INGEST_FLUSH_INTERVAL", "1.0"))  # seconds
+    INGEST_PUT_TIMEOUT: float = float(os.getenv("INGEST_PUT_TIMEOUT", "0.5"))  # wait for room before 503
+    INGEST_MAX_ATTEMPTS: int = int(os.getenv("INGEST_MAX_ATTEMPTS", "3"))  # failed flushes before writing row by row
+    
+    # Latest Reading Cache Settings (0 history disables the cache, 0 max age never reloads)
+    LATEST_CACHE_HISTORY: int = int(os.getenv("LATEST_CACHE_HISTORY", "100"))  # readings kept per location
+    LATEST_CACHE_MAX_LOCATIONS: int = int(os.getenv("LATEST_CACHE_MAX_LOCATIONS", "1000"))
+    LATEST_CACHE_MAX_AGE: float = float(os.getenv("LATEST_CACHE_MAX_AGE", "60"))  # reload to see other writers
+    
+    # Live Feed Settings (/weather-data/stream, per worker process)
+    LIVE_FEED_QUEUE_SIZE: int = int(os.getenv("LIVE_FEED_QUEUE_SIZE", "100"))  # unsent readings before a client is dropped
+    LIVE_FEED_MAX_SUBSCRIBERS: int = int(os.getenv("LIVE_FEED_MAX_SUBSCRIBERS", "10000"))
+    LIVE_FEED_HEARTBEAT: float = float(os.getenv("LIVE_FEED_HEARTBEAT", "15"))  # seconds between keep-alive comments
+    
+    # Rollup Settings (minute/hour/day aggregates, see rollup_service.py)
+    ROLLUPS_ENABLED: bool = os.getenv("ROLLUPS_ENABLED", "true").lower() == "true"
+    ROLLUP_MAX_BUCKETS: int = int(os.getenv("ROLLUP_MAX_BUCKETS", "5000"))  # per /aggregate request
+    
+    # Export Settings (rows read from the server-side cursor per response chunk)
+    EXPORT_CHUNK_ROWS: int = int(os.getenv("EXPORT_CHUNK_ROWS", "1000"))
+    
     # Email Settings
     EMAIL_HOST: str = "smtp.gmail.com"
     EMAIL_PORT: int = 587
@@ -31,11 +69,13 @@ class Settings:
     
     # Security Settings
     OTP_EXPIRY_SECONDS: int = 300  # 5 minutes
+    # Token for admin endpoints (X-Admin-Token header); empty disables them
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
     
     # AI Model Settings
     _BASE_DIR: str = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
     _DEFAULT_MODEL_PATH: str = os.path.join(_BASE_DIR, "ml_models", "combined.joblib")
-
+    
     _model_path_env: Optional[str] = os.getenv("MODEL_PATH")
     if _model_path_env:
         MODEL_PATH: str = (
@@ -45,13 +85,65 @@ class Settings:
         )
     else:
         MODEL_PATH: str = _DEFAULT_MODEL_PATH
+    # Map model bundle arrays instead of reading them (shared between workers)
+    MODEL_MMAP: bool = os.getenv("MODEL_MMAP", "true").lower() == "true"
+    # Forest evaluator for joblib/split models: "sklearn", or "flat" (NumPy node arrays, see model_bundle.py)
+    INFERENCE_ENGINE: str = os.getenv("INFERENCE_ENGINE", "sklearn").lower()
+    # Load the model in a background thread so non-ML routes serve during startup
+    MODEL_BACKGROUND_LOAD: bool = os.getenv("MODEL_BACKGROUND_LOAD", "true").lower() == "true"
+    # Warm calls per representative request before a model serves (0 disables warm-up)
+    MODEL_WARMUP_ROUNDS: int = int(os.getenv("MODEL_WARMUP_ROUNDS", "3"))
+    # Loaded versions listed by /ai-prediction/model-info
+    MODEL_HISTORY_SIZE: int = int(os.getenv("MODEL_HISTORY_SIZE", "10"))
+    # Reload the model when the files at MODEL_PATH change (checked every interval seconds)
+    MODEL_WATCH_ENABLED: bool = os.getenv("MODEL_WATCH_ENABLED", "false").lower() == "true"
+    MODEL_WATCH_INTERVAL: float = float(os.getenv("MODEL_WATCH_INTERVAL", "10"))
+    
+    # Forecast Table Settings (precomputed predictions, see forecast_table.py)
+    FORECAST_TABLE_ENABLED: bool = os.getenv("FORECAST_TABLE_ENABLED", "false").lower() == "true"
+    FORECAST_TABLE_DAYS: int = int(os.getenv("FORECAST_TABLE_DAYS", "730"))
+    FORECAST_TABLE_START: Optional[str] = os.getenv("FORECAST_TABLE_START")  # YYYY-MM-DD, default today
+    
+    _forecast_table_env: Optional[str] = os.getenv("FORECAST_TABLE_PATH")
+    FORECAST_TABLE_PATH: Optional[str] = (
+        os.path.abspath(os.path.join(_BASE_DIR, _forecast_table_env))
+        if _forecast_table_env
+        else None
+    )
+    
+    # Prediction Cache Settings (0 entries disables the cache, 0 TTL never expires)
+    PREDICTION_CACHE_SIZE: int = int(os.getenv("PREDICTION_CACHE_SIZE", "1024"))
+    PREDICTION_CACHE_TTL_SECONDS: int = int(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "3600"))
+    
+    # Schema Migration Settings (SQL files applied at startup, see migrations.py)
+    MIGRATIONS_ENABLED: bool = os.getenv("MIGRATIONS_ENABLED", "true").lower() == "true"
+    MIGRATIONS_DIR: str = os.path.abspath(os.path.join(_BASE_DIR, os.getenv("MIGRATIONS_DIR", "migrations")))
+    
+    # Metrics Settings (request and stage timings at /metrics, see metrics.py)
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    
+    # Profiling Settings (X-Profile header with ADMIN_TOKEN, plus random samples; see profiling.py)
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILING_DIR: str = os.path.abspath(os.path.join(_BASE_DIR, os.getenv("PROFILING_DIR", "profiles")))
+    PROFILING_INTERVAL: float = float(os.getenv("PROFILING_INTERVAL", "0.001"))  # seconds between stack samples
+    PROFILING_SAMPLE_RATE: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))  # share of eligible requests
+    PROFILING_SAMPLE_PATHS: list = os.getenv(
+        "PROFILING_SAMPLE_PATHS", "/ai-prediction/,/weather-data/create,/weather-data/bulk"
+    ).split(",")
+    PROFILING_SAMPLE_MAX_PER_MINUTE: float = float(os.getenv("PROFILING_SAMPLE_MAX_PER_MINUTE", "6"))
+    PROFILING_MAX_FILES: int = int(os.getenv("PROFILING_MAX_FILES", "200"))  # stored on-demand profiles
+    
+    # Memory Settings (tracemalloc snapshots for /admin/memory, see memory.py)
+    MEMORY_TRACEMALLOC_FRAMES: int = int(os.getenv("MEMORY_TRACEMALLOC_FRAMES", "0"))  # frames per allocation, 0 disables
+    MEMORY_SNAPSHOT_INTERVAL: float = float(os.getenv("MEMORY_SNAPSHOT_INTERVAL", "300"))  # seconds
+    MEMORY_SNAPSHOT_HISTORY: int = int(os.getenv("MEMORY_SNAPSHOT_HISTORY", "12"))
     
     # CORS Settings
     CORS_ORIGINS: list = ["*"]
     CORS_CREDENTIALS: bool = True
     CORS_METHODS: list = ["GET", "POST", "PUT", "DELETE", "OPTIONS"]
     CORS_HEADERS: list = ["*"]
-
+    
     def get_db_config(self) -> dict:
         """Get database configuration as dictionary"""
         return {
@@ -1,54 +1,335 @@
 """
 Database connection and utilities
 """
+import threading
+import time
 import MySQLdb
+from collections import deque
 from contextlib import contextmanager
-from typing import Generator
+from typing import Callable, Generator
 from app.core.config import settings
+from app.core.metrics import metrics_registry, stage_timer, Gauge
+
+# Request stage timers (see /metrics)
+_ACQUIRE_TIMER = stage_timer("db.acquire")
+_CONNECT_TIMER = stage_timer("db.connect")
+_COMMIT_TIMER = stage_timer("db.commit")
 
 def get_db_connection():
     """
     Create a new database connection.
     Note: Connection should be closed after use to avoid stale connections.
+    Prefer get_db() / get_cursor(), which borrow connections from the pool.
     """
     return MySQLdb.connect(**settings.get_db_config())
 
+class PoolTimeout(Exception):
+    """Raised when no pooled connection becomes available in time"""
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of database connections
+    
+    Connections are health-checked (ping, reconnect on failure) when they
+    are checked out. Every checkout and release closes the idle connections
+    that have been idle (down to min_size) or alive for too long.
+    
+    Args:
+        factory: Callable creating a new connection
+        min_size: Connections kept open when idle
+        max_size: Maximum number of open connections
+        timeout: Seconds to wait for a free connection
+        idle_timeout: Seconds after which an idle connection is closed
+        max_lifetime: Seconds after which a connection is replaced
+        ping_interval: Only ping connections idle for at least this many seconds
+    """
+    
+    def __init__(
+        self,
+        factory: Callable,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 10.0,
+        idle_timeout: float = 300.0,
+        max_lifetime: float = 3600.0,
+        ping_interval: float = 0.0
+    ):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+        
+        self.factory = factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.ping_interval = ping_interval
+        
+        # Idle connections as (connection, last_used), most recently used last
+        self._idle: deque = deque()
+        self._created_at: dict = {}
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        
+        # Metrics
+        self.checkouts = 0
+        self.created = 0
+        self.recycled = 0
+        self.failed_pings = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+    
+    def open(self) -> None:
+        """Open connections until min_size connections are idle"""
+        with self._cond:
+            self._closed = False
+            missing = self.min_size - self._size
+            self._size += max(missing, 0)
+        
+        for _ in range(max(missing, 0)):
+            try:
+                conn = self._create()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+    
+    def _create(self):
+        with _CONNECT_TIMER.time():
+            conn = self.factory()
+        self._created_at[id(conn)] = time.monotonic()
+        self.created += 1
+        return conn
+    
+    def _close_connection(self, conn) -> None:
+        self._created_at.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+    
+    def _is_expired(self, conn, last_used: float, now: float) -> bool:
+        if self.idle_timeout and now - last_used > self.idle_timeout and self._size > self.min_size:
+            return True
+        created_at = self._created_at.get(id(conn), now)
+        return bool(self.max_lifetime) and now - created_at > self.max_lifetime
+    
+    def _reap_idle(self, now: float) -> None:
+        """Close expired idle connections, least recently used first (call with the lock held)"""
+        kept = deque()
+        while self._idle:
+            conn, last_used = self._idle.popleft()
+            if self._is_expired(conn, last_used, now):
+                self._size -= 1
+                self.recycled += 1
+                self._close_connection(conn)
+            else:
+                kept.append((conn, last_used))
+        self._idle = kept
+    
+    def acquire(self):
+        """
+        Check out a connection, waiting up to `timeout` seconds
+        
+        Returns:
+            Connection: A healthy database connection
+        
+        Raises:
+            PoolTimeout: If the pool stays exhausted for `timeout` seconds
+        """
+        started = time.monotonic()
+        deadline = started + self.timeout
+        conn = None
+        last_used = None
+        
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                
+                now = time.monotonic()
+                # Checkouts take the most recently used connection, so the
+                # ones at the left would otherwise never be closed
+                self._reap_idle(now)
+                while self._idle:
+                    candidate, candidate_last_used = self._idle.pop()
+                    if self._is_expired(candidate, candidate_last_used, now):
+                        self._size -= 1
+                        self.recycled += 1
+                        self._close_connection(candidate)
+                        continue
+                    conn, last_used = candidate, candidate_last_used
+                    break
+                
+                if conn is not None:
+                    break
+                
+                if self._size < self.max_size:
+                    # Reserve a slot and connect outside the lock
+                    self._size += 1
+                    break
+                
+                remaining = deadline - now
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(f"No database connection available after {self.timeout}s")
+                self._cond.wait(remaining)
+            
+            self._in_use += 1
+            wait = time.monotonic() - started
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+        
+        try:
+            if conn is None:
+                return self._create()
+            if time.monotonic() - last_used >= self.ping_interval:
+                try:
+                    conn.ping()
+                except Exception:
+                    # Stale connection: reconnect in place of it
+                    self.failed_pings += 1
+                    self._close_connection(conn)
+                    return self._create()
+            return conn
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+    
+    def release(self, conn, discard: bool = False) -> None:
+        """
+        Return a connection to the pool
+        
+        Args:
+            conn: Connection obtained from acquire()
+            discard: Close the connection instead of reusing it
+        """
+        with self._cond:
+            self._in_use -= 1
+            if discard or self._closed:
+                self._size -= 1
+                self._close_connection(conn)
+            else:
+                now = time.monotonic()
+                self._idle.append((conn, now))
+                self._reap_idle(now)
+            self._cond.notify()
+    
+    @contextmanager
+    def connection(self) -> Generator:
+        """Context manager that borrows a connection"""
+        with _ACQUIRE_TIMER.time():
+            conn = self.acquire()
+        discard = False
+        try:
+            yield conn
+        except (MySQLdb.OperationalError, MySQLdb.InterfaceError):
+            # Broken connections must not go back into the pool
+            discard = True
+            raise
+        finally:
+            self.release(conn, discard=discard)
+    
+    def close(self) -> None:
+        """Close idle connections and stop handing out new ones"""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._size -= 1
+                self._close_connection(conn)
+            self._cond.notify_all()
+    
+    def stats(self) -> dict:
+        """
+        Get pool metrics
+        
+        Returns:
+            dict: Pool size, usage and wait-time statistics
+        """
+        with self._cond:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._in_use,
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'checkouts': self.checkouts,
+                'created': self.created,
+                'recycled': self.recycled,
+                'failed_pings': self.failed_pings,
+                'timeouts': self.timeouts,
+                'avg_wait_ms': round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                'max_wait_ms': round(self.max_wait * 1000, 3),
+            }
+
+# Global connection pool
+db_pool = ConnectionPool(
+    get_db_connection,
+    min_size=settings.DB_POOL_MIN_SIZE,
+    max_size=settings.DB_POOL_MAX_SIZE,
+    timeout=settings.DB_POOL_TIMEOUT,
+    idle_timeout=settings.DB_POOL_IDLE_TIMEOUT,
+    max_lifetime=settings.DB_POOL_MAX_LIFETIME,
+    ping_interval=settings.DB_POOL_PING_INTERVAL
+)
+
+metrics_registry.register(Gauge(
+    "weather_api_db_pool_connections",
+    "Connections of the synchronous database pool by state",
+    "state",
+    lambda: {state: db_pool.stats()[state] for state in ('in_use', 'idle', 'size')}
+))
+
 @contextmanager
 def get_db() -> Generator:
     """
     Context manager for database connections.
-    Automatically closes connection after use.
+    Borrows a connection from the pool and returns it after use.
+    Uncommitted changes are rolled back before the connection is reused.
     
     Usage:
         with get_db() as conn:
             cursor = conn.cursor()
             # ... use cursor
+            conn.commit()
     """
-    conn = get_db_connection()
-    try:
-        yield conn
-    finally:
-        conn.close()
+    with db_pool.connection() as conn:
+        try:
+            yield conn
+        finally:
+            conn.rollback()
 
 @contextmanager
 def get_cursor() -> Generator:
     """
     Context manager for database cursor.
-    Automatically commits and closes connection.
+    Automatically commits and returns the connection to the pool.
     
     Usage:
         with get_cursor() as cursor:
             cursor.execute("SELECT * FROM users")
             results = cursor.fetchall()
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
-        yield cursor
-        conn.commit()
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        cursor.close()
-        conn.close()
+    with db_pool.connection() as conn:
+        cursor = conn.cursor()
+        try:
+            yield cursor
+            with _COMMIT_TIMER.time():
+                conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            cursor.close()
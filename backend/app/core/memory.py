@@ -0,0 +1,368 @@
+"""
+Memory accounting for capacity planning
+
+- read_process_memory(): RSS, PSS and USS of this worker (Linux)
+- deep_size(): bytes held by an object graph, counting numpy buffers and
+  the node arrays of sklearn trees (sys.getsizeof() sees neither).
+  Memory-mapped arrays are reported apart, as they live in the page
+  cache shared by all workers.
+- forest_memory(): trees, nodes and bytes of a sklearn forest or a
+  FlatForest, optionally per tree
+- measure_imports(): RSS and time added by importing heavy modules, in a
+  fresh interpreter
+- AllocationTracker: tracemalloc snapshots taken in the background, with
+  the top allocators of each and the growth since the first one
+"""
+import asyncio
+import json
+import mmap
+import subprocess
+import sys
+import threading
+import tracemalloc
+import types
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+SMAPS_ROLLUP = "/proc/self/smaps_rollup"
+
+# Imported by the app in this order; sklearn and pandas dominate a worker's RSS
+HEAVY_MODULES = (
+    "numpy",
+    "pandas",
+    "joblib",
+    "sklearn.ensemble",
+    "pydantic",
+    "fastapi",
+    "uvicorn",
+    "MySQLdb",
+    "aiomysql",
+)
+
+# Not followed by deep_size(): shared by everything or not data
+_OPAQUE_TYPES = (
+    type,
+    types.ModuleType,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodType,
+    threading.Thread,
+    asyncio.AbstractEventLoop,
+)
+
+# Run with `python -c` so the app's own imports do not skew the baseline
+_IMPORT_PROBE = """
+import importlib, json, os, resource, sys, time
+
+def rss():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+results = [{"module": "python", "rss_bytes": rss(), "seconds": 0.0}]
+for name in sys.argv[1:]:
+    before, started = rss(), time.perf_counter()
+    try:
+        importlib.import_module(name)
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    results.append({
+        "module": name,
+        "rss_bytes": rss() - before,
+        "seconds": round(time.perf_counter() - started, 4),
+        "error": error,
+    })
+print(json.dumps(results))
+"""
+
+def read_process_memory() -> Dict[str, int]:
+    """
+    Get RSS, PSS and USS of the current process in kB
+    
+    PSS splits shared pages (memory-mapped model bundles, forked code)
+    between the processes sharing them, USS counts private pages only.
+    
+    Returns:
+        dict: rss, pss and uss (empty without /proc/self/smaps_rollup)
+    """
+    values = {}
+    try:
+        with open(SMAPS_ROLLUP, "r") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    values[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        return {}
+    return {
+        'rss': values.get('Rss', 0),
+        'pss': values.get('Pss', 0),
+        'uss': values.get('Private_Clean', 0) + values.get('Private_Dirty', 0),
+    }
+
+def _tree_bytes(tree) -> int:
+    """Node and value arrays of a sklearn Tree (allocated for `capacity` nodes)"""
+    node_dtype = sys.modules["sklearn.tree._tree"].NODE_DTYPE
+    value_bytes = tree.n_outputs * tree.max_n_classes * np.dtype(np.float64).itemsize
+    return tree.capacity * (node_dtype.itemsize + value_bytes)
+
+def _is_sklearn_tree(obj) -> bool:
+    cls = type(obj)
+    return cls.__name__ == "Tree" and cls.__module__ == "sklearn.tree._tree"
+
+def deep_size(obj, seen: Optional[set] = None) -> Tuple[int, int]:
+    """
+    Bytes held by an object and everything it references
+    
+    Objects already in `seen` are not counted again, so passing the same
+    set to several calls splits shared objects between them (the first
+    caller counts them).
+    
+    Args:
+        obj: Root of the object graph
+        seen: ids of objects already counted
+    
+    Returns:
+        tuple: (heap bytes, memory-mapped bytes)
+    """
+    if seen is None:
+        seen = set()
+    heap = mapped = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        heap += sys.getsizeof(current, 0)
+        
+        if isinstance(current, _OPAQUE_TYPES):
+            continue
+        if isinstance(current, np.ndarray):
+            # getsizeof() includes the buffer of an array owning its data;
+            # views and memmaps point to what holds theirs
+            if current.base is not None:
+                stack.append(current.base)
+            continue
+        if isinstance(current, mmap.mmap):
+            mapped += len(current)
+            continue
+        if _is_sklearn_tree(current):
+            heap += _tree_bytes(current)
+            continue
+        if isinstance(current, (str, bytes, bytearray, int, float, bool)) or current is None:
+            continue
+        
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        if hasattr(current, "__dict__"):
+            stack.append(current.__dict__)
+        for name in getattr(type(current), "__slots__", ()):
+            value = getattr(current, name, None)
+            if value is not None:
+                stack.append(value)
+    return heap, mapped
+
+def forest_memory(forest, trees: bool = False, seen: Optional[set] = None) -> dict:
+    """
+    Size of a sklearn forest or FlatForest
+    
+    Args:
+        forest: Fitted RandomForest* or FlatForest
+        trees: Include one entry per tree
+        seen: ids of objects already counted (see deep_size())
+    
+    Returns:
+        dict: type, trees, nodes, bytes, mapped_bytes (and per-tree entries)
+    """
+    heap, mapped = deep_size(forest, seen)
+    report = {'type': type(forest).__name__}
+    per_tree = []
+    if hasattr(forest, "roots"):
+        # FlatForest: the trees are consecutive runs of the node arrays
+        node_bytes = sum(
+            getattr(forest, name)[:1].nbytes for name in ("feature", "threshold", "left", "right", "value")
+        )
+        ends = [*forest.roots[1:].tolist(), len(forest.feature)]
+        for root, end in zip(forest.roots.tolist(), ends):
+            per_tree.append({'nodes': end - root, 'bytes': (end - root) * node_bytes})
+    else:
+        for estimator in getattr(forest, "estimators_", []):
+            tree = estimator.tree_
+            per_tree.append({
+                'nodes': int(tree.node_count),
+                'depth': int(tree.max_depth),
+                'bytes': _tree_bytes(tree),
+            })
+    report.update({
+        'trees': len(per_tree),
+        'nodes': sum(entry['nodes'] for entry in per_tree),
+        'bytes': heap,
+        'mapped_bytes': mapped,
+    })
+    if trees:
+        report['per_tree'] = per_tree
+    return report
+
+def measure_imports(modules: Iterable[str] = HEAVY_MODULES, timeout: float = 120) -> List[dict]:
+    """
+    RSS and time added by importing modules one after another
+    
+    Runs a fresh interpreter, so each module is charged only for what the
+    ones before it did not import yet (pandas after numpy excludes numpy).
+    
+    Args:
+        modules: Modules in import order
+        timeout: Seconds to wait for the interpreter
+    
+    Returns:
+        list: module, rss_bytes, seconds, error; the first entry is the bare interpreter
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", _IMPORT_PROBE, *modules],
+        capture_output=True, text=True, timeout=timeout, check=True
+    ).stdout
+    return json.loads(output)
+
+def loaded_modules(modules: Iterable[str] = HEAVY_MODULES) -> Dict[str, bool]:
+    """Which of the modules this process has imported"""
+    return {name: name in sys.modules for name in modules}
+
+def _format_frame(frame: tracemalloc.Frame) -> str:
+    return f"{frame.filename}:{frame.lineno}"
+
+class AllocationTracker:
+    """
+    Takes tracemalloc snapshots every `interval` seconds from a background thread
+    
+    Tracing makes every allocation slower and costs memory per traced
+    block (more with more frames), so it is meant to be switched on for a
+    while on one worker.
+    
+    Args:
+        frames: Stack frames stored per allocation
+        interval: Seconds between two snapshots
+        history: Snapshot summaries kept
+        top: Allocators listed per snapshot
+    """
+    
+    def __init__(self, frames: int = 1, interval: float = 300, history: int = 12, top: int = 20):
+        self.frames = frames
+        self.interval = interval
+        self.history = history
+        self.top = top
+        self._snapshots: List[dict] = []
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._last: Optional[tracemalloc.Snapshot] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+    
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    @property
+    def _key_type(self) -> str:
+        return "traceback" if self.frames > 1 else "lineno"
+    
+    def start(self) -> None:
+        """Start tracing and the snapshot thread"""
+        if self.running:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="allocation-tracker", daemon=True)
+        self._thread.start()
+        print(f"✓ Tracing allocations ({self.frames} frames, snapshot every {self.interval:g}s)")
+    
+    def stop(self) -> None:
+        """Stop the snapshot thread and tracing"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        with self._lock:
+            self._baseline = self._last = None
+    
+    def _run(self) -> None:
+        while True:
+            try:
+                self.take_snapshot()
+            except Exception as e:
+                print(f"✗ Failed to take an allocation snapshot: {e}")
+            if self._stop.wait(self.interval):
+                return
+    
+    def take_snapshot(self) -> dict:
+        """
+        Take a snapshot now and add its summary to the history
+        
+        Returns:
+            dict: time, traced and peak bytes and the top allocators
+        """
+        # Imports are kept: their code objects are part of a worker's memory
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        summary = {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'traced_bytes': current,
+            'peak_bytes': peak,
+            'top': [
+                {'where': self._where(stat.traceback), 'bytes': stat.size, 'blocks': stat.count}
+                for stat in snapshot.statistics(self._key_type)[:self.top]
+            ],
+        }
+        with self._lock:
+            if self._baseline is None:
+                self._baseline = snapshot
+            self._last = snapshot
+            self._snapshots.append(summary)
+            del self._snapshots[:-self.history]
+        return summary
+    
+    def _where(self, traceback: tracemalloc.Traceback) -> str:
+        # Outermost frame first
+        return " > ".join(_format_frame(frame) for frame in traceback)
+    
+    def report(self, top: Optional[int] = None) -> dict:
+        """
+        Snapshot history and the allocators that grew most since the first snapshot
+        
+        Args:
+            top: Allocators listed (default: self.top)
+        
+        Returns:
+            dict: tracing, frames, interval, snapshots (oldest first) and growth
+        """
+        top = top or self.top
+        with self._lock:
+            snapshots = [dict(entry, top=entry['top'][:top]) for entry in self._snapshots]
+            baseline, last = self._baseline, self._last
+        growth = []
+        if baseline is not None and last is not None and last is not baseline:
+            growth = [
+                {'where': self._where(stat.traceback), 'size_diff': stat.size_diff, 'blocks_diff': stat.count_diff}
+                for stat in last.compare_to(baseline, self._key_type)[:top]
+                if stat.size_diff
+            ]
+        return {
+            'tracing': tracemalloc.is_tracing(),
+            'frames': self.frames,
+            'interval': self.interval,
+            'snapshots': snapshots,
+            'growth': growth,
+        }
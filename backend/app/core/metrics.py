@@ -0,0 +1,269 @@
+"""
+Request and stage timing metrics in the Prometheus text format
+
+Histograms are kept in process (one set per worker) and rendered at
+/metrics. Observing a duration costs a perf_counter() call, a bisect and
+an uncontended lock, about a microsecond, so the timers stay on in
+production.
+
+Stage timers wrap the steps of a request (feature matrix, regressor,
+classifier, pool checkout, commit, ...). They only record blocks run
+while MetricsMiddleware serves a request, so warm-up passes, forecast
+table builds and background threads do not skew the histograms. The
+middleware also records the time from the end of the last stage to the
+start of the response, which is response validation, JSON encoding and
+rendering.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Seconds, from pool checkouts and single tree walks to slow requests
+DURATION_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+class _RequestClock:
+    """End of the last stage timed while serving the current request"""
+    __slots__ = ('last_stage_end',)
+    
+    def __init__(self):
+        self.last_stage_end: Optional[float] = None
+
+# Set by MetricsMiddleware; copied into the worker threads of sync routes
+_request_clock: ContextVar[Optional[_RequestClock]] = ContextVar("metrics_request_clock", default=None)
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class Timer:
+    """Context manager observing the time spent in its block during a request"""
+    __slots__ = ('series', 'started')
+    
+    def __init__(self, series: "HistogramSeries"):
+        self.series = series
+    
+    def __enter__(self) -> "Timer":
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        ended = time.perf_counter()
+        clock = _request_clock.get()
+        if clock is not None:
+            self.series.observe(ended - self.started)
+            clock.last_stage_end = ended
+
+class HistogramSeries:
+    """Bucket counts of one label combination"""
+    __slots__ = ('buckets', 'counts', 'sum', '_lock')
+    
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        # One count per bucket plus +Inf, not cumulative
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+    
+    def time(self) -> Timer:
+        """Time a block: `with series.time(): ...`"""
+        return Timer(self)
+    
+    def snapshot(self) -> Tuple[List[int], float]:
+        with self._lock:
+            return list(self.counts), self.sum
+
+class Histogram:
+    """
+    Histogram with a fixed set of label names
+    
+    Args:
+        name: Metric name
+        documentation: HELP text
+        labelnames: Names of the labels
+        buckets: Upper bounds of the buckets, ascending
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DURATION_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], HistogramSeries] = {}
+        self._lock = threading.Lock()
+    
+    def labels(self, *values: str) -> HistogramSeries:
+        """Get the series of one label combination (keep a reference on hot paths)"""
+        series = self._series.get(values)
+        if series is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                series = self._series.setdefault(values, HistogramSeries(self.buckets))
+        return series
+    
+    def observe(self, value: float, *labels: str) -> None:
+        self.labels(*labels).observe(value)
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for values, series in sorted(self._series.items()):
+            counts, total = series.snapshot()
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                bucket_labels = _format_labels(self.labelnames, values, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class Gauge:
+    """
+    Gauge read from a callback when the metrics are rendered
+    
+    Args:
+        name: Metric name
+        documentation: HELP text
+        labelname: Name of the label distinguishing the callback's keys
+        read: Callable returning {label value: number}
+    """
+    
+    def __init__(self, name: str, documentation: str, labelname: str, read: Callable[[], Dict[str, float]]):
+        self.name = name
+        self.documentation = documentation
+        self.labelname = labelname
+        self.read = read
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        for value, number in self.read().items():
+            lines.append(f"{self.name}{_format_labels((self.labelname,), (value,))} {_format_value(number)}")
+        return lines
+
+class MetricsRegistry:
+    """Metrics rendered together at /metrics"""
+    
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+    
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+    
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames))
+    
+    def render(self) -> str:
+        """
+        Render every metric
+        
+        Returns:
+            str: Prometheus text exposition format (version 0.0.4)
+        """
+        lines = []
+        for metric in self._metrics.values():
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                # A failing gauge callback must not hide the other metrics
+                print(f"✗ Failed to render metric {metric.name}: {e}")
+        return "\n".join(lines) + "\n"
+
+metrics_registry = MetricsRegistry()
+
+STAGE_SECONDS = metrics_registry.histogram(
+    "weather_api_stage_seconds",
+    "Time spent in one stage of a request",
+    ("stage",)
+)
+REQUEST_SECONDS = metrics_registry.histogram(
+    "weather_api_request_seconds",
+    "HTTP request duration until the response is sent",
+    ("method", "route", "status")
+)
+RESPONSE_SECONDS = metrics_registry.histogram(
+    "weather_api_response_seconds",
+    "Time from the end of the last timed stage to the response start (validation, encoding, rendering)",
+    ("route",)
+)
+
+def stage_timer(stage: str) -> HistogramSeries:
+    """
+    Get the timer series of a request stage
+    
+    Usage:
+        _FEATURES = stage_timer("prediction.features")
+        with _FEATURES.time():
+            ...
+    """
+    return STAGE_SECONDS.labels(stage)
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request
+    
+    Requests are labelled with the route template (/weather-data/last,
+    not the URL), so the number of series stays bounded; paths without
+    a route are counted as "unmatched".
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        clock = _RequestClock()
+        token = _request_clock.set(clock)
+        status = 500
+        response_started: Optional[float] = None
+        
+        async def send_with_timing(message):
+            nonlocal status, response_started
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_started = time.perf_counter()
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_clock.reset(token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_SECONDS.observe(time.perf_counter() - started, scope["method"], route, str(status))
+            if response_started is not None and clock.last_stage_end is not None:
+                RESPONSE_SECONDS.observe(max(response_started - clock.last_stage_end, 0.0), route)
@@ -0,0 +1,191 @@
+"""
+Versioned schema migrations
+
+Migrations are plain SQL files in backend/migrations named
+`<version>_<name>.sql` (e.g. `0001_weather_data_location_indexes.sql`).
+Applied versions are recorded in the schema_migrations table, so every
+file runs once per database, in version order. A MySQL named lock keeps
+several workers starting at the same time from applying them twice.
+"""
+import hashlib
+import os
+import re
+import MySQLdb
+from typing import List, NamedTuple, Dict
+from app.core.config import settings
+from app.core.database import db_pool
+
+MIGRATION_FILE_PATTERN = re.compile(r"^(\d+)_(\w+)\.sql$")
+MIGRATION_LOCK_NAME = "weather_app_schema_migrations"
+MIGRATION_LOCK_TIMEOUT = 60
+
+# MySQL errors meaning the change is already in place (e.g. an index that
+# was created by hand): 1050 table exists, 1060 duplicate column, 1061 duplicate key
+ALREADY_APPLIED_ERRORS = (1050, 1060, 1061)
+
+CREATE_MIGRATIONS_TABLE_QUERY = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INT UNSIGNED NOT NULL PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        checksum CHAR(64) NOT NULL,
+        applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+"""
+SELECT_APPLIED_QUERY = "SELECT version, checksum FROM schema_migrations"
+INSERT_APPLIED_QUERY = "INSERT INTO schema_migrations(version, name, checksum) VALUES (%s, %s, %s)"
+
+class Migration(NamedTuple):
+    """A migration file"""
+    version: int
+    name: str
+    statements: List[str]
+    checksum: str
+
+def split_statements(sql: str) -> List[str]:
+    """
+    Split an SQL script into statements
+    
+    Full-line `--` comments are dropped and statements end with `;` at
+    the end of a line.
+    """
+    statements = []
+    current = []
+    for line in sql.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("--"):
+            continue
+        current.append(line)
+        if stripped.endswith(";"):
+            statements.append("\n".join(current).rstrip().rstrip(";"))
+            current = []
+    if current:
+        statements.append("\n".join(current))
+    return statements
+
+def load_migrations(directory: str = None) -> List[Migration]:
+    """
+    Read the migration files of a directory
+    
+    Args:
+        directory: Directory holding the .sql files (default: MIGRATIONS_DIR)
+    
+    Returns:
+        list: Migrations sorted by version
+    
+    Raises:
+        ValueError: If two files share a version
+    """
+    directory = directory or settings.MIGRATIONS_DIR
+    if not os.path.isdir(directory):
+        return []
+    
+    migrations: Dict[int, Migration] = {}
+    for filename in sorted(os.listdir(directory)):
+        match = MIGRATION_FILE_PATTERN.match(filename)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise ValueError(f"Duplicate migration version {version}: {filename}")
+        
+        with open(os.path.join(directory, filename), "r", encoding="utf-8") as f:
+            sql = f.read()
+        migrations[version] = Migration(
+            version=version,
+            name=match.group(2),
+            statements=split_statements(sql),
+            checksum=hashlib.sha256(sql.encode("utf-8")).hexdigest(),
+        )
+    return [migrations[version] for version in sorted(migrations)]
+
+def _execute_statement(cursor, statement: str) -> None:
+    """Execute one migration statement, tolerating changes already in place"""
+    try:
+        cursor.execute(statement)
+    except MySQLdb.OperationalError as e:
+        if e.args and e.args[0] in ALREADY_APPLIED_ERRORS:
+            print(f"  already present, skipped: {e.args[1] if len(e.args) > 1 else e}")
+            return
+        raise
+
+def apply_migrations(directory: str = None) -> List[int]:
+    """
+    Apply every migration that has not been applied yet
+    
+    Args:
+        directory: Directory holding the .sql files (default: MIGRATIONS_DIR)
+    
+    Returns:
+        list: Versions applied by this call
+    
+    Raises:
+        RuntimeError: If the migration lock cannot be acquired
+    """
+    migrations = load_migrations(directory)
+    applied_now = []
+    
+    with db_pool.connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT GET_LOCK(%s, %s)", (MIGRATION_LOCK_NAME, MIGRATION_LOCK_TIMEOUT))
+            if cursor.fetchone()[0] != 1:
+                raise RuntimeError("Could not acquire the schema migration lock")
+            
+            try:
+                cursor.execute(CREATE_MIGRATIONS_TABLE_QUERY)
+                cursor.execute(SELECT_APPLIED_QUERY)
+                applied = {row[0]: row[1] for row in cursor.fetchall()}
+                
+                for migration in migrations:
+                    label = f"{migration.version:04d}_{migration.name}"
+                    if migration.version in applied:
+                        if applied[migration.version] != migration.checksum:
+                            print(f"✗ Migration {label} was changed after it was applied")
+                        continue
+                    
+                    # DDL commits implicitly in MySQL, so each migration is
+                    # recorded right after its statements succeed
+                    for statement in migration.statements:
+                        _execute_statement(cursor, statement)
+                    cursor.execute(INSERT_APPLIED_QUERY, (migration.version, migration.name, migration.checksum))
+                    conn.commit()
+                    applied_now.append(migration.version)
+                    print(f"✓ Applied migration {label}")
+            finally:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK_NAME,))
+                cursor.fetchall()
+        finally:
+            cursor.close()
+    
+    return applied_now
+
+def get_migration_status(directory: str = None) -> List[dict]:
+    """
+    Get the applied/pending state of every migration file
+    
+    Args:
+        directory: Directory holding the .sql files (default: MIGRATIONS_DIR)
+    
+    Returns:
+        list: One dict per migration with version, name and applied flag
+    """
+    migrations = load_migrations(directory)
+    
+    with db_pool.connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(CREATE_MIGRATIONS_TABLE_QUERY)
+            cursor.execute(SELECT_APPLIED_QUERY)
+            applied = {row[0]: row[1] for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+    
+    return [
+        {
+            'version': migration.version,
+            'name': migration.name,
+            'applied': migration.version in applied,
+            'modified': migration.version in applied and applied[migration.version] != migration.checksum,
+        }
+        for migration in migrations
+    ]
@@ -0,0 +1,362 @@
+"""
+On-demand request profiling
+
+With PROFILING_ENABLED, ProfilingMiddleware profiles:
+
+- a request carrying `X-Profile: sample` or `X-Profile: trace` and a
+  valid `X-Admin-Token`. Its profile is stored in PROFILING_DIR under
+  the name returned in the `X-Profile-Id` response header (download it
+  from /admin/profiles/<name>).
+- a random PROFILING_SAMPLE_RATE of the requests to PROFILING_SAMPLE_PATHS
+  (prediction and ingest), at most PROFILING_SAMPLE_MAX_PER_MINUTE. Their
+  stacks are appended to one file per route and hour.
+
+`sample` records collapsed stacks (`frame;frame;frame count`, the input
+of flamegraph.pl and speedscope) with a background thread reading the
+stacks of the request's threads every PROFILING_INTERVAL seconds.
+`trace` runs cProfile (every call, much slower) and stores a pstats file
+for snakeviz or `python -m pstats`.
+
+A request runs on the event loop thread and, for sync routes, in a
+threadpool worker. ProfiledRoute makes the profile follow sync endpoints
+into their worker. The event loop is shared: its samples (and cProfile
+calls) include other requests served meanwhile, and idle loop samples
+(waiting in select) are dropped. Only one request is profiled at a time
+per worker.
+"""
+import asyncio
+import cProfile
+import functools
+import os
+import pstats
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, List, Optional
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+
+PROFILE_MODES = ("sample", "trace")
+PROFILE_EXTENSIONS = {
+    "sample": ".collapsed",
+    "trace": ".prof",
+}
+# Names handed out in X-Profile-Id (and accepted by /admin/profiles/<name>)
+PROFILE_NAME = re.compile(r"^[\w.-]+\.(collapsed|prof)$")
+
+# Event loop samples with this innermost module are idle waits
+_IDLE_MODULES = ("selectors",)
+
+_active_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("active_profile", default=None)
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{code.co_qualname}"
+
+def collapse_stack(frame, root: str) -> str:
+    """
+    Collapsed representation of a stack, outermost frame first
+    
+    Args:
+        frame: Innermost frame
+        root: Name of the stack's root (the thread)
+    
+    Returns:
+        str: 'root;module:function;...'
+    """
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    names.append(root)
+    return ";".join(reversed(names)).replace(" ", "_")
+
+class StackSampler:
+    """
+    Samples the stacks of registered threads from a background thread
+    
+    Args:
+        interval: Seconds between two samples
+    """
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._threads: Dict[int, str] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+    
+    def add_thread(self, ident: int, root: str) -> None:
+        self._threads[ident] = root
+    
+    def remove_thread(self, ident: int) -> None:
+        self._threads.pop(ident, None)
+    
+    def start(self) -> None:
+        self._thread.start()
+    
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+    
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for ident, root in list(self._threads.items()):
+                frame = frames.get(ident)
+                if frame is None or frame.f_globals.get('__name__') in _IDLE_MODULES:
+                    continue
+                self.stacks[collapse_stack(frame, root)] += 1
+                self.samples += 1
+
+class RequestProfile:
+    """
+    Profile of one request across the event loop and worker threads
+    
+    Args:
+        mode: 'sample' or 'trace'
+        interval: Sampling interval in seconds (sample mode)
+    """
+    
+    def __init__(self, mode: str, interval: float):
+        self.mode = mode
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+        self._sampler = StackSampler(interval) if mode == "sample" else None
+        self._tracers: List[cProfile.Profile] = []
+        self._loop_tracer: Optional[cProfile.Profile] = None
+    
+    def start(self) -> None:
+        """Start profiling the calling (event loop) thread"""
+        if self._sampler is not None:
+            self._sampler.add_thread(threading.get_ident(), "event-loop")
+            self._sampler.start()
+        else:
+            self._loop_tracer = cProfile.Profile()
+            self._tracers.append(self._loop_tracer)
+            self._loop_tracer.enable()
+    
+    def stop(self) -> None:
+        if self._sampler is not None:
+            self._sampler.stop()
+        else:
+            self._loop_tracer.disable()
+        self.seconds = time.perf_counter() - self.started
+    
+    @contextmanager
+    def thread(self):
+        """Also profile the calling worker thread while the block runs"""
+        if self._sampler is not None:
+            ident = threading.get_ident()
+            self._sampler.add_thread(ident, "worker")
+            try:
+                yield
+            finally:
+                self._sampler.remove_thread(ident)
+        else:
+            tracer = cProfile.Profile()
+            self._tracers.append(tracer)
+            tracer.enable()
+            try:
+                yield
+            finally:
+                tracer.disable()
+    
+    def write(self, path: str, append: bool = False) -> None:
+        """Write collapsed stacks (sample) or pstats (trace) to path"""
+        if self._sampler is not None:
+            with open(path, "a" if append else "w", encoding="utf-8") as f:
+                for stack, count in self._sampler.stacks.items():
+                    f.write(f"{stack} {count}\n")
+        else:
+            stats = pstats.Stats(self._tracers[0])
+            for tracer in self._tracers[1:]:
+                stats.add(tracer)
+            stats.dump_stats(path)
+
+def _follow_into_thread(endpoint):
+    @functools.wraps(endpoint)
+    def endpoint_with_profile(*args, **kwargs):
+        profile = _active_profile.get()
+        if profile is None:
+            return endpoint(*args, **kwargs)
+        with profile.thread():
+            return endpoint(*args, **kwargs)
+    endpoint_with_profile.follows_profile = True
+    return endpoint_with_profile
+
+class ProfiledRoute(APIRoute):
+    """
+    APIRoute whose sync endpoints carry a request profile into the
+    threadpool worker that runs them
+    
+    Without PROFILING_ENABLED the endpoint is left unwrapped.
+    """
+    
+    def __init__(self, path: str, endpoint, **kwargs):
+        # include_router() builds the routes again from the wrapped endpoint
+        if (settings.PROFILING_ENABLED and not asyncio.iscoroutinefunction(endpoint)
+                and not getattr(endpoint, 'follows_profile', False)):
+            endpoint = _follow_into_thread(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling admin-requested and randomly sampled requests
+    
+    Args:
+        app: ASGI application
+        directory: Where profiles are stored
+        sample_rate: Share of the requests to sample_paths to profile
+        sample_paths: Path prefixes eligible for random sampling
+        max_per_minute: Random samples per minute at most
+        interval: Sampling interval in seconds
+        max_files: Stored admin profiles kept (oldest are deleted)
+    """
+    
+    def __init__(
+        self,
+        app,
+        directory: str,
+        sample_rate: float = 0.0,
+        sample_paths: tuple = (),
+        max_per_minute: float = 6.0,
+        interval: float = 0.001,
+        max_files: int = 200
+    ):
+        self.app = app
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.sample_paths = tuple(sample_paths)
+        self.max_per_minute = max_per_minute
+        self.interval = interval
+        self.max_files = max_files
+        
+        # Token bucket of random samples, refilled at max_per_minute
+        self._tokens = 1.0
+        self._refilled = time.monotonic()
+        # One profiled request at a time
+        self._busy = False
+    
+    def _requested_mode(self, scope) -> Optional[str]:
+        headers = dict(scope["headers"])
+        mode = headers.get(b"x-profile")
+        if mode is None or not settings.ADMIN_TOKEN:
+            return None
+        token = headers.get(b"x-admin-token", b"")
+        if not secrets.compare_digest(token, settings.ADMIN_TOKEN.encode("utf-8")):
+            return None
+        mode = mode.decode("latin-1").strip().lower()
+        return mode if mode in PROFILE_MODES else None
+    
+    def _take_sample(self, path: str) -> bool:
+        if not self.sample_rate or not path.startswith(self.sample_paths):
+            return False
+        if random.random() >= self.sample_rate:
+            return False
+        now = time.monotonic()
+        self._tokens = min(1.0, self._tokens + (now - self._refilled) * self.max_per_minute / 60)
+        self._refilled = now
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        mode = self._requested_mode(scope)
+        requested = mode is not None
+        if not requested and self._take_sample(scope["path"]):
+            mode = "sample"
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+        if self._busy:
+            await self.app(scope, receive, send)
+            return
+        
+        self._busy = True
+        profile = RequestProfile(mode, self.interval)
+        name = None
+        if requested:
+            slug = re.sub(r"[^\w]+", "-", scope["path"]).strip("-") or "root"
+            name = (f"{datetime.now():%Y%m%d-%H%M%S}-{slug}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+                    f"{PROFILE_EXTENSIONS[mode]}")
+        
+        async def send_with_profile_id(message):
+            if name and message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = [*message["headers"], (b"x-profile-id", name.encode("latin-1"))]
+            await send(message)
+        
+        token = _active_profile.set(profile)
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profile.stop()
+            _active_profile.reset(token)
+            self._busy = False
+            route = getattr(scope.get("route"), "path", scope["path"])
+            try:
+                await run_in_threadpool(self._store, profile, name, route)
+            except Exception as e:
+                print(f"✗ Failed to store request profile: {e}")
+    
+    def _store(self, profile: RequestProfile, name: Optional[str], route: str) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        if name is None:
+            # Random samples of a route are collected per hour
+            slug = re.sub(r"[^\w]+", "-", route).strip("-") or "root"
+            profile.write(os.path.join(self.directory, f"sampled-{slug}-{datetime.now():%Y%m%d-%H}.collapsed"), append=True)
+            return
+        
+        profile.write(os.path.join(self.directory, name))
+        print(f"✓ Profiled {route} ({profile.mode}, {profile.seconds * 1000:.1f} ms) -> {name}")
+        self._prune()
+    
+    def _prune(self) -> None:
+        """Delete the oldest admin profiles beyond max_files"""
+        # Names start with the timestamp
+        names = sorted(n for n in os.listdir(self.directory) if PROFILE_NAME.match(n) and not n.startswith("sampled-"))
+        for old in names[:max(len(names) - self.max_files, 0)]:
+            os.remove(os.path.join(self.directory, old))
+
+def list_profiles(directory: str, limit: int = 100) -> List[dict]:
+    """
+    Stored profiles, newest first
+    
+    Args:
+        directory: PROFILING_DIR
+        limit: Entries at most
+    
+    Returns:
+        list: name, size and modification time per profile
+    """
+    if not os.path.isdir(directory):
+        return []
+    entries = []
+    for name in os.listdir(directory):
+        if not PROFILE_NAME.match(name):
+            continue
+        stat = os.stat(os.path.join(directory, name))
+        entries.append({
+            'name': name,
+            'bytes': stat.st_size,
+            'modified': datetime.fromtimestamp(stat.st_mtime).isoformat(timespec='seconds'),
+        })
+    entries.sort(key=lambda entry: entry['modified'], reverse=True)
+    return entries[:limit]
@@ -0,0 +1,124 @@
+"""
+Startup timeline of the worker process
+
+Records, relative to the import of the app package, when the worker
+began accepting requests, when its first request was served and when
+the AI model became ready, so slow cold starts show up in the log and
+in /health/ready, and the progress of the blocking startup steps.
+"""
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+class StartupTimeline:
+    """Seconds from process start to named startup events"""
+    
+    def __init__(self):
+        self.started = time.monotonic()
+        self._events: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def mark(self, event: str) -> float:
+        """
+        Record an event (only its first occurrence is kept)
+        
+        Returns:
+            float: Seconds from start to the event
+        """
+        with self._lock:
+            return self._events.setdefault(event, time.monotonic() - self.started)
+    
+    def elapsed(self, event: str) -> Optional[float]:
+        """Seconds from start to an event, None if it did not happen yet"""
+        return self._events.get(event)
+    
+    def snapshot(self) -> dict:
+        """
+        Get the recorded events
+        
+        Returns:
+            dict: Event name -> seconds from start, plus the uptime
+        """
+        with self._lock:
+            events = {name: round(seconds, 3) for name, seconds in self._events.items()}
+        events['uptime'] = round(time.monotonic() - self.started, 3)
+        return events
+
+startup_timeline = StartupTimeline()
+
+class StartupSteps:
+    """
+    Progress of the blocking startup steps (database pool, migrations, ...)
+    
+    The steps run in worker threads so they do not block the event loop;
+    their state is reported by /health/ready.
+    """
+    
+    def __init__(self):
+        self._steps: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+    
+    def run(self, name: str, step: Callable[[], object]) -> bool:
+        """
+        Run a step, recording its state and duration
+        
+        Steps report their own errors; an exception they let through is
+        printed and recorded, and startup carries on.
+        
+        Returns:
+            bool: False if the step raised
+        """
+        with self._lock:
+            self._steps[name] = {'state': 'running', 'seconds': None}
+        started = time.monotonic()
+        try:
+            step()
+            state = 'done'
+        except Exception as e:
+            print(f"✗ Startup step {name} failed: {e}")
+            state = 'failed'
+        with self._lock:
+            self._steps[name] = {'state': state, 'seconds': round(time.monotonic() - started, 3)}
+        return state == 'done'
+    
+    @property
+    def running(self) -> bool:
+        """Whether a step is still running"""
+        with self._lock:
+            return any(step['state'] == 'running' for step in self._steps.values())
+    
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        Get the recorded steps
+        
+        Returns:
+            dict: Step name -> 'state' ('running', 'done' or 'failed') and 'seconds'
+        """
+        with self._lock:
+            return {name: dict(step) for name, step in self._steps.items()}
+
+startup_steps = StartupSteps()
+
+class FirstRequestMiddleware:
+    """
+    ASGI middleware recording when the first HTTP request was served
+    
+    After the first request it only checks a flag, so it adds no
+    measurable cost to later requests.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+        self._seen = False
+    
+    async def __call__(self, scope, receive, send):
+        if self._seen or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        self._seen = True
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            seconds = startup_timeline.mark("first_request")
+            print(f"✓ First request ({scope['path']}) served {seconds:.2f}s after start")
@@ -5,9 +5,12 @@ from app.models.schemas import (
     UserCreate, UserLogin, UserUpdate, UserResponse,
     OTPRequest, OTPResponse,
     WeatherDataCreate, WeatherDataResponse,
+    WeatherReading, BulkRowStatus, BulkWeatherDataResponse,
+    AggregateBucket, AggregateResponse,
     HourlyPredictionRequest, DailyPredictionRequest,
+    HourlyBatchItem, DailyBatchItem, BatchPredictionRequest,
     HourlyPredictionData, DailyPredictionData,
-    PredictionResponse, ModelInfoResponse,
+    PredictionResponse, BatchPredictionResponse, ModelInfoResponse,
     StatusResponse, MessageResponse
 )
 
@@ -15,8 +18,11 @@ __all__ = [
     'UserCreate', 'UserLogin', 'UserUpdate', 'UserResponse',
     'OTPRequest', 'OTPResponse',
     'WeatherDataCreate', 'WeatherDataResponse',
+    'WeatherReading', 'BulkRowStatus', 'BulkWeatherDataResponse',
+    'AggregateBucket', 'AggregateResponse',
     'HourlyPredictionRequest', 'DailyPredictionRequest',
+    'HourlyBatchItem', 'DailyBatchItem', 'BatchPredictionRequest',
     'HourlyPredictionData', 'DailyPredictionData',
-    'PredictionResponse', 'ModelInfoResponse',
+    'PredictionResponse', 'BatchPredictionResponse', 'ModelInfoResponse',
     'StatusResponse', 'MessageResponse'
 ]
@@ -45,12 +45,56 @@ class OTPResponse(BaseModel):
 # ============== Weather Data Models ==============
 class WeatherDataCreate(BaseModel):
     """Weather data creation model"""
+    # NaN and Infinity cannot be stored (MySQL rejects them), so such a
+    # reading must fail on its own instead of failing the INSERT of a batch
+    model_config = {"allow_inf_nan": False}
+    
     temp: Optional[float] = 0.0
     humidity: Optional[float] = 0.0
     isRaining: Optional[int] = 0
     lightIntensity: Optional[float] = 0.0
     windSpeed: Optional[float] = 0.0
     pressure: Optional[float] = 0.0
+    location: Optional[str] = Field(
+        default=None, min_length=1, max_length=30,
+        description="Station location (defaults to WEATHER_DEFAULT_LOCATION, else the weather_data column default)"
+    )
+
+class WeatherReading(WeatherDataCreate):
+    """Single sensor reading inside a bulk upload"""
+    createAt: Optional[datetime] = Field(default=None, description="Measurement time (defaults to the time of the upload)")
+
+class BulkRowStatus(BaseModel):
+    """Outcome of one reading in a bulk upload"""
+    index: int
+    status: int
+    message: str
+
+class BulkWeatherDataResponse(BaseModel):
+    """Bulk weather data upload response"""
+    status: int
+    message: str
+    inserted: int
+    rejected: int
+    results: List[BulkRowStatus]
+
+class AggregateBucket(BaseModel):
+    """Aggregate of one metric over one time bucket"""
+    bucket: str
+    count: int
+    avg: Optional[float] = None
+    min: float
+    max: float
+
+class AggregateResponse(BaseModel):
+    """Bucketed aggregate response"""
+    status: int
+    location: str
+    metric: str
+    resolution: str
+    start: str
+    end: str
+    data: List[AggregateBucket]
 
 class WeatherDataResponse(BaseModel):
     """Weather data response model"""
@@ -101,6 +145,33 @@ class DailyPredictionRequest(BaseModel):
     year: int = Field(..., ge=2000, description="Year (e.g., 2025)")
     num_days: int = Field(default=3, ge=1, le=30, description="Number of days to predict (1-30)")
 
+class HourlyBatchItem(HourlyPredictionRequest):
+    """Hourly prediction request inside a batch"""
+    location: Optional[str] = Field(default=None, description="Optional label echoed back in the result")
+
+class DailyBatchItem(DailyPredictionRequest):
+    """Daily prediction request inside a batch"""
+    location: Optional[str] = Field(default=None, description="Optional label echoed back in the result")
+
+class BatchPredictionRequest(BaseModel):
+    """Request model untuk prediksi cuaca banyak lokasi/rentang sekaligus"""
+    model_config = {
+        "json_schema_extra": {
+            "examples": [{
+                "hourly": [
+                    {"location": "Gazipur", "day": 8, "month": 12, "year": 2025, "hour": 0, "num_hours": 48},
+                    {"location": "Dhaka", "day": 8, "month": 12, "year": 2025, "hour": 10, "num_hours": 24}
+                ],
+                "daily": [
+                    {"location": "Gazipur", "day": 8, "month": 12, "year": 2025, "num_days": 7}
+                ]
+            }]
+        }
+    }
+    
+    hourly: List[HourlyBatchItem] = Field(default_factory=list, max_length=100)
+    daily: List[DailyBatchItem] = Field(default_factory=list, max_length=100)
+
 class HourlyPredictionData(BaseModel):
     """Single hourly prediction data"""
     datetime: str
@@ -131,6 +202,16 @@ class PredictionResponse(BaseModel):
     model_version: str
     data: List[dict]
 
+class BatchPredictionResponse(BaseModel):
+    """Batch prediction response"""
+    model_config = {"protected_namespaces": ()}
+    
+    status: int
+    message: str
+    model_version: str
+    hourly: List[dict]
+    daily: List[dict]
+
 class ModelInfoResponse(BaseModel):
     """AI Model information response"""
     model_config = {"protected_namespaces": ()}
@@ -143,6 +224,11 @@ class ModelInfoResponse(BaseModel):
     hourly_targets: Optional[List[str]] = None
     daily_features: Optional[List[str]] = None
     daily_targets: Optional[List[str]] = None
+    model_id: Optional[str] = None
+    layout: Optional[str] = None
+    engine: Optional[str] = None
+    loaded_at: Optional[str] = None
+    history: Optional[List[dict]] = None
 
 # ============== Generic Response Models ==============
 class StatusResponse(BaseModel):
@@ -2,7 +2,7 @@
 Routes package initialization
 """
 from fastapi import APIRouter
-from app.routes import auth, weather, prediction
+from app.routes import auth, weather, historical, prediction, admin
 
 # Create main API router
 api_router = APIRouter()
@@ -10,6 +10,8 @@ api_router = APIRouter()
 # Include all route modules
 api_router.include_router(auth.router)
 api_router.include_router(weather.router)
+api_router.include_router(historical.router)
 api_router.include_router(prediction.router)
+api_router.include_router(admin.router)
 
 __all__ = ['api_router']
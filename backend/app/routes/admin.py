@@ -0,0 +1,68 @@
+"""
+Admin routes for diagnosing a running worker
+"""
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+from app.core.config import settings
+from app.core.profiling import PROFILE_NAME, ProfiledRoute, list_profiles
+from app.services import get_memory_report
+from app.utils import require_admin_token
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin_token)],
+    route_class=ProfiledRoute
+)
+
+@router.get("/profiles")
+def get_profiles(limit: int = Query(default=100, ge=1, le=1000)):
+    """
+    🔬 List Stored Request Profiles
+    
+    Profiles of requests sent with `X-Profile: sample` or `X-Profile: trace`
+    (named in their `X-Profile-Id` response header) and the hourly files of
+    randomly sampled requests (`sampled-*`), newest first. Needs
+    PROFILING_ENABLED and the `X-Admin-Token` header.
+    """
+    return {
+        'status': 200,
+        'enabled': settings.PROFILING_ENABLED,
+        'profiles': list_profiles(settings.PROFILING_DIR, limit),
+    }
+
+@router.get("/profiles/{name}")
+def get_profile(name: str):
+    """
+    📥 Download a Request Profile
+    
+    `.collapsed` files hold collapsed stacks (flamegraph.pl, speedscope),
+    `.prof` files cProfile statistics (snakeviz, `python -m pstats`).
+    """
+    path = os.path.join(settings.PROFILING_DIR, name)
+    if not PROFILE_NAME.match(name) or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    media_type = "text/plain" if name.endswith(".collapsed") else "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=name)
+
+@router.get("/memory")
+def get_memory(
+    trees: bool = Query(default=False, description="Include every tree of every forest"),
+    imports: bool = Query(default=False, description="Measure heavy imports in a fresh interpreter (slow)"),
+    top: int = Query(default=20, ge=1, le=200, description="Allocators listed per snapshot"),
+    snapshot: bool = Query(default=False, description="Take a tracemalloc snapshot now")
+):
+    """
+    🧮 Memory of This Worker
+    
+    - `process_kb`: RSS, PSS (shared pages split between workers) and USS
+    - `model`: bytes of each forest, label encoder and forecast table of the
+      current model; `mapped_bytes` live in the page cache shared by workers
+    - `caches`: prediction cache, latest readings, ingest queue, live feed, OTPs
+    - `modules`: which heavy modules this worker imported (`imports=true`
+      measures what each of them costs)
+    - `allocations`: tracemalloc snapshots, top allocators and growth since
+      the first snapshot (needs MEMORY_TRACEMALLOC_FRAMES)
+    """
+    return get_memory_report(trees=trees, imports=imports, top=top, snapshot=snapshot)
@@ -2,19 +2,20 @@
 Authentication and user management routes
 """
 from fastapi import APIRouter, HTTPException
+from app.core.profiling import ProfiledRoute
 from app.models import (
     UserCreate, UserLogin, UserUpdate, UserResponse,
     OTPRequest, OTPResponse, StatusResponse, MessageResponse
 )
 from app.services import (
     generate_and_send_otp,
-    create_user,
-    authenticate_user,
-    get_user_info,
-    reset_password
+    create_user_async,
+    authenticate_user_async,
+    get_user_info_async,
+    reset_password_async
 )
 
-router = APIRouter(prefix="/auth", tags=["Authentication"])
+router = APIRouter(prefix="/auth", tags=["Authentication"], route_class=ProfiledRoute)
 
 @router.post("/generate-otp", response_model=OTPResponse)
 async def generate_otp_endpoint(request: OTPRequest):
@@ -22,27 +23,27 @@ async def generate_otp_endpoint(request: OTPRequest):
     return await generate_and_send_otp(request.email)
 
 @router.post("/register", response_model=StatusResponse)
-def register_user(user: UserCreate):
+async def register_user(user: UserCreate):
     """Register a new user with OTP verification"""
-    return create_user(user)
+    return await create_user_async(user)
 
 @router.post("/login", response_model=MessageResponse)
 async def login(credentials: UserLogin):
     """Authenticate user with username and password"""
-    return authenticate_user(credentials)
+    return await authenticate_user_async(credentials)
 
 @router.get("/user-info", response_model=UserResponse)
-def get_user(username: str):
+async def get_user(username: str):
     """Get user information by username"""
-    user_info = get_user_info(username)
+    user_info = await get_user_info_async(username)
     if not user_info:
         raise HTTPException(status_code=404, detail="User not found")
     return user_info
 
 @router.post("/forgot-password", response_model=StatusResponse)
-def forgot_password(user_update: UserUpdate):
+async def forgot_password(user_update: UserUpdate):
     """Reset password using OTP verification"""
-    return reset_password(user_update)
+    return await reset_password_async(user_update)
 
 @router.options("/")
 async def options_auth():
@@ -0,0 +1,24 @@
+"""
+Historical dataset routes
+"""
+from fastapi import APIRouter, Query
+from datetime import date
+from typing import Literal, Optional
+from app.core.profiling import ProfiledRoute
+from app.services import export_historical_data, export_response
+
+router = APIRouter(prefix="/historical", tags=["Weather Data"], route_class=ProfiledRoute)
+
+@router.get("/export")
+def export_historical(
+    format: Literal["ndjson", "csv"] = Query(default="ndjson"),
+    start: Optional[date] = Query(default=None, alias="from"),
+    end: Optional[date] = Query(default=None, alias="to"),
+):
+    """
+    Download the historical (training) dataset as NDJSON or CSV
+    
+    Rows are streamed from a server-side cursor in id order. `from` and
+    `to` are inclusive dates (YYYY-MM-DD).
+    """
+    return export_response(export_historical_data(format, start, end), "historical_dataset")
@@ -1,23 +1,34 @@
 """
 AI prediction routes for weather forecasting
 """
-from fastapi import APIRouter
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Query
+from app.core.profiling import ProfiledRoute
 from app.models import (
     HourlyPredictionRequest,
     DailyPredictionRequest,
+    BatchPredictionRequest,
     PredictionResponse,
+    BatchPredictionResponse,
     ModelInfoResponse
 )
 from app.services import (
     predict_hourly_weather,
     predict_daily_weather,
-    get_model_info
+    predict_batch_weather,
+    get_model_info,
+    get_prediction_cache_stats,
+    reload_ai_model
 )
+from app.utils import FastJSONResponse, require_admin_token
 
-router = APIRouter(prefix="/ai-prediction", tags=["AI Prediction"])
+router = APIRouter(prefix="/ai-prediction", tags=["AI Prediction"], route_class=ProfiledRoute)
 
 @router.post("/hourly", response_model=PredictionResponse)
-def predict_hourly(request: HourlyPredictionRequest):
+def predict_hourly(
+    request: HourlyPredictionRequest,
+    layout: Literal["rows", "columnar"] = Query(default="rows")
+):
     """
     🌤️ Predict Hourly Weather Using AI Model
     
@@ -36,6 +47,7 @@ def predict_hourly(request: HourlyPredictionRequest):
     - `year`: Year (e.g., 2025)
     - `hour`: Starting hour (0-23)
     - `num_hours`: Number of hours to predict (1-168)
+    - `layout` (query): `rows` (default) or `columnar`
     
     **Example Request:**
     ```json
@@ -67,11 +79,35 @@ def predict_hourly(request: HourlyPredictionRequest):
         ]
     }
     ```
+    
+    **Columnar Response (`?layout=columnar`):**
+    ```json
+    {
+        "status": 200,
+        "message": "Hourly prediction successful",
+        "model_version": "v4_combined",
+        "layout": "columnar",
+        "start": "2025-12-08T10:00:00",
+        "step_seconds": 3600,
+        "count": 24,
+        "columns": {
+            "conditions": ["Partially cloudy", "..."],
+            "temp": [28.5, "..."],
+            "humidity": [75.2, "..."]
+        }
+    }
+    ```
     """
-    return predict_hourly_weather(request)
+    result = predict_hourly_weather(request, layout)
+    if layout == "columnar":
+        return FastJSONResponse(result)
+    return result
 
 @router.post("/daily", response_model=PredictionResponse)
-def predict_daily(request: DailyPredictionRequest):
+def predict_daily(
+    request: DailyPredictionRequest,
+    layout: Literal["rows", "columnar"] = Query(default="rows")
+):
     """
     🌅 Predict Daily Weather Using AI Model
     
@@ -89,6 +125,7 @@ def predict_daily(request: DailyPredictionRequest):
     - `month`: Month (1-12)
     - `year`: Year (e.g., 2025)
     - `num_days`: Number of days to predict (1-30)
+    - `layout` (query): `rows` (default) or `columnar`
     
     **Example Request:**
     ```json
@@ -121,7 +158,61 @@ def predict_daily(request: DailyPredictionRequest):
     }
     ```
     """
-    return predict_daily_weather(request)
+    result = predict_daily_weather(request, layout)
+    if layout == "columnar":
+        return FastJSONResponse(result)
+    return result
+
+@router.post("/batch", response_model=BatchPredictionResponse)
+def predict_batch(
+    request: BatchPredictionRequest,
+    layout: Literal["rows", "columnar"] = Query(default="rows")
+):
+    """
+    📦 Predict Weather for Many Locations and Date Ranges
+    
+    Accepts lists of hourly and daily prediction requests and answers
+    them in one round-trip. Overlapping date ranges are deduplicated and
+    each forest runs at most once for the whole batch.
+    
+    **Request Parameters:**
+    - `hourly`: List of hourly requests (max 100), each with an optional `location`
+    - `daily`: List of daily requests (max 100), each with an optional `location`
+    - `layout` (query): `rows` (default) or `columnar`
+    
+    **Example Request:**
+    ```json
+    {
+        "hourly": [
+            {"location": "Gazipur", "day": 8, "month": 12, "year": 2025, "hour": 0, "num_hours": 48},
+            {"location": "Dhaka", "day": 8, "month": 12, "year": 2025, "hour": 10, "num_hours": 24}
+        ],
+        "daily": [
+            {"location": "Gazipur", "day": 8, "month": 12, "year": 2025, "num_days": 7}
+        ]
+    }
+    ```
+    
+    **Example Response:**
+    ```json
+    {
+        "status": 200,
+        "message": "Batch prediction successful",
+        "model_version": "v4_combined",
+        "hourly": [
+            {"location": "Gazipur", "data": [...]},
+            {"location": "Dhaka", "data": [...]}
+        ],
+        "daily": [
+            {"location": "Gazipur", "data": [...]}
+        ]
+    }
+    ```
+    """
+    result = predict_batch_weather(request, layout)
+    if layout == "columnar":
+        return FastJSONResponse(result)
+    return result
 
 @router.get("/model-info", response_model=ModelInfoResponse)
 def model_info():
@@ -138,6 +229,7 @@ def model_info():
     - 📉 Target variables for hourly predictions
     - 📊 Feature names for daily predictions
     - 🎯 Target variables for daily predictions
+    - 🔁 Model id, layout and load time, plus the history of loaded versions
     
     **Example Response:**
     ```json
@@ -149,7 +241,11 @@ def model_info():
         "hourly_features": ["day", "month", "year", "hour"],
         "hourly_targets": ["temp", "humidity", "windspeed", "pressure", "conditions"],
         "daily_features": ["day", "month", "year"],
-        "daily_targets": ["tempmax", "tempmin", "temp", "humidity", "windspeed", "pressure", "conditions"]
+        "daily_targets": ["tempmax", "tempmin", "temp", "humidity", "windspeed", "pressure", "conditions"],
+        "model_id": "v4_combined_random_forest@2024-11-15#3f2a9c1e",
+        "layout": "combined",
+        "loaded_at": "2025-01-10T08:00:00",
+        "history": [{"model_id": "v4_combined_random_forest@2024-11-15#3f2a9c1e", "active": true, "...": "..."}]
     }
     ```
     
@@ -159,3 +255,36 @@ def model_info():
     - Understand input/output structure for predictions
     """
     return get_model_info()
+
+@router.get("/cache-stats")
+def cache_stats():
+    """
+    📦 Get Prediction Cache Statistics
+    
+    Returns the precomputed forecast table windows and the hit/miss
+    counters of the in-process prediction cache.
+    """
+    return get_prediction_cache_stats()
+
+@router.post("/reload", dependencies=[Depends(require_admin_token)])
+def reload_model(path: Optional[str] = Query(default=None)):
+    """
+    🔁 Reload the AI Model Without a Restart
+    
+    Loads a model, checks it with a smoke test prediction and swaps it in
+    atomically. Requests already running finish on the model they started
+    with; the old model is freed afterwards. If loading or validation
+    fails, the current model stays active.
+    
+    Needs the `X-Admin-Token` header (ADMIN_TOKEN).
+    
+    **Query Parameters:**
+    - `path` (optional): Model file or directory inside the directory of
+      MODEL_PATH, relative to the backend directory (default: MODEL_PATH).
+      A combined joblib package, a directory of split
+      `<kind>_regressor` / `<kind>_classifier` files, or a model bundle.
+    
+    Only reloads the worker that serves the request; set
+    MODEL_WATCH_ENABLED to reload every worker when the files change.
+    """
+    return reload_ai_model(path)
@@ -1,51 +1,147 @@
 """
 Weather data management routes
 """
-from fastapi import APIRouter, Query
-from typing import List
-from app.models import WeatherDataCreate, WeatherDataResponse, StatusResponse
+from fastapi import APIRouter, Query, Body
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from datetime import datetime
+from typing import List, Any, Literal, Optional
+from app.core.config import settings
+from app.core.profiling import ProfiledRoute
+from app.models import (
+    WeatherDataCreate, WeatherDataResponse, StatusResponse,
+    BulkWeatherDataResponse, AggregateResponse
+)
 from app.services import (
-    get_last_weather_data,
-    get_line_chart_data,
-    create_weather_data
+    export_weather_data,
+    export_response,
+    get_last_weather_data_async,
+    get_line_chart_data_async,
+    create_weather_data_async,
+    create_weather_data_bulk_async,
+    get_ingest_stats,
+    get_latest_cache_stats,
+    get_live_feed_stats,
+    stream_weather_data,
+    get_aggregate_async
 )
 
-router = APIRouter(prefix="/weather-data", tags=["Weather Data"])
+router = APIRouter(prefix="/weather-data", tags=["Weather Data"], route_class=ProfiledRoute)
 
 @router.get("/last", response_model=WeatherDataResponse)
-def get_last_data(location: str = Query(default="Gazipur")):
+async def get_last_data(location: str = Query(default="Gazipur")):
     """Get the most recent weather data for a location"""
-    data = get_last_weather_data(location)
+    data = await get_last_weather_data_async(location)
     if not data:
         return {}
     return data
 
 @router.get("/line-chart", response_model=List[float])
-def get_chart_data(location: str = Query(default="Gazipur"), limit: int = Query(default=10)):
+async def get_chart_data(location: str = Query(default="Gazipur"), limit: int = Query(default=10)):
     """Get wind speed data for line chart"""
-    return get_line_chart_data(location, limit)
+    return await get_line_chart_data_async(location, limit)
 
 @router.get("/create", response_model=StatusResponse)
-def create_data(
+async def create_data(
     temp: float = Query(default=0.0),
     humidity: float = Query(default=0.0),
     isRaining: int = Query(default=0),
     lightIntensity: float = Query(default=0.0),
     windSpeed: float = Query(default=0.0),
     pressure: float = Query(default=0.0),
+    location: Optional[str] = Query(default=None),
 ):
     """Create new weather data record (legacy endpoint using GET)"""
-    data = WeatherDataCreate(
-        temp=temp,
-        humidity=humidity,
-        isRaining=isRaining,
-        lightIntensity=lightIntensity,
-        windSpeed=windSpeed,
-        pressure=pressure
-    )
-    return create_weather_data(data)
+    try:
+        data = WeatherDataCreate(
+            temp=temp,
+            humidity=humidity,
+            isRaining=isRaining,
+            lightIntensity=lightIntensity,
+            windSpeed=windSpeed,
+            pressure=pressure,
+            location=location
+        )
+    except ValidationError as e:
+        # ?temp=nan parses as a float; answer 422 like the POST route
+        raise RequestValidationError([{**error, 'loc': ('query', *error['loc'])} for error in e.errors()])
+    return await create_weather_data_async(data)
 
 @router.post("/create", response_model=StatusResponse)
-def create_data_post(data: WeatherDataCreate):
+async def create_data_post(data: WeatherDataCreate):
     """Create new weather data record (recommended POST method)"""
-    return create_weather_data(data)
+    return await create_weather_data_async(data)
+
+@router.post("/bulk", response_model=BulkWeatherDataResponse)
+async def create_data_bulk(
+    readings: List[Any] = Body(..., min_length=1, max_length=settings.INGEST_BULK_MAX_ROWS),
+    on_error: Literal["skip", "reject"] = Query(default="skip"),
+):
+    """
+    Create many weather data records in one request
+    
+    The body is a JSON array of readings, each with its own location and
+    createAt. Invalid readings are skipped (on_error=skip) or make the
+    whole batch fail (on_error=reject); the response has a status per reading.
+    """
+    return await create_weather_data_bulk_async(readings, on_error)
+
+@router.get("/aggregate", response_model=AggregateResponse)
+async def get_aggregate_data(
+    location: str = Query(default="Gazipur"),
+    metric: Literal["temp", "humidity", "isRaining", "lightIntensity", "windSpeed", "airPressure"] = Query(default="temp"),
+    resolution: Literal["minute", "hour", "day"] = Query(default="hour"),
+    start: Optional[datetime] = Query(default=None, alias="from"),
+    end: Optional[datetime] = Query(default=None, alias="to"),
+):
+    """
+    Get count/avg/min/max of a metric per minute, hour or day
+    
+    Served from the rollup tables, so the cost depends on the number of
+    buckets in the range, not on the number of raw readings. `to`
+    defaults to now and `from` to 6 hours, 7 days or 90 days before it.
+    """
+    return await get_aggregate_async(location, metric, resolution, start, end)
+
+@router.get("/export")
+def export_data(
+    format: Literal["ndjson", "csv"] = Query(default="ndjson"),
+    location: Optional[str] = Query(default=None),
+    start: Optional[datetime] = Query(default=None, alias="from"),
+    end: Optional[datetime] = Query(default=None, alias="to"),
+):
+    """
+    Download raw weather data as NDJSON or CSV
+    
+    Rows are streamed from a server-side cursor in id order, so any
+    number of rows can be exported. Filters: `location`, and `createAt`
+    from `from` (inclusive) to `to` (exclusive).
+    """
+    return export_response(export_weather_data(format, location, start, end), "weather_data")
+
+@router.get("/stream")
+async def stream_data(location: str = Query(default="Gazipur")):
+    """
+    Live feed of new readings for a location (Server-Sent Events)
+    
+    Every reading committed by this server is pushed as an `event: reading`
+    with the same fields as /last plus `location` and `createAt` (`id` is
+    null for bulk and write-behind inserts). Clients that fall too far
+    behind get `event: dropped` and should reconnect.
+    """
+    return stream_weather_data(location)
+
+@router.get("/stream-stats")
+def live_feed_stats():
+    """Live feed subscriber count and delivery counters"""
+    return get_live_feed_stats()
+
+@router.get("/cache-stats")
+def latest_cache_stats():
+    """Latest reading cache hit rate and staleness"""
+    return get_latest_cache_stats()
+
+@router.get("/ingest-stats")
+def ingest_stats():
+    """Write-behind ingestion queue depth, flush counters and latency"""
+    return get_ingest_stats()
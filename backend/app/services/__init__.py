@@ -6,18 +6,59 @@ from app.services.auth_service import (
     create_user,
     authenticate_user,
     get_user_info,
-    reset_password
+    reset_password,
+    create_user_async,
+    authenticate_user_async,
+    get_user_info_async,
+    reset_password_async
 )
 from app.services.weather_service import (
     get_last_weather_data,
     get_line_chart_data,
-    create_weather_data
+    create_weather_data,
+    get_last_weather_data_async,
+    get_line_chart_data_async,
+    create_weather_data_async,
+    create_weather_data_bulk,
+    create_weather_data_bulk_async,
+    start_ingest_buffer,
+    stop_ingest_buffer,
+    get_ingest_stats,
+    warm_latest_cache,
+    get_latest_cache_stats,
+    start_live_feed,
+    stop_live_feed,
+    get_live_feed_stats,
+    stream_weather_data
+)
+from app.services.rollup_service import (
+    init_rollups,
+    get_aggregate,
+    get_aggregate_async,
+    rebuild_rollups
+)
+from app.services.export_service import (
+    export_weather_data,
+    export_historical_data,
+    export_response
 )
 from app.services.prediction_service import (
     load_ai_model,
+    reload_ai_model,
+    start_model_loading,
+    get_model_status,
+    start_model_watcher,
+    stop_model_watcher,
     get_model_info,
+    get_prediction_cache_stats,
     predict_hourly_weather,
-    predict_daily_weather
+    predict_daily_weather,
+    predict_batch_weather
+)
+from app.services.memory_service import (
+    start_allocation_tracking,
+    stop_allocation_tracking,
+    get_memory_report
 )
 
 __all__ = [
@@ -26,11 +67,46 @@ __all__ = [
     'authenticate_user',
     'get_user_info',
     'reset_password',
+    'create_user_async',
+    'authenticate_user_async',
+    'get_user_info_async',
+    'reset_password_async',
     'get_last_weather_data',
     'get_line_chart_data',
     'create_weather_data',
+    'get_last_weather_data_async',
+    'get_line_chart_data_async',
+    'create_weather_data_async',
+    'create_weather_data_bulk',
+    'create_weather_data_bulk_async',
+    'start_ingest_buffer',
+    'stop_ingest_buffer',
+    'get_ingest_stats',
+    'warm_latest_cache',
+    'get_latest_cache_stats',
+    'start_live_feed',
+    'stop_live_feed',
+    'get_live_feed_stats',
+    'stream_weather_data',
+    'init_rollups',
+    'get_aggregate',
+    'get_aggregate_async',
+    'rebuild_rollups',
+    'export_weather_data',
+    'export_historical_data',
+    'export_response',
     'load_ai_model',
+    'reload_ai_model',
+    'start_model_loading',
+    'get_model_status',
+    'start_model_watcher',
+    'stop_model_watcher',
     'get_model_info',
+    'get_prediction_cache_stats',
     'predict_hourly_weather',
-    'predict_daily_weather'
+    'predict_daily_weather',
+    'predict_batch_weather',
+    'start_allocation_tracking',
+    'stop_allocation_tracking',
+    'get_memory_report'
 ]
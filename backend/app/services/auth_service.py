@@ -4,7 +4,9 @@ Authentication and user management service
 import asyncio
 from typing import Optional, Dict
 from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
 from app.core.database import get_cursor
+from app.core.async_database import get_async_cursor, is_async_db_ready
 from app.utils import hash_password, verify_password, generate_otp, send_otp_email
 from app.models import UserCreate, UserLogin, UserUpdate
 from app.core.config import settings
@@ -12,6 +14,14 @@ from app.core.config import settings
 # In-memory OTP storage (consider using Redis in production)
 otp_storage: Dict[str, str] = {}
 
+UPDATE_OTP_QUERY = "UPDATE otp SET otp=%s, createAt=CURRENT_TIMESTAMP WHERE email=%s"
+INSERT_OTP_QUERY = "INSERT INTO otp(email, otp) VALUES (%s, %s)"
+SELECT_OTP_QUERY = "SELECT otp FROM otp WHERE email=%s"
+INSERT_USER_QUERY = "INSERT INTO users (username, password, email, role) VALUES (%s, %s, %s, %s)"
+SELECT_PASSWORD_QUERY = "SELECT password FROM users WHERE username = %s"
+SELECT_USER_QUERY = "SELECT username, email FROM users WHERE username=%s"
+UPDATE_PASSWORD_QUERY = "UPDATE users SET password=%s WHERE email=%s"
+
 async def remove_otp_after_timeout(email: str, timeout: int = settings.OTP_EXPIRY_SECONDS):
     """Remove OTP from storage after timeout"""
     await asyncio.sleep(timeout)
@@ -40,27 +50,38 @@ async def generate_and_send_otp(email: str) -> dict:
     # Schedule OTP removal
     asyncio.create_task(remove_otp_after_timeout(email))
     
-    # Send email
-    send_otp_email(otp, email)
+    # Send email (blocking SMTP, keep it off the event loop)
+    await run_in_threadpool(send_otp_email, otp, email)
     print(f"OTP for {email} is: {otp}")
     
     # Store in database
     try:
-        with get_cursor() as cursor:
-            # Try update first
-            query = "UPDATE otp SET otp=%s, createAt=CURRENT_TIMESTAMP WHERE email=%s"
-            cursor.execute(query, (otp, email))
-            
-            # If no rows affected, insert new record
-            if cursor.rowcount == 0:
-                query = "INSERT INTO otp(email, otp) VALUES (%s, %s)"
-                cursor.execute(query, (email, otp))
+        if is_async_db_ready():
+            async with get_async_cursor() as cursor:
+                # Try update first
+                await cursor.execute(UPDATE_OTP_QUERY, (otp, email))
+                
+                # If no rows affected, insert new record
+                if cursor.rowcount == 0:
+                    await cursor.execute(INSERT_OTP_QUERY, (email, otp))
+        else:
+            await run_in_threadpool(_store_otp, email, otp)
     except Exception as e:
         print(f"Error storing OTP in database: {e}")
         # Don't fail the request if database storage fails
     
     return {"message": "OTP generated successfully."}
 
+def _store_otp(email: str, otp: str) -> None:
+    """Store OTP in database using the synchronous pool"""
+    with get_cursor() as cursor:
+        # Try update first
+        cursor.execute(UPDATE_OTP_QUERY, (otp, email))
+        
+        # If no rows affected, insert new record
+        if cursor.rowcount == 0:
+            cursor.execute(INSERT_OTP_QUERY, (email, otp))
+
 def verify_otp(email: str, otp: int) -> bool:
     """
     Verify OTP for email
@@ -79,8 +100,7 @@ def verify_otp(email: str, otp: int) -> bool:
     # Check database as fallback
     try:
         with get_cursor() as cursor:
-            query = "SELECT otp FROM otp WHERE email=%s"
-            cursor.execute(query, (email,))
+            cursor.execute(SELECT_OTP_QUERY, (email,))
             row = cursor.fetchone()
             if row and str(row[0]) == str(otp):
                 return True
@@ -89,6 +109,36 @@ def verify_otp(email: str, otp: int) -> bool:
     
     return False
 
+async def verify_otp_async(email: str, otp: int) -> bool:
+    """
+    Async version of verify_otp()
+    
+    Args:
+        email: User email
+        otp: OTP to verify
+    
+    Returns:
+        bool: True if OTP is valid
+    """
+    # Check in-memory storage first
+    if email in otp_storage and otp_storage[email] == str(otp):
+        return True
+    
+    if not is_async_db_ready():
+        return await run_in_threadpool(verify_otp, email, otp)
+    
+    # Check database as fallback
+    try:
+        async with get_async_cursor() as cursor:
+            await cursor.execute(SELECT_OTP_QUERY, (email,))
+            row = await cursor.fetchone()
+            if row and str(row[0]) == str(otp):
+                return True
+    except Exception as e:
+        print(f"Error verifying OTP from database: {e}")
+    
+    return False
+
 def create_user(user: UserCreate) -> dict:
     """
     Create a new user
@@ -109,8 +159,38 @@ def create_user(user: UserCreate) -> dict:
     # Insert user into database
     try:
         with get_cursor() as cursor:
-            query = "INSERT INTO users (username, password, email, role) VALUES (%s, %s, %s, %s)"
-            cursor.execute(query, (user.username, hashed_password, user.email, user.role))
+            cursor.execute(INSERT_USER_QUERY, (user.username, hashed_password, user.email, user.role))
+        
+        return {'status': 200, 'msg': 'User created successfully'}
+    
+    except Exception as e:
+        print(f"Error creating user: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to create user: {str(e)}")
+
+async def create_user_async(user: UserCreate) -> dict:
+    """
+    Async version of create_user()
+    
+    Args:
+        user: User creation data
+    
+    Returns:
+        dict: Status response
+    """
+    if not is_async_db_ready():
+        return await run_in_threadpool(create_user, user)
+    
+    # Verify OTP
+    if not await verify_otp_async(user.email, user.otp):
+        return {'status': 403, 'msg': 'OTP not matched'}
+    
+    # Hash password (bcrypt is CPU bound, keep it off the event loop)
+    hashed_password = await run_in_threadpool(hash_password, user.password)
+    
+    # Insert user into database
+    try:
+        async with get_async_cursor() as cursor:
+            await cursor.execute(INSERT_USER_QUERY, (user.username, hashed_password, user.email, user.role))
         
         return {'status': 200, 'msg': 'User created successfully'}
     
@@ -133,10 +213,7 @@ def authenticate_user(credentials: UserLogin) -> dict:
     """
     try:
         with get_cursor() as cursor:
-            cursor.execute(
-                "SELECT password FROM users WHERE username = %s", 
-                (credentials.username,)
-            )
+            cursor.execute(SELECT_PASSWORD_QUERY, (credentials.username,))
             result = cursor.fetchone()
             
             if not result:
@@ -155,6 +232,44 @@ def authenticate_user(credentials: UserLogin) -> dict:
         print(f"Error during authentication: {e}")
         raise HTTPException(status_code=500, detail="Authentication failed")
 
+async def authenticate_user_async(credentials: UserLogin) -> dict:
+    """
+    Async version of authenticate_user()
+    
+    Args:
+        credentials: Login credentials
+    
+    Returns:
+        dict: Success message
+    
+    Raises:
+        HTTPException: If authentication fails
+    """
+    if not is_async_db_ready():
+        return await run_in_threadpool(authenticate_user, credentials)
+    
+    try:
+        async with get_async_cursor() as cursor:
+            await cursor.execute(SELECT_PASSWORD_QUERY, (credentials.username,))
+            result = await cursor.fetchone()
+        
+        if not result:
+            raise HTTPException(status_code=401, detail="Invalid username or password")
+        
+        db_password = result[0]
+        
+        # bcrypt is CPU bound, keep it off the event loop
+        if not await run_in_threadpool(verify_password, credentials.password, db_password):
+            raise HTTPException(status_code=401, detail="Invalid username or password")
+        
+        return {"message": "Login successful"}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error during authentication: {e}")
+        raise HTTPException(status_code=500, detail="Authentication failed")
+
 def get_user_info(username: str) -> Optional[dict]:
     """
     Get user information by username
@@ -167,8 +282,7 @@ def get_user_info(username: str) -> Optional[dict]:
     """
     try:
         with get_cursor() as cursor:
-            query = "SELECT username, email FROM users WHERE username=%s"
-            cursor.execute(query, (username,))
+            cursor.execute(SELECT_USER_QUERY, (username,))
             row = cursor.fetchone()
             
             if row:
@@ -182,6 +296,35 @@ def get_user_info(username: str) -> Optional[dict]:
         print(f"Error getting user info: {e}")
         return {}
 
+async def get_user_info_async(username: str) -> Optional[dict]:
+    """
+    Async version of get_user_info()
+    
+    Args:
+        username: Username to lookup
+    
+    Returns:
+        dict: User info or empty dict if not found
+    """
+    if not is_async_db_ready():
+        return await run_in_threadpool(get_user_info, username)
+    
+    try:
+        async with get_async_cursor() as cursor:
+            await cursor.execute(SELECT_USER_QUERY, (username,))
+            row = await cursor.fetchone()
+            
+            if row:
+                return {
+                    "username": row[0],
+                    "email": row[1],
+                }
+            return {}
+    
+    except Exception as e:
+        print(f"Error getting user info: {e}")
+        return {}
+
 def reset_password(user_update: UserUpdate) -> dict:
     """
     Reset user password using OTP verification
@@ -202,8 +345,38 @@ def reset_password(user_update: UserUpdate) -> dict:
     # Update password in database
     try:
         with get_cursor() as cursor:
-            query = "UPDATE users SET password=%s WHERE email=%s"
-            cursor.execute(query, (hashed_password, user_update.email))
+            cursor.execute(UPDATE_PASSWORD_QUERY, (hashed_password, user_update.email))
+        
+        return {'status': 200, 'msg': 'Password updated successfully'}
+    
+    except Exception as e:
+        print(f"Error resetting password: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to reset password: {str(e)}")
+
+async def reset_password_async(user_update: UserUpdate) -> dict:
+    """
+    Async version of reset_password()
+    
+    Args:
+        user_update: User update data with new password and OTP
+    
+    Returns:
+        dict: Status response
+    """
+    if not is_async_db_ready():
+        return await run_in_threadpool(reset_password, user_update)
+    
+    # Verify OTP
+    if not await verify_otp_async(user_update.email, user_update.otp):
+        return {'status': 403, 'msg': 'OTP not matched'}
+    
+    # Hash new password (bcrypt is CPU bound, keep it off the event loop)
+    hashed_password = await run_in_threadpool(hash_password, user_update.password)
+    
+    # Update password in database
+    try:
+        async with get_async_cursor() as cursor:
+            await cursor.execute(UPDATE_PASSWORD_QUERY, (hashed_password, user_update.email))
         
         return {'status': 200, 'msg': 'Password updated successfully'}
     
@@ -0,0 +1,240 @@
+"""
+Streaming export of weather_data and historical_dataset
+
+Rows are read through an unbuffered server-side cursor (SSCursor) in
+chunks of EXPORT_CHUNK_ROWS and encoded as NDJSON or CSV one chunk at a
+time, so memory use does not depend on the number of exported rows.
+ExportStream is a plain iterator: StreamingResponse pulls each chunk in a
+worker thread, keeping the blocking reads off the event loop.
+"""
+import csv
+import io
+import threading
+from datetime import date, datetime
+from typing import Iterator, List, Optional
+import MySQLdb
+from MySQLdb.cursors import SSCursor
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from app.core.config import settings
+from app.core.database import db_pool, PoolTimeout
+from app.utils.serialization import dumps
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+WEATHER_EXPORT_COLUMNS = (
+    "id", "temp", "humidity", "isRaining", "lightIntensity", "windSpeed", "airPressure", "location", "createAt"
+)
+HISTORICAL_EXPORT_COLUMNS = (
+    "id", "day", "month", "year", "tempmax", "tempmin", "temp", "humidity", "windspeed",
+    "sealevelpressure", "conditions"
+)
+
+def _format_value(value):
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return value
+
+class ExportStream:
+    """
+    Iterator over the encoded rows of one export query
+    
+    The query is executed when the stream is created, so connection and
+    SQL errors surface before the response headers are sent. The pooled
+    connection is returned once every row was read; if the stream is
+    closed early (client disconnected) or a read fails, the connection
+    still has an unread result set and is discarded instead.
+    
+    Args:
+        query: SELECT statement
+        params: Query parameters
+        columns: Column names of the result rows
+        export_format: 'ndjson' or 'csv'
+        chunk_rows: Rows fetched and encoded per chunk
+    """
+    
+    def __init__(self, query: str, params: list, columns: tuple, export_format: str, chunk_rows: int = 1000):
+        self.columns = columns
+        self.export_format = export_format
+        self.chunk_rows = max(1, chunk_rows)
+        self.rows = 0
+        self._header_pending = export_format == "csv"
+        self._lock = threading.Lock()
+        
+        self._conn = db_pool.acquire()
+        self._cursor = None
+        try:
+            self._cursor = self._conn.cursor(SSCursor)
+            self._cursor.execute(query, params)
+        except Exception:
+            self._finish(discard=True)
+            raise
+    
+    def __iter__(self) -> Iterator[bytes]:
+        return self
+    
+    def __next__(self) -> bytes:
+        with self._lock:
+            if self._conn is None:
+                raise StopIteration
+            
+            try:
+                rows = self._cursor.fetchmany(self.chunk_rows)
+            except Exception as e:
+                print(f"✗ Export aborted after {self.rows} rows: {e}")
+                self._finish(discard=True)
+                raise
+            
+            if not rows:
+                self._finish(discard=False)
+                if self._header_pending:
+                    self._header_pending = False
+                    return self._encode([])
+                raise StopIteration
+            
+            self.rows += len(rows)
+            return self._encode(rows)
+    
+    def _encode(self, rows: List[tuple]) -> bytes:
+        if self.export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator="\n")
+            if self._header_pending:
+                writer.writerow(self.columns)
+                self._header_pending = False
+            writer.writerows([_format_value(value) for value in row] for row in rows)
+            return buffer.getvalue().encode("utf-8")
+        
+        return b"".join(
+            dumps(dict(zip(self.columns, map(_format_value, row)))) + b"\n"
+            for row in rows
+        )
+    
+    def _finish(self, discard: bool) -> None:
+        conn, cursor = self._conn, self._cursor
+        self._conn = self._cursor = None
+        if conn is None:
+            return
+        if cursor is not None and not discard:
+            try:
+                cursor.close()
+                conn.rollback()
+            except (MySQLdb.OperationalError, MySQLdb.InterfaceError):
+                discard = True
+        db_pool.release(conn, discard=discard)
+    
+    def close(self) -> None:
+        """Stop the export, discarding the connection if rows are left unread"""
+        # Waits for a chunk being read by another thread
+        with self._lock:
+            self._finish(discard=True)
+
+def export_response(stream: ExportStream, filename: str) -> StreamingResponse:
+    """
+    Wrap an export in a chunked download response
+    
+    Args:
+        stream: Export to send
+        filename: Download name without extension
+    
+    Returns:
+        StreamingResponse: Response that closes the stream when it ends or the client goes away
+    """
+    return StreamingResponse(
+        stream,
+        media_type=EXPORT_FORMATS[stream.export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{stream.export_format}"'},
+        background=BackgroundTask(stream.close),
+    )
+
+def _check_format(export_format: str) -> None:
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported export format '{export_format}', use one of: {', '.join(EXPORT_FORMATS)}"
+        )
+
+def _open_stream(query: str, params: list, columns: tuple, export_format: str) -> ExportStream:
+    try:
+        return ExportStream(query, params, columns, export_format, settings.EXPORT_CHUNK_ROWS)
+    except (PoolTimeout, MySQLdb.OperationalError) as e:
+        print(f"Error starting export: {e}")
+        raise HTTPException(status_code=503, detail="Database unavailable, try again later")
+    except Exception as e:
+        print(f"Error starting export: {e}")
+        raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
+
+def export_weather_data(
+    export_format: str = "ndjson",
+    location: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> ExportStream:
+    """
+    Stream weather_data rows in id order
+    
+    Args:
+        export_format: 'ndjson' or 'csv'
+        location: Only export this location (default: all)
+        start: First createAt to include
+        end: createAt to stop before
+    
+    Returns:
+        ExportStream: Iterator of encoded chunks
+    
+    Raises:
+        HTTPException: If the format is unknown or the query cannot be run
+    """
+    _check_format(export_format)
+    
+    conditions, params = [], []
+    if location is not None:
+        conditions.append("location = %s")
+        params.append(location)
+    if start is not None:
+        conditions.append("createAt >= %s")
+        params.append(start.astimezone().replace(tzinfo=None) if start.tzinfo else start)
+    if end is not None:
+        conditions.append("createAt < %s")
+        params.append(end.astimezone().replace(tzinfo=None) if end.tzinfo else end)
+    where = "WHERE " + " AND ".join(conditions) if conditions else ""
+    
+    query = f"SELECT {', '.join(WEATHER_EXPORT_COLUMNS)} FROM weather_data {where} ORDER BY id"
+    return _open_stream(query, params, WEATHER_EXPORT_COLUMNS, export_format)
+
+def export_historical_data(
+    export_format: str = "ndjson",
+    start: Optional[date] = None,
+    end: Optional[date] = None
+) -> ExportStream:
+    """
+    Stream historical_dataset rows in id order
+    
+    Args:
+        export_format: 'ndjson' or 'csv'
+        start: First day to include
+        end: Last day to include
+    
+    Returns:
+        ExportStream: Iterator of encoded chunks
+    
+    Raises:
+        HTTPException: If the format is unknown or the query cannot be run
+    """
+    _check_format(export_format)
+    
+    conditions, params = [], []
+    if start is not None:
+        conditions.append("(year, month, day) >= (%s, %s, %s)")
+        params.extend([start.year, start.month, start.day])
+    if end is not None:
+        conditions.append("(year, month, day) <= (%s, %s, %s)")
+        params.extend([end.year, end.month, end.day])
+    where = "WHERE " + " AND ".join(conditions) if conditions else ""
+    
+    query = f"SELECT {', '.join(HISTORICAL_EXPORT_COLUMNS)} FROM historical_dataset {where} ORDER BY id"
+    return _open_stream(query, params, HISTORICAL_EXPORT_COLUMNS, export_format)
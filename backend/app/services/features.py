@@ -0,0 +1,59 @@
+"""
+Vectorized feature construction for the date-only AI model
+
+Builds the model input matrix straight from a NumPy datetime64 range,
+without going through Python datetime objects or a pandas DataFrame.
+"""
+import numpy as np
+from datetime import datetime
+from typing import List
+
+def forecast_timestamps(start: datetime, count: int, unit: str) -> np.ndarray:
+    """
+    Generate evenly spaced timestamps
+    
+    Args:
+        start: First timestamp
+        count: Number of timestamps
+        unit: NumPy datetime unit of the step ('h' for hourly, 'D' for daily)
+    
+    Returns:
+        np.ndarray: datetime64 array of length `count`
+    """
+    return np.datetime64(start, unit) + np.arange(count)
+
+def build_feature_matrix(timestamps: np.ndarray, feature_columns: List[str]) -> np.ndarray:
+    """
+    Build the model input matrix for a range of timestamps
+    
+    The matrix is float32 and C-contiguous, which is the layout sklearn
+    trees work on, so predict() does not need to copy or convert it.
+    
+    Args:
+        timestamps: datetime64 array
+        feature_columns: Column order expected by the model
+            (any of 'day', 'month', 'year', 'hour')
+    
+    Returns:
+        np.ndarray: Array of shape (len(timestamps), len(feature_columns))
+    
+    Raises:
+        ValueError: If the model expects an unknown feature
+    """
+    years = timestamps.astype('datetime64[Y]')
+    months = timestamps.astype('datetime64[M]')
+    days = timestamps.astype('datetime64[D]')
+    
+    extractors = {
+        'year': lambda: years.astype(np.int64) + 1970,
+        'month': lambda: (months - years).astype(np.int64) + 1,
+        'day': lambda: (days - months).astype(np.int64) + 1,
+        'hour': lambda: (timestamps.astype('datetime64[h]') - days).astype(np.int64),
+    }
+    
+    X = np.empty((len(timestamps), len(feature_columns)), dtype=np.float32)
+    for j, column in enumerate(feature_columns):
+        if column not in extractors:
+            raise ValueError(f"Unsupported feature column: {column}")
+        X[:, j] = extractors[column]()
+    return X
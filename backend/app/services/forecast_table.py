@@ -0,0 +1,115 @@
+"""
+Precomputed (materialized) forecast tables for the date-only AI model
+
+The v4 model only takes calendar features (day, month, year[, hour]) as
+input, so every prediction is a pure function of the requested dates.
+A ForecastTable stores the model output for a contiguous window of dates
+so that requests inside that window become array slices instead of
+RandomForest calls.
+"""
+import numpy as np
+from datetime import datetime, timedelta
+from typing import Optional, Tuple, Dict
+
+class ForecastTable:
+    """
+    Columnar predictions for evenly spaced timestamps
+    
+    Attributes:
+        start: Timestamp of the first row
+        step: Distance between two consecutive rows
+        regression: Array of shape (rows, targets) with regression outputs
+        conditions: Array of shape (rows,) with encoded condition labels
+        model_version: Version of the model that produced the table
+    """
+    
+    def __init__(
+        self,
+        start: datetime,
+        step: timedelta,
+        regression: np.ndarray,
+        conditions: np.ndarray,
+        model_version: str
+    ):
+        if len(regression) != len(conditions):
+            raise ValueError("regression and conditions must have the same number of rows")
+        
+        self.start = start
+        self.step = step
+        # Regression outputs are kept in float64 so that sliced answers
+        # round exactly like the live prediction path
+        self.regression = np.ascontiguousarray(regression, dtype=np.float64)
+        self.conditions = np.ascontiguousarray(conditions, dtype=np.int32)
+        self.model_version = model_version
+    
+    def __len__(self) -> int:
+        return len(self.conditions)
+    
+    @property
+    def end(self) -> datetime:
+        """Timestamp right after the last row"""
+        return self.start + self.step * len(self)
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the table arrays"""
+        return self.regression.nbytes + self.conditions.nbytes
+    
+    def lookup(self, start: datetime, count: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Get the rows for a window of `count` steps beginning at `start`
+        
+        Args:
+            start: Timestamp of the first requested row
+            count: Number of requested rows
+        
+        Returns:
+            tuple: (regression, conditions) views, or None if the window
+            is not fully covered by the table
+        """
+        offset, remainder = divmod(start - self.start, self.step)
+        if remainder or offset < 0 or offset + count > len(self):
+            return None
+        return self.regression[offset:offset + count], self.conditions[offset:offset + count]
+
+def save_forecast_tables(tables: Dict[str, ForecastTable], path: str) -> None:
+    """
+    Save forecast tables into a single .npz file
+    
+    Args:
+        tables: Mapping of table name (e.g. 'hourly', 'daily') to table
+        path: Output file path
+    """
+    arrays = {}
+    for name, table in tables.items():
+        arrays[f"{name}_regression"] = table.regression
+        arrays[f"{name}_conditions"] = table.conditions
+        arrays[f"{name}_start"] = np.array(table.start.isoformat())
+        arrays[f"{name}_step_seconds"] = np.array(int(table.step.total_seconds()))
+        arrays[f"{name}_model_version"] = np.array(table.model_version)
+    arrays["names"] = np.array(sorted(tables))
+    
+    with open(path, "wb") as f:
+        np.savez(f, **arrays)
+
+def load_forecast_tables(path: str) -> Dict[str, ForecastTable]:
+    """
+    Load forecast tables saved by save_forecast_tables()
+    
+    Args:
+        path: Input file path
+    
+    Returns:
+        dict: Mapping of table name to table
+    """
+    tables = {}
+    with np.load(path, allow_pickle=False) as data:
+        for name in data["names"].tolist():
+            tables[name] = ForecastTable(
+                start=datetime.fromisoformat(str(data[f"{name}_start"])),
+                step=timedelta(seconds=int(data[f"{name}_step_seconds"])),
+                regression=data[f"{name}_regression"],
+                conditions=data[f"{name}_conditions"],
+                model_version=str(data[f"{name}_model_version"]),
+            )
+    return tables
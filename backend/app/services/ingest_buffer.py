@@ -0,0 +1,302 @@
+"""
+Write-behind buffer for sensor readings
+
+Readings are acknowledged as soon as they are in a bounded in-memory
+queue. A background thread takes them off the queue and hands them to a
+writer callable in batches, either when a batch is full or when the
+oldest queued reading has waited for the flush interval.
+
+A batch that fails max_attempts times in a row is written row by row. If
+some rows go through, the database is fine and the rows that still fail
+are dropped as dead letters (logged and counted), so one reading MySQL
+rejects cannot block the queue. If no row goes through, the rows are set
+aside as suspects and retried one by one after the next successful
+flush; while suspects are waiting, failing batches are kept and retried
+as before (a database outage does not drop readings).
+"""
+import queue
+import threading
+import time
+from typing import Callable, List, Optional
+
+class IngestBuffer:
+    """
+    Bounded queue with a batching background flusher
+    
+    Args:
+        writer: Callable that stores a list of queued items (one transaction)
+        max_size: Maximum number of queued items
+        batch_size: Maximum number of items per writer call
+        flush_interval: Maximum time in seconds an item waits before a flush
+        put_timeout: Time in seconds submit() waits for room when the queue is full
+        max_attempts: Failed flushes of a batch before it is written row by row
+    """
+    
+    def __init__(
+        self,
+        writer: Callable[[List[tuple]], None],
+        max_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        put_timeout: float = 0.5,
+        max_attempts: int = 3
+    ):
+        if max_size < 1 or batch_size < 1 or max_attempts < 1:
+            raise ValueError("max_size, batch_size and max_attempts must be at least 1")
+        
+        self.writer = writer
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.max_attempts = max_attempts
+        
+        self._queue: queue.Queue = queue.Queue(maxsize=max_size)
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        
+        # Items taken off the queue whose write failed, retried first
+        self._pending: List[tuple] = []
+        self._attempts = 0
+        # Items that failed row by row while no row went through
+        self._suspects: List[tuple] = []
+        
+        self.accepted = 0
+        self.rejected = 0
+        self.flushed_rows = 0
+        self.flushed_batches = 0
+        self.failed_batches = 0
+        self.dropped_rows = 0
+        self.dead_letter_rows = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+        self.last_error: Optional[str] = None
+    
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self) -> None:
+        """Start the background flusher thread"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ingest-flusher", daemon=True)
+        self._thread.start()
+    
+    def submit(self, item: tuple, block: bool = True) -> bool:
+        """
+        Queue an item for writing
+        
+        Args:
+            item: Item passed to the writer inside a batch
+            block: Wait up to put_timeout for room when the queue is full
+        
+        Returns:
+            bool: True if the item was queued, False if the queue is full
+            (the caller should ask the client to retry later)
+        """
+        try:
+            if block:
+                self._queue.put(item, timeout=self.put_timeout)
+            else:
+                self._queue.put_nowait(item)
+        except queue.Full:
+            if block:
+                with self._lock:
+                    self.rejected += 1
+            return False
+        
+        with self._lock:
+            self.accepted += 1
+        return True
+    
+    def _take_batch(self) -> List[tuple]:
+        """Wait for the next batch, by size or by time"""
+        batch = self._pending
+        self._pending = []
+        
+        if not batch:
+            try:
+                batch.append(self._queue.get(timeout=self.flush_interval))
+            except queue.Empty:
+                return batch
+        
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop.is_set():
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        
+        # Whatever is already queued rides along up to the batch size
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+    
+    def _flush(self, batch: List[tuple], log: bool = True) -> bool:
+        """Write one batch and record its latency"""
+        started = time.perf_counter()
+        try:
+            self.writer(batch)
+        except Exception as e:
+            with self._lock:
+                self.failed_batches += 1
+                self.last_error = str(e)
+            if log:
+                print(f"✗ Failed to flush {len(batch)} buffered readings: {e}")
+            return False
+        
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.flushed_rows += len(batch)
+            self.flushed_batches += 1
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+            self._total_flush_ms += elapsed_ms
+        return True
+    
+    def _dead_letter(self, item: tuple) -> None:
+        with self._lock:
+            self.dead_letter_rows += 1
+        print(f"✗ Dropped a buffered reading that cannot be written: {item!r} ({self.last_error})")
+    
+    def _write_rows(self, rows: List[tuple]) -> List[tuple]:
+        """Write rows one by one and return those that failed"""
+        return [row for row in rows if not self._flush([row], log=False)]
+    
+    def _retry_suspects(self) -> None:
+        """Retry the suspects once the database took a batch; drop those that still fail"""
+        suspects, self._suspects = self._suspects, []
+        for row in self._write_rows(suspects):
+            self._dead_letter(row)
+    
+    def _handle_failure(self, batch: List[tuple]) -> bool:
+        """
+        Decide what to do with a batch that failed
+        
+        Returns:
+            bool: True to back off before the next flush
+        """
+        self._attempts += 1
+        if self._attempts < self.max_attempts or self._suspects:
+            # Keep the batch and back off; new readings pile up in the
+            # queue and submit() starts refusing them once it is full
+            self._pending = batch
+            return True
+        
+        self._attempts = 0
+        failed = self._write_rows(batch)
+        if len(failed) < len(batch):
+            for row in failed:
+                self._dead_letter(row)
+            return False
+        # Nothing went through: bad rows or a database outage. Set them
+        # aside and see whether the next readings can be written
+        self._suspects = failed
+        print(f"✗ {len(failed)} buffered readings failed row by row, retrying them after the next flush")
+        return True
+    
+    def _run(self) -> None:
+        """Flusher thread main loop"""
+        while not self._stop.is_set():
+            batch = self._take_batch()
+            if not batch:
+                continue
+            if self._flush(batch):
+                self._attempts = 0
+                if self._suspects:
+                    self._retry_suspects()
+            elif self._handle_failure(batch):
+                self._stop.wait(self.flush_interval)
+    
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Stop the flusher and write out everything still queued
+        
+        Args:
+            timeout: Maximum time in seconds spent draining the queue
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                print("✗ Ingest flusher did not stop in time, skipping final flush")
+                return
+            self._thread = None
+        
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            batch = self._pending + self._suspects
+            self._pending = []
+            self._suspects = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            if not self._flush(batch):
+                failed = self._write_rows(batch)
+                if len(failed) == len(batch):
+                    self._pending = batch
+                    break
+                for row in failed:
+                    self._dead_letter(row)
+        
+        lost = len(self._pending) + self._queue.qsize()
+        if lost:
+            with self._lock:
+                self.dropped_rows += lost
+            print(f"✗ {lost} buffered readings were not written on shutdown")
+    
+    def snapshot(self) -> dict:
+        """
+        Copy of the buffered readings, safe to walk while the flusher runs
+        (memory report)
+        
+        Returns:
+            dict: 'queued', 'pending' and 'suspects' readings
+        """
+        with self._queue.mutex:
+            queued = list(self._queue.queue)
+        # Only the flusher thread replaces these lists; list() copies one atomically
+        return {'queued': queued, 'pending': list(self._pending), 'suspects': list(self._suspects)}
+    
+    def stats(self) -> dict:
+        """
+        Get buffer counters
+        
+        Returns:
+            dict: Queue depth, throughput and flush latency
+        """
+        with self._lock:
+            return {
+                'running': self.running,
+                'queue_depth': self._queue.qsize(),
+                'pending_retry': len(self._pending),
+                'suspect_rows': len(self._suspects),
+                'max_size': self.max_size,
+                'batch_size': self.batch_size,
+                'flush_interval': self.flush_interval,
+                'accepted': self.accepted,
+                'rejected': self.rejected,
+                'flushed_rows': self.flushed_rows,
+                'flushed_batches': self.flushed_batches,
+                'failed_batches': self.failed_batches,
+                'dropped_rows': self.dropped_rows,
+                'dead_letter_rows': self.dead_letter_rows,
+                'last_flush_ms': round(self.last_flush_ms, 3),
+                'avg_flush_ms': round(self._total_flush_ms / self.flushed_batches, 3) if self.flushed_batches else 0.0,
+                'max_flush_ms': round(self.max_flush_ms, 3),
+                'last_error': self.last_error,
+            }
@@ -0,0 +1,229 @@
+"""
+In-process cache of the most recent sensor readings per location
+
+Keeps the newest readings of every location, newest first, in a
+fixed-size ring buffer so that /weather-data/last and
+/weather-data/line-chart can be answered without a MySQL round trip.
+Entries are loaded from the database on a miss (or at startup), updated
+in place when this process inserts a single reading, and reloaded when
+a batch of readings was written or the entry is older than max_age.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Iterable, List, Optional
+
+class _Entry:
+    """Ring buffer and bookkeeping of one location"""
+    __slots__ = ("readings", "complete", "synced_at", "updated_at")
+    
+    def __init__(self, history_size: int):
+        self.readings: deque = deque(maxlen=history_size)
+        # True when the location has fewer rows than the ring buffer holds,
+        # so any limit can be answered from the cache
+        self.complete = False
+        self.synced_at = 0.0
+        self.updated_at = 0.0
+
+class LatestReadingCache:
+    """
+    Bounded, thread-safe cache of recent readings per location
+    
+    Args:
+        history_size: Readings kept per location (0 disables the cache)
+        max_locations: Maximum number of cached locations (least recently used are dropped)
+        max_age: Seconds after which an entry is reloaded from the database,
+            so rows written by other processes show up (0 means never)
+    """
+    
+    def __init__(self, history_size: int = 100, max_locations: int = 1000, max_age: float = 60):
+        self.history_size = history_size
+        self.max_locations = max_locations
+        self.max_age = max_age
+        self._entries: OrderedDict = OrderedDict()
+        # Generation of the last write per location, so that a load started
+        # before the write cannot overwrite the newer state. Only the most
+        # recently written max_locations are kept; the others read as the
+        # newest generation dropped, which can only make a load give up
+        self._generation = 0
+        self._generations: OrderedDict = OrderedDict()
+        self._floor = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.writes = 0
+        self.invalidations = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.history_size > 0
+    
+    def covers(self, limit: int) -> bool:
+        """Whether a request for `limit` readings can be served by the cache"""
+        return self.enabled and limit <= self.history_size
+    
+    def get(self, location: str, limit: int) -> Optional[List[dict]]:
+        """
+        Get the newest readings of a location
+        
+        Args:
+            location: Location name
+            limit: Number of readings wanted
+        
+        Returns:
+            list: Up to `limit` readings, newest first (empty if the location
+            has no readings), or None on a miss
+        """
+        if not self.enabled:
+            return None
+        
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(location)
+            if (
+                entry is None
+                or (self.max_age > 0 and now - entry.synced_at > self.max_age)
+                or (limit > len(entry.readings) and not entry.complete)
+            ):
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(location)
+            self.hits += 1
+            return list(entry.readings)[:limit]
+    
+    def _bump(self, location: str) -> None:
+        """Record a write to a location (caller holds the lock)"""
+        self._generation += 1
+        self._generations[location] = self._generation
+        self._generations.move_to_end(location)
+        while len(self._generations) > self.max_locations:
+            _, self._floor = self._generations.popitem(last=False)
+    
+    def begin_load(self, location: str) -> int:
+        """Get the token to pass to fill() after reading the database"""
+        with self._lock:
+            return self._generations.get(location, self._floor)
+    
+    def fill(self, location: str, readings: List[dict], token: int) -> None:
+        """
+        Replace the entry of a location with readings loaded from the database
+        
+        Args:
+            location: Location name
+            readings: Newest readings first, at most history_size of them
+            token: Value of begin_load() taken before the database read
+        """
+        if not self.enabled:
+            return
+        
+        with self._lock:
+            if self._generations.get(location, self._floor) != token:
+                # A write happened while loading, the rows may be outdated
+                return
+            
+            entry = _Entry(self.history_size)
+            entry.readings.extend(readings[:self.history_size])
+            entry.complete = len(readings) < self.history_size
+            entry.synced_at = entry.updated_at = time.time()
+            self._entries[location] = entry
+            self._entries.move_to_end(location)
+            self.loads += 1
+            
+            while len(self._entries) > self.max_locations:
+                self._entries.popitem(last=False)
+    
+    def record(self, location: str, reading: dict) -> None:
+        """
+        Add a reading that was just committed (write-through)
+        
+        Commit callbacks of concurrent inserts can run in any order, so the
+        reading is inserted by id (newest first) rather than at the head.
+        A reading already cached, or older than a full ring buffer holds,
+        is ignored.
+        
+        Args:
+            location: Location name
+            reading: Reading in the API response shape, including its id
+        """
+        if not self.enabled:
+            return
+        
+        with self._lock:
+            self._bump(location)
+            entry = self._entries.get(location)
+            if entry is None:
+                return
+            readings = entry.readings
+            position = 0
+            while position < len(readings) and readings[position]["id"] > reading["id"]:
+                position += 1
+            if position < len(readings) and readings[position]["id"] == reading["id"]:
+                return
+            if len(readings) == self.history_size:
+                if position == len(readings):
+                    return
+                entry.complete = False
+                readings.pop()
+            readings.insert(position, reading)
+            entry.updated_at = time.time()
+            self.writes += 1
+    
+    def invalidate(self, locations: Optional[Iterable[str]] = None) -> None:
+        """
+        Drop cached entries so they are reloaded on the next request
+        
+        Args:
+            locations: Locations to drop (default: all)
+        """
+        with self._lock:
+            names = list(self._entries) if locations is None else list(locations)
+            for location in names:
+                self._bump(location)
+                if self._entries.pop(location, None) is not None:
+                    self.invalidations += 1
+    
+    def snapshot(self) -> dict:
+        """
+        Copy of the cached readings, safe to walk without the lock (memory report)
+        
+        Returns:
+            dict: 'entries' (ring buffer copy per location) and 'generations'
+        """
+        with self._lock:
+            return {
+                'entries': OrderedDict(
+                    (location, deque(entry.readings, self.history_size))
+                    for location, entry in self._entries.items()
+                ),
+                'generations': dict(self._generations),
+            }
+    
+    def stats(self) -> dict:
+        """
+        Get cache counters and staleness
+        
+        Returns:
+            dict: Size, hit/miss counters, hit rate and entry ages in seconds
+        """
+        now = time.time()
+        with self._lock:
+            lookups = self.hits + self.misses
+            sync_ages = [now - entry.synced_at for entry in self._entries.values()]
+            update_ages = [now - entry.updated_at for entry in self._entries.values()]
+            return {
+                'enabled': self.enabled,
+                'locations': len(self._entries),
+                'max_locations': self.max_locations,
+                'history_size': self.history_size,
+                'max_age': self.max_age,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'loads': self.loads,
+                'writes': self.writes,
+                'invalidations': self.invalidations,
+                'max_sync_age_seconds': round(max(sync_ages), 3) if sync_ages else None,
+                'max_update_age_seconds': round(max(update_ages), 3) if update_ages else None,
+            }
@@ -0,0 +1,188 @@
+"""
+Fan-out hub pushing newly committed readings to live subscribers
+
+Every /weather-data/stream connection owns a small bounded asyncio queue.
+Insert paths publish from any thread; readings are handed to the event
+loop with call_soon_threadsafe() and copied into the queues of that
+location's subscribers. A subscriber whose queue is full is dropped
+rather than slowing down ingestion or buffering without bound, and its
+stream ends with a `dropped` event so the client can reconnect.
+
+Idle subscribers cost one suspended coroutine and a queue, so a single
+worker can hold thousands of them. The hub is per process: with several
+workers, a client only sees readings inserted by the worker it is
+connected to.
+"""
+import asyncio
+from typing import AsyncIterator, Dict, Iterable, Optional, Set, Tuple
+from app.utils.serialization import dumps
+
+class Subscription:
+    """Queue of readings for one connected client"""
+    __slots__ = ("location", "queue", "dropped")
+    
+    def __init__(self, location: str, queue_size: int):
+        self.location = location
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+
+class LiveFeedHub:
+    """
+    Publish/subscribe hub for readings, keyed by location
+    
+    Subscriptions are only touched on the event loop thread; publish() is
+    the only method that may be called from other threads.
+    
+    Args:
+        queue_size: Readings buffered per subscriber before it is dropped
+        max_subscribers: Maximum number of concurrent subscribers
+    """
+    
+    def __init__(self, queue_size: int = 100, max_subscribers: int = 10000):
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+        
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._count = 0
+        
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.rejected = 0
+    
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Attach the hub to the event loop serving the subscribers"""
+        self._loop = loop
+    
+    def subscribe(self, location: str) -> Optional[Subscription]:
+        """
+        Register a subscriber for a location
+        
+        Returns:
+            Subscription: The new subscription, or None if the hub is full
+        """
+        if self._count >= self.max_subscribers:
+            self.rejected += 1
+            return None
+        
+        subscription = Subscription(location, self.queue_size)
+        self._subscribers.setdefault(location, set()).add(subscription)
+        self._count += 1
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscriber (no-op if it was already dropped)"""
+        subscribers = self._subscribers.get(subscription.location)
+        if subscribers is None or subscription not in subscribers:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.location]
+        self._count -= 1
+    
+    def _end(self, subscription: Subscription) -> None:
+        """Remove a subscriber and wake its stream with the end marker"""
+        self.unsubscribe(subscription)
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+    
+    def publish(self, readings: Iterable[Tuple[str, dict]]) -> None:
+        """
+        Send committed readings to their location's subscribers
+        
+        Safe to call from any thread. Returns immediately; delivery happens
+        on the event loop.
+        
+        Args:
+            readings: (location, reading) pairs
+        """
+        loop = self._loop
+        if loop is None or self._count == 0 or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._dispatch, list(readings))
+        except RuntimeError:
+            # Loop closed between the check and the call (shutdown)
+            pass
+    
+    def _dispatch(self, readings: list) -> None:
+        for location, reading in readings:
+            self.published += 1
+            for subscription in list(self._subscribers.get(location, ())):
+                try:
+                    subscription.queue.put_nowait(reading)
+                    self.delivered += 1
+                except asyncio.QueueFull:
+                    subscription.dropped = True
+                    self.dropped += 1
+                    self._end(subscription)
+    
+    def close(self) -> None:
+        """End every subscription (call on the event loop)"""
+        for subscribers in list(self._subscribers.values()):
+            for subscription in list(subscribers):
+                self._end(subscription)
+    
+    async def events(self, subscription: Subscription, heartbeat: float = 15.0) -> AsyncIterator[str]:
+        """
+        Server-Sent Events stream of a subscription
+        
+        Sends a `reading` event per reading and a comment line every
+        `heartbeat` seconds without readings, so proxies keep the idle
+        connection open. The subscription is removed when the client
+        disconnects.
+        
+        Args:
+            subscription: Subscription from subscribe()
+            heartbeat: Seconds between keep-alive comments
+        """
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    reading = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                
+                if reading is None:
+                    reason = "slow consumer" if subscription.dropped else "server shutdown"
+                    yield f"event: dropped\ndata: {dumps({'reason': reason}).decode('utf-8')}\n\n"
+                    return
+                yield f"event: reading\ndata: {dumps(reading).decode('utf-8')}\n\n"
+        finally:
+            self.unsubscribe(subscription)
+    
+    def snapshot(self) -> Dict[str, list]:
+        """
+        Readings waiting in the subscriber queues per location (memory report)
+        
+        May be called from another thread: every container is copied with a
+        single list()/set() call, which does not yield to the event loop.
+        """
+        return {
+            location: [list(subscription.queue._queue) for subscription in set(subscriptions)]
+            for location, subscriptions in list(self._subscribers.items())
+        }
+    
+    def stats(self) -> dict:
+        """
+        Get hub counters
+        
+        Returns:
+            dict: Subscriber count and delivery counters
+        """
+        return {
+            'subscribers': self._count,
+            'locations': len(self._subscribers),
+            'max_subscribers': self.max_subscribers,
+            'queue_size': self.queue_size,
+            'published': self.published,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'rejected': self.rejected,
+        }
@@ -0,0 +1,147 @@
+"""
+Memory report of a worker: the loaded model, the in-process caches,
+heavy imports and traced allocations
+"""
+import os
+from typing import Optional
+from app.core.config import settings
+from app.core.memory import (
+    AllocationTracker,
+    deep_size,
+    forest_memory,
+    loaded_modules,
+    measure_imports,
+    read_process_memory
+)
+from app.services.auth_service import otp_storage
+from app.services.model_bundle import MODEL_KINDS, MODEL_ROLES
+from app.services.model_registry import LoadedModel
+from app.services.prediction_service import model_registry, prediction_cache
+from app.services.weather_service import latest_cache, ingest_buffer, live_feed
+
+allocation_tracker = AllocationTracker(
+    frames=max(settings.MEMORY_TRACEMALLOC_FRAMES, 1),
+    interval=settings.MEMORY_SNAPSHOT_INTERVAL,
+    history=settings.MEMORY_SNAPSHOT_HISTORY,
+)
+
+def start_allocation_tracking() -> None:
+    """Trace allocations if MEMORY_TRACEMALLOC_FRAMES is set (call first in startup)"""
+    if settings.MEMORY_TRACEMALLOC_FRAMES > 0:
+        allocation_tracker.start()
+
+def stop_allocation_tracking() -> None:
+    """Stop the snapshots and tracing"""
+    allocation_tracker.stop()
+
+def model_memory(model: LoadedModel, trees: bool = False, seen: Optional[set] = None) -> dict:
+    """
+    Size of every component of a loaded model
+    
+    Args:
+        model: Loaded model
+        trees: Include the nodes and bytes of every tree
+        seen: ids of objects already counted (see deep_size())
+    
+    Returns:
+        dict: model_id, layout, engine, total bytes and mapped bytes, and
+        one entry per forest, label encoder and forecast table
+    """
+    seen = set() if seen is None else seen
+    package = model.package
+    components = []
+    for kind in MODEL_KINDS:
+        if kind not in package:
+            continue
+        for role in MODEL_ROLES:
+            components.append({'component': f"{kind}.{role}", **forest_memory(package[kind][role], trees, seen)})
+        encoder = package.get(f"label_encoder_{kind}", package[kind].get('label_encoder'))
+        if encoder is not None:
+            heap, mapped = deep_size(encoder, seen)
+            components.append({
+                'component': f"{kind}.label_encoder",
+                'type': type(encoder).__name__,
+                'classes': len(encoder.classes_),
+                'bytes': heap,
+                'mapped_bytes': mapped,
+            })
+    for kind, table in model.forecast_tables.items():
+        heap, mapped = deep_size(table, seen)
+        components.append({
+            'component': f"{kind}.forecast_table",
+            'type': type(table).__name__,
+            'rows': len(table.conditions),
+            'bytes': heap,
+            'mapped_bytes': mapped,
+        })
+    # Feature columns, targets, metadata and the training log
+    heap, mapped = deep_size(package, seen)
+    components.append({'component': 'metadata', 'type': 'dict', 'bytes': heap, 'mapped_bytes': mapped})
+    
+    return {
+        'model_id': model.model_id,
+        'layout': model.layout,
+        'engine': model.engine,
+        'bytes': sum(component['bytes'] for component in components),
+        'mapped_bytes': sum(component['mapped_bytes'] for component in components),
+        'components': components,
+    }
+
+def cache_memory(seen: Optional[set] = None) -> dict:
+    """
+    Bytes held by the in-process caches and queues
+    
+    Arrays shared with objects in `seen` (prediction cache slices of a
+    forecast table, say) are not counted again. Each cache is copied
+    under its own lock first and the copies are walked, so requests can
+    keep changing the caches meanwhile.
+    
+    Returns:
+        dict: Bytes per cache
+    """
+    seen = set() if seen is None else seen
+    caches = {
+        'prediction_cache': prediction_cache.snapshot(),
+        'latest_cache': latest_cache.snapshot(),
+        'ingest_buffer': ingest_buffer.snapshot(),
+        'live_feed': live_feed.snapshot(),
+        'otp_storage': dict(otp_storage),
+    }
+    return {name: deep_size(cache, seen)[0] for name, cache in caches.items()}
+
+def get_memory_report(
+    trees: bool = False,
+    imports: bool = False,
+    top: Optional[int] = None,
+    snapshot: bool = False
+) -> dict:
+    """
+    Memory of this worker by consumer
+    
+    Args:
+        trees: Include every tree of every forest
+        imports: Measure the heavy imports in a fresh interpreter (takes seconds)
+        top: Allocators listed per tracemalloc snapshot
+        snapshot: Take a tracemalloc snapshot now (when tracing)
+    
+    Returns:
+        dict: Process memory (kB), model components and caches (bytes),
+        loaded heavy modules, allocation snapshots and optionally import costs
+    """
+    if snapshot and allocation_tracker.running:
+        allocation_tracker.take_snapshot()
+    
+    seen = set()
+    model = model_registry.current
+    report = {
+        'status': 200,
+        'pid': os.getpid(),
+        'process_kb': read_process_memory(),
+        'model': model_memory(model, trees, seen) if model is not None else None,
+        'caches': cache_memory(seen),
+        'modules': loaded_modules(),
+        'allocations': allocation_tracker.report(top),
+    }
+    if imports:
+        report['imports'] = measure_imports()
+    return report
@@ -0,0 +1,426 @@
+"""
+Memory-mapped model bundles shared between worker processes
+
+joblib.load() unpickles every tree into private memory of the worker
+(sklearn's Tree copies its node arrays on unpickling, so joblib's
+mmap_mode does not help). A model bundle is a directory with the node
+arrays of every forest stored as plain .npy files plus a manifest.json
+with the rest of the combined package. The arrays are opened with
+np.load(mmap_mode='r'), so all workers on a host read the same
+page-cache copy and an extra worker adds almost no resident memory.
+
+The same FlatForest evaluator backs INFERENCE_ENGINE=flat, which
+converts the sklearn forests of a joblib package in memory at load time
+(compile_package()) to skip sklearn's per-call validation and thread
+dispatch on small requests.
+
+Layout:
+    manifest.json                    version, columns, label classes, forests
+    <kind>_<role>.<array>.npy        node arrays per forest
+                                     (e.g. hourly_regressor.threshold.npy)
+"""
+import json
+import os
+from datetime import datetime
+import numpy as np
+from typing import Dict, List, Optional
+from app.services.features import forecast_timestamps, build_feature_matrix
+
+BUNDLE_FORMAT = 1
+MANIFEST_FILE = "manifest.json"
+FOREST_ARRAYS = ("feature", "threshold", "left", "right", "value", "roots")
+MODEL_KINDS = ("hourly", "daily")
+MODEL_ROLES = ("regressor", "classifier")
+# Levels walked between removing finished (tree, row) pairs in FlatForest.apply
+COMPACT_EVERY = 3
+# Timestamps predicted when comparing a flat package with its sklearn forests
+VERIFY_HOURS = 24 * 365 * 2
+VERIFY_DAYS = 365 * 5
+
+class FlatForest:
+    """
+    Random forest evaluated from flat node arrays
+    
+    The nodes of all trees are concatenated. Children are global node
+    indices and every leaf points to itself with an infinite threshold,
+    so all (tree, row) pairs are walked together, one level per step.
+    Pairs that reached a leaf are dropped from the walk, so shallow
+    branches stop costing work early.
+    
+    Args:
+        feature: Feature index per node (int32, narrower in compacted bundles)
+        threshold: Split threshold per node, inf for leaves (float64, or
+            float32 rounded down in compacted bundles)
+        left: Left child per node (int32)
+        right: Right child per node (int32)
+        value: Output per node, shape (nodes, outputs) for regressors or
+            (nodes, classes) class probabilities for classifiers (float64
+            or float32)
+        roots: Root node of every tree (int32)
+        max_depth: Depth of the deepest tree
+        classes: Class labels for classifiers, None for regressors
+        n_features: Number of input columns
+        n_outputs: Number of regression targets
+    """
+    
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        classes: np.ndarray = None,
+        n_features: int = 0,
+        n_outputs: int = 1
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.classes_ = classes
+        self.n_features_in_ = n_features
+        self.n_outputs_ = n_outputs
+    
+    @property
+    def is_classifier(self) -> bool:
+        return self.classes_ is not None
+    
+    @property
+    def n_estimators(self) -> int:
+        return len(self.roots)
+    
+    @property
+    def nbytes(self) -> int:
+        """Size of the node arrays"""
+        return sum(getattr(self, name).nbytes for name in FOREST_ARRAYS)
+    
+    @property
+    def meta(self) -> dict:
+        """Manifest entry of the forest"""
+        return {
+            "max_depth": int(self.max_depth),
+            "n_features": int(self.n_features_in_),
+            "n_outputs": int(self.n_outputs_),
+            "n_estimators": self.n_estimators,
+            "nodes": int(len(self.feature)),
+            "classes": self.classes_.tolist() if self.is_classifier else None,
+        }
+    
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """
+        Get the leaf reached in every tree
+        
+        Args:
+            X: Input matrix of shape (rows, features)
+        
+        Returns:
+            np.ndarray: Leaf node indices of shape (trees, rows)
+        """
+        X = np.asarray(X, dtype=np.float32)
+        n_rows = len(X)
+        # Feature-major copy, so the value of (feature f, row r) is at f * n_rows + r
+        columns = np.ascontiguousarray(X.T).ravel()
+        
+        # One entry per (tree, row) pair; int32 keeps the gathers narrow
+        nodes = np.repeat(self.roots, n_rows)
+        rows = np.tile(np.arange(n_rows, dtype=np.int32), len(self.roots))
+        leaves, active = nodes, None
+        for step in range(self.max_depth):
+            index = np.take(self.feature, nodes).astype(np.int32, copy=False)
+            index *= n_rows
+            index += rows
+            # float32 inputs against float64 thresholds, as sklearn compares them
+            go_left = np.take(columns, index) <= np.take(self.threshold, nodes)
+            children = np.where(go_left, np.take(self.left, nodes), np.take(self.right, nodes))
+            
+            if step % COMPACT_EVERY != COMPACT_EVERY - 1:
+                nodes = children
+                continue
+            # Drop the pairs that stayed on their leaf
+            moved = children != nodes
+            if active is None:
+                leaves, active = children, np.flatnonzero(moved)
+            else:
+                leaves[active] = children
+                active = active[moved]
+            nodes, rows = children[moved], rows[moved]
+            if not nodes.size:
+                break
+        else:
+            if active is None:
+                leaves = nodes
+            else:
+                leaves[active] = nodes
+        return leaves.reshape(len(self.roots), n_rows)
+    
+    def _mean_value(self, X: np.ndarray) -> np.ndarray:
+        return np.take(self.value, self.apply(X), axis=0).mean(axis=0)
+    
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predict like the sklearn forest the arrays were exported from
+        
+        Returns:
+            np.ndarray: Class labels for classifiers, averaged outputs for
+            regressors (1-D for single-output regressors)
+        """
+        mean = self._mean_value(X)
+        if self.is_classifier:
+            return self.classes_[np.argmax(mean, axis=1)]
+        return mean[:, 0] if self.n_outputs_ == 1 else mean
+    
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Averaged class probabilities (classifiers only)"""
+        if not self.is_classifier:
+            raise AttributeError("predict_proba is only available for classifiers")
+        return self._mean_value(X)
+
+class BundleLabelEncoder:
+    """Stand-in for LabelEncoder restored from the stored classes"""
+    
+    def __init__(self, classes: List[str]):
+        self.classes_ = np.asarray(classes)
+    
+    def inverse_transform(self, y) -> np.ndarray:
+        return self.classes_[np.asarray(y, dtype=np.intp)]
+
+def flatten_forest(forest) -> Dict[str, np.ndarray]:
+    """
+    Convert a fitted sklearn forest into flat node arrays
+    
+    Args:
+        forest: Fitted RandomForestRegressor/Classifier (or ExtraTrees)
+    
+    Returns:
+        dict: Arrays named after FOREST_ARRAYS, plus 'classes' for classifiers
+    
+    Raises:
+        ValueError: For multi-output classifiers
+    """
+    is_classifier = hasattr(forest, "classes_")
+    if is_classifier and forest.n_outputs_ != 1:
+        raise ValueError("Multi-output classifiers are not supported")
+    
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        count = tree.node_count
+        is_leaf = tree.children_left == -1
+        own = np.arange(offset, offset + count, dtype=np.int32)
+        
+        features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+        thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+        lefts.append(np.where(is_leaf, own, tree.children_left + offset).astype(np.int32))
+        rights.append(np.where(is_leaf, own, tree.children_right + offset).astype(np.int32))
+        
+        if is_classifier:
+            counts = tree.value[:, 0, :]
+            totals = counts.sum(axis=1, keepdims=True)
+            values.append(counts / np.where(totals == 0, 1, totals))
+        else:
+            values.append(tree.value[:, :, 0])
+        
+        roots.append(offset)
+        offset += count
+    
+    arrays = {
+        "feature": np.concatenate(features),
+        "threshold": np.concatenate(thresholds).astype(np.float64),
+        "left": np.concatenate(lefts),
+        "right": np.concatenate(rights),
+        "value": np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+        "roots": np.asarray(roots, dtype=np.int32),
+    }
+    if is_classifier:
+        arrays["classes"] = np.asarray(forest.classes_)
+    return arrays
+
+def compile_forest(forest) -> FlatForest:
+    """
+    Convert a fitted sklearn forest into an in-memory FlatForest
+    
+    Args:
+        forest: Fitted RandomForestRegressor/Classifier (or ExtraTrees)
+    
+    Returns:
+        FlatForest: Evaluator predicting like `forest`
+    """
+    arrays = flatten_forest(forest)
+    return _flat_forest(arrays, _forest_meta(forest, arrays))
+
+def compile_package(package: dict) -> dict:
+    """
+    Replace the forests of a combined package by FlatForest evaluators
+    
+    Args:
+        package: Combined package with sklearn forests
+    
+    Returns:
+        dict: Shallow copy of the package with compiled forests (kinds
+        missing from the package are skipped)
+    """
+    compiled = dict(package)
+    for kind in MODEL_KINDS:
+        if kind not in package:
+            continue
+        section = dict(package[kind])
+        for role in MODEL_ROLES:
+            section[role] = compile_forest(package[kind][role])
+        compiled[kind] = section
+    return compiled
+
+def compare_packages(expected: dict, actual: dict, start: datetime) -> List[dict]:
+    """
+    Compare the predictions of two packages over a long range of dates
+    
+    Args:
+        expected: Reference package (sklearn forests)
+        actual: Package to check (e.g. compiled or loaded from a bundle)
+        start: First predicted timestamp
+    
+    Returns:
+        list: Per kind, the rows compared, the largest regression error,
+        the number of differing classes and whether it is within tolerance
+        (1e-6 for regression, no class differences)
+    """
+    results = []
+    for kind, count, unit in (("hourly", VERIFY_HOURS, "h"), ("daily", VERIFY_DAYS, "D")):
+        if kind not in expected:
+            continue
+        X = build_feature_matrix(forecast_timestamps(start, count, unit), expected[kind]["feature_columns"])
+        
+        regression = np.asarray(expected[kind]["regressor"].predict(X), dtype=np.float64)
+        max_error = float(np.max(np.abs(regression - actual[kind]["regressor"].predict(X))))
+        mismatches = int(np.sum(expected[kind]["classifier"].predict(X) != actual[kind]["classifier"].predict(X)))
+        
+        results.append({
+            "kind": kind,
+            "rows": count,
+            "max_error": max_error,
+            "mismatches": mismatches,
+            "passed": max_error <= 1e-6 and mismatches == 0,
+        })
+    return results
+
+def _forest_meta(forest, arrays: Dict[str, np.ndarray]) -> dict:
+    return {
+        "max_depth": max(int(estimator.tree_.max_depth) for estimator in forest.estimators_),
+        "n_features": int(forest.n_features_in_),
+        "n_outputs": int(forest.n_outputs_),
+        "n_estimators": len(forest.estimators_),
+        "nodes": int(len(arrays["feature"])),
+        "classes": arrays["classes"].tolist() if "classes" in arrays else None,
+    }
+
+def save_model_bundle(package: dict, directory: str, metadata: Optional[dict] = None) -> dict:
+    """
+    Export a combined model package as a model bundle
+    
+    Args:
+        package: Combined package (see MODEL_GUIDE.md) with sklearn forests
+            or FlatForest evaluators; missing kinds are skipped
+        directory: Output directory (created if missing)
+        metadata: Extra manifest entries (e.g. how the model was compacted)
+    
+    Returns:
+        dict: The written manifest
+    """
+    os.makedirs(directory, exist_ok=True)
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "version": package.get("version", "unknown"),
+        "trained_date": package.get("trained_date", "unknown"),
+        "label_encoders": {},
+        "forests": {},
+        **(metadata or {}),
+    }
+    
+    for kind in MODEL_KINDS:
+        if kind not in package:
+            continue
+        section = package[kind]
+        manifest[kind] = {
+            key: value for key, value in section.items()
+            if key not in MODEL_ROLES
+        }
+        manifest["label_encoders"][kind] = np.asarray(package[f"label_encoder_{kind}"].classes_).tolist()
+        
+        for role in MODEL_ROLES:
+            name = f"{kind}_{role}"
+            forest = section[role]
+            if not isinstance(forest, FlatForest):
+                forest = compile_forest(forest)
+            for array_name in FOREST_ARRAYS:
+                np.save(os.path.join(directory, f"{name}.{array_name}.npy"), getattr(forest, array_name))
+            manifest["forests"][name] = forest.meta
+    
+    # Written last, so a bundle with a manifest is complete
+    with open(os.path.join(directory, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def _flat_forest(arrays: Dict[str, np.ndarray], meta: dict) -> FlatForest:
+    classes = np.asarray(meta["classes"]) if meta["classes"] is not None else None
+    return FlatForest(
+        **{name: arrays[name] for name in FOREST_ARRAYS},
+        max_depth=meta["max_depth"],
+        classes=classes,
+        n_features=meta["n_features"],
+        n_outputs=meta["n_outputs"],
+    )
+
+def _load_array(path: str, mmap: bool) -> np.ndarray:
+    array = np.load(path, mmap_mode="r" if mmap else None, allow_pickle=False)
+    # A plain ndarray view keeps the mapping without np.memmap's subclass
+    # overhead on every indexing result
+    return array.view(np.ndarray)
+
+def load_model_bundle(directory: str, mmap: bool = True) -> dict:
+    """
+    Load a model bundle as a combined package
+    
+    Args:
+        directory: Bundle directory written by save_model_bundle()
+        mmap: Map the node arrays read-only instead of reading them into memory
+    
+    Returns:
+        dict: Combined package with FlatForest models and label encoders
+    
+    Raises:
+        ValueError: If the bundle format is not supported
+    """
+    with open(os.path.join(directory, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"Unsupported model bundle format: {manifest.get('format')}")
+    
+    package = {
+        "version": manifest["version"],
+        "trained_date": manifest["trained_date"],
+    }
+    for kind in MODEL_KINDS:
+        if kind not in manifest:
+            continue
+        section = dict(manifest[kind])
+        for role in MODEL_ROLES:
+            name = f"{kind}_{role}"
+            meta = manifest["forests"][name]
+            arrays = {
+                array_name: _load_array(os.path.join(directory, f"{name}.{array_name}.npy"), mmap)
+                for array_name in FOREST_ARRAYS
+            }
+            section[role] = _flat_forest(arrays, meta)
+        package[kind] = section
+        package[f"label_encoder_{kind}"] = BundleLabelEncoder(manifest["label_encoders"][kind])
+    return package
+
+def is_model_bundle(path: str) -> bool:
+    """Whether a path is a model bundle directory"""
+    return os.path.isfile(os.path.join(path, MANIFEST_FILE))
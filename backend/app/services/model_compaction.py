@@ -0,0 +1,519 @@
+"""
+Offline compaction of the AI model within an accuracy budget
+
+Works on FlatForest evaluators (see model_bundle.py) and writes the
+result as a model bundle. Three reductions are available:
+    
+    dtypes     thresholds become float32 rounded down (lossless for the
+               float32 model inputs), leaf values float32 and feature
+               indices uint8
+    trees      estimators are ranked by greedy forward selection and only
+               the first ones are kept
+    depth      trees are cut at a maximum depth; the cut nodes become
+               leaves predicting their training mean / class mix
+
+Accuracy is measured against historical_dataset (daily observations).
+Trees are ranked and the pruned size is chosen on the older days; the
+budget is then checked on the most recent days, which the selection
+never saw (HistoricalData.split()). Daily forests are scored on the matching day; hourly forests on the mean
+of their 24 predictions (regression) or the most frequent predicted
+condition (classification) of each day. A candidate is accepted if every
+regression target's MAE grows by at most `max_mae_increase` (relative)
+and the classifier accuracy drops by at most `max_accuracy_drop`
+(absolute) compared with the original model.
+"""
+import csv
+import json
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from app.core.database import get_cursor
+from app.services.features import build_feature_matrix
+from app.services.model_bundle import MODEL_KINDS, MODEL_ROLES, FlatForest, compile_forest
+
+HISTORICAL_COLUMNS = (
+    "day", "month", "year", "tempmax", "tempmin", "temp", "humidity", "windspeed",
+    "sealevelpressure", "conditions"
+)
+# historical_dataset column compared with each regression target
+TARGET_COLUMNS = {
+    'daily': {
+        'temp_min': 'tempmin',
+        'temp_max': 'tempmax',
+        'temp_mean': 'temp',
+        'humidity_avg': 'humidity',
+        'windspeed_avg': 'windspeed',
+        'pressure_avg': 'sealevelpressure',
+    },
+    'hourly': {
+        'temp': 'temp',
+        'humidity': 'humidity',
+        'windspeed': 'windspeed',
+        'sealevelpressure': 'sealevelpressure',
+    },
+}
+# Hourly forests are scored on at most this many (evenly spaced) days
+HOURLY_SAMPLE_DAYS = 1500
+
+class HistoricalData:
+    """
+    Daily observations from historical_dataset
+    
+    Args:
+        dates: datetime64[D] per row
+        columns: Numeric columns (NaN where missing)
+        conditions: Observed condition label per row
+    """
+    
+    def __init__(self, dates: np.ndarray, columns: Dict[str, np.ndarray], conditions: np.ndarray):
+        self.dates = dates
+        self.columns = columns
+        self.conditions = conditions
+    
+    def __len__(self) -> int:
+        return len(self.dates)
+    
+    def _subset(self, index) -> "HistoricalData":
+        return HistoricalData(
+            self.dates[index],
+            {name: values[index] for name, values in self.columns.items()},
+            self.conditions[index]
+        )
+    
+    def sample(self, max_days: int) -> "HistoricalData":
+        """Evenly spaced subset of at most `max_days` rows"""
+        if len(self) <= max_days:
+            return self
+        return self._subset(np.linspace(0, len(self) - 1, max_days).astype(np.intp))
+    
+    def split(self, holdout: float) -> Tuple["HistoricalData", "HistoricalData"]:
+        """
+        Split the rows by date into older and most recent ones
+        
+        Args:
+            holdout: Fraction of the rows (the most recent) held out
+        
+        Returns:
+            tuple: (older rows, most recent rows)
+        
+        Raises:
+            ValueError: If either part would be empty
+        """
+        cut = int(round(len(self) * (1 - holdout)))
+        if not 0 < cut < len(self):
+            raise ValueError(f"Cannot hold out {holdout:.0%} of {len(self)} historical rows")
+        return self._subset(slice(None, cut)), self._subset(slice(cut, None))
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+def _historical_data(rows: Iterable[dict], from_year: Optional[int] = None) -> HistoricalData:
+    dates, conditions = [], []
+    columns = {name: [] for name in HISTORICAL_COLUMNS[3:-1]}
+    for row in rows:
+        try:
+            year, month, day = int(row['year']), int(row['month']), int(row['day'])
+            date = np.datetime64(f"{year:04d}-{month:02d}-{day:02d}", 'D')
+        except (TypeError, ValueError):
+            continue
+        if from_year is not None and year < from_year:
+            continue
+        
+        dates.append(date)
+        conditions.append(row.get('conditions') or '')
+        for name, values in columns.items():
+            values.append(_to_float(row.get(name)))
+    
+    if not dates:
+        raise ValueError("No usable historical_dataset rows")
+    order = np.argsort(np.asarray(dates), kind="stable")
+    return HistoricalData(
+        np.asarray(dates)[order],
+        {name: np.asarray(values, dtype=np.float64)[order] for name, values in columns.items()},
+        np.asarray(conditions, dtype=str)[order]
+    )
+
+def read_historical_file(path: str, from_year: Optional[int] = None) -> HistoricalData:
+    """
+    Read historical_dataset rows from a CSV or NDJSON export
+    (GET /historical/export)
+    
+    Args:
+        path: .csv or .ndjson file
+        from_year: Skip rows before this year
+    
+    Returns:
+        HistoricalData: Rows in date order
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            return _historical_data(csv.DictReader(f), from_year)
+        return _historical_data((json.loads(line) for line in f if line.strip()), from_year)
+
+def fetch_historical_data(from_year: Optional[int] = None) -> HistoricalData:
+    """
+    Read historical_dataset rows from the database
+    
+    Args:
+        from_year: Skip rows before this year
+    
+    Returns:
+        HistoricalData: Rows in date order
+    """
+    query = f"SELECT {', '.join(HISTORICAL_COLUMNS)} FROM historical_dataset"
+    params = ()
+    if from_year is not None:
+        query += " WHERE year >= %s"
+        params = (from_year,)
+    
+    with get_cursor() as cursor:
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+    return _historical_data((dict(zip(HISTORICAL_COLUMNS, row)) for row in rows), from_year)
+
+class ForestEvaluator:
+    """
+    Scores the averaged outputs of a forest against historical_dataset
+    
+    Args:
+        package: Combined package the forest belongs to
+        kind: 'hourly' or 'daily'
+        role: 'regressor' or 'classifier'
+        data: Historical observations
+    
+    Raises:
+        ValueError: If a regression target has no historical_dataset column
+    """
+    
+    def __init__(self, package: dict, kind: str, role: str, data: HistoricalData):
+        self.kind = kind
+        self.role = role
+        section = package[kind]
+        if kind == 'hourly':
+            data = data.sample(HOURLY_SAMPLE_DAYS)
+            timestamps = (data.dates.astype('datetime64[h]')[:, None] + np.arange(24)).ravel()
+        else:
+            timestamps = data.dates
+        self.days = len(data)
+        self.X = build_feature_matrix(timestamps, section['feature_columns'])
+        
+        if role == 'regressor':
+            targets = list(section['target_regression'])
+            missing = [t for t in targets if t not in TARGET_COLUMNS[kind]]
+            if missing:
+                raise ValueError(f"No historical_dataset column for {kind} target(s) {', '.join(missing)}")
+            self.targets = targets
+            self.truth = np.column_stack([data.columns[TARGET_COLUMNS[kind][t]] for t in targets])
+        else:
+            self.labels = np.asarray(package[f'label_encoder_{kind}'].classes_).astype(str)
+            self.truth = data.conditions
+    
+    def tree_outputs(self, forest: FlatForest) -> np.ndarray:
+        """
+        Output of every tree, reduced to one row per day for hourly regressors
+        
+        Returns:
+            np.ndarray: Shape (trees, rows, outputs)
+        """
+        outputs = np.take(forest.value, forest.apply(self.X), axis=0)
+        if self.kind == 'hourly' and self.role == 'regressor':
+            # The daily mean of the tree average is the tree average of the daily means
+            outputs = outputs.reshape(len(outputs), self.days, 24, -1).mean(axis=2)
+        return outputs
+    
+    def metrics(self, mean_output: np.ndarray, classes: Optional[np.ndarray] = None) -> dict:
+        """
+        Compare averaged forest outputs with the observations
+        
+        Args:
+            mean_output: Tree average from tree_outputs(), shape (rows, outputs)
+            classes: Encoded class per output column (classifiers)
+        
+        Returns:
+            dict: {'mae': {target: value}} or {'accuracy': value}
+        """
+        if self.role == 'regressor':
+            errors = np.abs(mean_output.reshape(self.days, -1) - self.truth)
+            return {'mae': {t: float(np.nanmean(errors[:, j])) for j, t in enumerate(self.targets)}}
+        
+        codes = np.asarray(classes)[np.argmax(mean_output, axis=1)].astype(np.intp)
+        if self.kind == 'hourly':
+            # Most frequent hourly condition of each day
+            counts = (codes.reshape(self.days, 24, 1) == np.arange(len(self.labels))).sum(axis=1)
+            codes = np.argmax(counts, axis=1)
+        return {'accuracy': float(np.mean(self.labels[codes] == self.truth))}
+
+def within_budget(metrics: dict, baseline: dict, max_mae_increase: float, max_accuracy_drop: float) -> bool:
+    """Whether metrics stay within the budget relative to the baseline"""
+    if 'mae' in metrics:
+        return all(
+            metrics['mae'][t] <= baseline['mae'][t] * (1 + max_mae_increase) + 1e-12
+            for t in metrics['mae']
+        )
+    return metrics['accuracy'] >= baseline['accuracy'] - max_accuracy_drop - 1e-12
+
+def _loss(metrics: dict, baseline: dict) -> float:
+    if 'mae' in metrics:
+        return float(np.mean([metrics['mae'][t] / max(baseline['mae'][t], 1e-12) for t in metrics['mae']]))
+    return -metrics['accuracy']
+
+def greedy_tree_order(outputs: np.ndarray, evaluator: ForestEvaluator, baseline: dict, classes=None) -> List[int]:
+    """
+    Rank trees by greedy forward selection
+    
+    Each step adds the tree whose addition gives the best score, so the
+    first k trees of the order are a good k-tree forest.
+    
+    Args:
+        outputs: Per-tree outputs from ForestEvaluator.tree_outputs()
+        evaluator: Scores averaged outputs
+        baseline: Metrics of the full model (for normalizing MAEs)
+        classes: Encoded class per output column (classifiers)
+    
+    Returns:
+        list: Tree indices, best first
+    """
+    remaining = list(range(len(outputs)))
+    order: List[int] = []
+    total = np.zeros_like(outputs[0])
+    while remaining:
+        scores = [
+            _loss(evaluator.metrics((total + outputs[t]) / (len(order) + 1), classes), baseline)
+            for t in remaining
+        ]
+        best = remaining.pop(int(np.argmin(scores)))
+        order.append(best)
+        total += outputs[best]
+    return order
+
+def prune_forest(forest: FlatForest, trees: Sequence[int], max_depth: Optional[int] = None) -> FlatForest:
+    """
+    Keep some trees of a forest and cut them at a depth
+    
+    Nodes at `max_depth` become leaves predicting their stored value;
+    unreachable nodes are removed and every tree is stored contiguously.
+    
+    Args:
+        forest: Forest to prune
+        trees: Indices of the trees to keep, in the order to store them
+        max_depth: Depth limit (default: keep the full depth)
+    
+    Returns:
+        FlatForest: The pruned forest
+    """
+    limit = forest.max_depth if max_depth is None else min(max_depth, forest.max_depth)
+    kept, depths, roots = [], [], []
+    offset = 0
+    for tree in trees:
+        levels = [forest.roots[tree:tree + 1]]
+        while len(levels) <= limit:
+            frontier = levels[-1]
+            internal = frontier[forest.left[frontier] != frontier]
+            if not internal.size:
+                break
+            levels.append(np.concatenate([forest.left[internal], forest.right[internal]]))
+        nodes = np.concatenate(levels)
+        kept.append(nodes)
+        depths.append(np.repeat(np.arange(len(levels)), [len(level) for level in levels]))
+        roots.append(offset)
+        offset += len(nodes)
+    
+    old = np.concatenate(kept)
+    depth = np.concatenate(depths)
+    new = np.arange(len(old), dtype=np.int32)
+    position = np.zeros(len(forest.feature), dtype=np.int32)
+    position[old] = new
+    
+    is_leaf = (forest.left[old] == old) | (depth >= limit)
+    return FlatForest(
+        feature=np.where(is_leaf, 0, forest.feature[old]).astype(forest.feature.dtype),
+        threshold=np.where(is_leaf, np.inf, forest.threshold[old]).astype(forest.threshold.dtype),
+        left=np.where(is_leaf, new, position[forest.left[old]]).astype(np.int32),
+        right=np.where(is_leaf, new, position[forest.right[old]]).astype(np.int32),
+        value=np.ascontiguousarray(forest.value[old]),
+        roots=np.asarray(roots, dtype=np.int32),
+        max_depth=int(depth.max()),
+        classes=forest.classes_,
+        n_features=forest.n_features_in_,
+        n_outputs=forest.n_outputs_
+    )
+
+def narrow_forest(forest: FlatForest, values: bool = True) -> FlatForest:
+    """
+    Store a forest in narrower dtypes
+    
+    Thresholds are rounded down to float32: for a float32 input x,
+    x <= t holds exactly when x <= (largest float32 <= t), so splits do
+    not change. Leaf values in float32 change outputs by about 1e-7
+    relative.
+    
+    Args:
+        forest: Forest to narrow
+        values: Also store leaf values as float32
+    
+    Returns:
+        FlatForest: The narrowed forest
+    """
+    threshold = forest.threshold.astype(np.float32)
+    too_high = threshold.astype(np.float64) > forest.threshold
+    threshold[too_high] = np.nextafter(threshold[too_high], np.float32(-np.inf))
+    
+    feature_dtype = np.uint8 if forest.n_features_in_ <= np.iinfo(np.uint8).max else np.int32
+    return FlatForest(
+        feature=forest.feature.astype(feature_dtype),
+        threshold=threshold,
+        left=forest.left,
+        right=forest.right,
+        value=forest.value.astype(np.float32) if values else forest.value,
+        roots=forest.roots,
+        max_depth=forest.max_depth,
+        classes=forest.classes_,
+        n_features=forest.n_features_in_,
+        n_outputs=forest.n_outputs_
+    )
+
+def _mean_metrics(evaluator: ForestEvaluator, forest: FlatForest) -> dict:
+    return evaluator.metrics(evaluator.tree_outputs(forest).mean(axis=0), forest.classes_)
+
+def compact_forest(
+    forest: FlatForest,
+    evaluator: ForestEvaluator,
+    max_mae_increase: float,
+    max_accuracy_drop: float,
+    trees: Optional[int] = None,
+    max_depth: Optional[int] = None,
+    narrow: bool = True,
+    holdout: Optional[ForestEvaluator] = None
+) -> Tuple[FlatForest, dict]:
+    """
+    Find the smallest pruned forest within the accuracy budget
+    
+    Trees are ranked once at full depth. Then, from the full depth down,
+    the shortest prefix of the ranking within budget is taken at each
+    depth, and the search stops at the first depth where even all trees
+    exceed the budget. `trees` and `max_depth` fix a dimension instead of
+    searching it; if nothing fits the budget, the fixed values (or the
+    full forest) are kept and the report says so.
+    
+    Ranking and search only use `evaluator`; the reported metrics and
+    within_budget come from `holdout`, so they are not biased by the
+    selection.
+    
+    Args:
+        forest: Full-precision forest
+        evaluator: Scores the forest on the rows used for the selection
+        max_mae_increase: Allowed relative MAE increase per target
+        max_accuracy_drop: Allowed absolute accuracy drop
+        trees: Keep exactly this many trees
+        max_depth: Cut the trees at exactly this depth
+        narrow: Store the result in narrower dtypes
+        holdout: Scores the forest on held-out rows (default: `evaluator`)
+    
+    Returns:
+        tuple: (compacted forest, report)
+    """
+    baseline = _mean_metrics(evaluator, forest)
+    order = greedy_tree_order(evaluator.tree_outputs(forest), evaluator, baseline, forest.classes_)
+    
+    depths = [max_depth] if max_depth is not None else range(forest.max_depth, 0, -1)
+    best: Optional[Tuple[int, int, int]] = None
+    for depth in depths:
+        pruned = prune_forest(forest, order, depth)
+        outputs = evaluator.tree_outputs(pruned)
+        sizes = np.diff(np.append(pruned.roots, len(pruned.feature)))
+        
+        counts = [trees] if trees is not None else range(1, len(order) + 1)
+        chosen = next((
+            count for count in counts
+            if within_budget(
+                evaluator.metrics(outputs[:count].mean(axis=0), forest.classes_),
+                baseline, max_mae_increase, max_accuracy_drop
+            )
+        ), None)
+        if chosen is None:
+            break
+        
+        nodes = int(sizes[:chosen].sum())
+        if best is None or nodes < best[2]:
+            best = (depth, chosen, nodes)
+    
+    if best is None:
+        best = (max_depth or forest.max_depth, trees or len(order), 0)
+    depth, count, _ = best
+    compacted = prune_forest(forest, order[:count], depth)
+    metrics = _mean_metrics(evaluator, compacted)
+    
+    if narrow:
+        narrowed = narrow_forest(compacted)
+        narrowed_metrics = _mean_metrics(evaluator, narrowed)
+        fits = within_budget(metrics, baseline, max_mae_increase, max_accuracy_drop)
+        if fits and not within_budget(narrowed_metrics, baseline, max_mae_increase, max_accuracy_drop):
+            # float32 leaf values cost the last bit of the budget; keep them wide
+            narrowed = narrow_forest(compacted, values=False)
+            narrowed_metrics = _mean_metrics(evaluator, narrowed)
+        compacted, metrics = narrowed, narrowed_metrics
+    
+    checked = holdout or evaluator
+    checked_baseline = _mean_metrics(checked, forest)
+    checked_metrics = _mean_metrics(checked, compacted)
+    return compacted, {
+        'trees': [forest.n_estimators, compacted.n_estimators],
+        'max_depth': [int(forest.max_depth), int(compacted.max_depth)],
+        'nodes': [int(len(forest.feature)), int(len(compacted.feature))],
+        'nbytes': [int(forest.nbytes), int(compacted.nbytes)],
+        'value_dtype': str(compacted.value.dtype),
+        'threshold_dtype': str(compacted.threshold.dtype),
+        'selection': {'days': evaluator.days, 'baseline': baseline, 'compacted': metrics},
+        'checked_on': 'holdout' if holdout is not None else 'selection',
+        'checked_days': checked.days,
+        'baseline': checked_baseline,
+        'compacted': checked_metrics,
+        'within_budget': within_budget(checked_metrics, checked_baseline, max_mae_increase, max_accuracy_drop),
+    }
+
+def compact_package(
+    package: dict,
+    data: HistoricalData,
+    max_mae_increase: float = 0.02,
+    max_accuracy_drop: float = 0.01,
+    trees: Optional[int] = None,
+    max_depth: Optional[int] = None,
+    narrow: bool = True,
+    holdout: Optional[HistoricalData] = None
+) -> Tuple[dict, Dict[str, dict]]:
+    """
+    Compact every forest of a package
+    
+    Args:
+        package: Combined package with sklearn forests or FlatForest
+        data: Historical observations trees are ranked and selected on
+        max_mae_increase: Allowed relative MAE increase per regression target
+        max_accuracy_drop: Allowed absolute classifier accuracy drop
+        trees: Keep exactly this many trees per forest
+        max_depth: Cut every tree at this depth
+        narrow: Store the forests in narrower dtypes
+        holdout: Observations the budget is checked on (default: `data`,
+            in-sample); see HistoricalData.split()
+    
+    Returns:
+        tuple: (compacted package with FlatForest evaluators, report per forest)
+    """
+    compacted = dict(package)
+    report = {}
+    for kind in MODEL_KINDS:
+        if kind not in package:
+            continue
+        section = dict(package[kind])
+        for role in MODEL_ROLES:
+            forest = section[role]
+            if not isinstance(forest, FlatForest):
+                forest = compile_forest(forest)
+            evaluator = ForestEvaluator(package, kind, role, data)
+            checker = ForestEvaluator(package, kind, role, holdout) if holdout is not None else None
+            section[role], report[f"{kind}_{role}"] = compact_forest(
+                forest, evaluator, max_mae_increase, max_accuracy_drop, trees, max_depth, narrow, checker
+            )
+        compacted[kind] = section
+    return compacted, report
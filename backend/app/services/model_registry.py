@@ -0,0 +1,410 @@
+"""
+Versioned registry of loaded AI models with atomic hot swap
+
+A model can be stored in three layouts:
+    
+    combined  one joblib file holding the combined package (MODEL_GUIDE.md)
+    split     a directory of <kind>_regressor.joblib / <kind>_classifier.joblib
+              files, each a dict with 'model', 'feature_columns' (or
+              'features'), 'target' / 'label_encoder' and 'meta'
+    bundle    a memory-mapped model bundle directory (model_bundle.py)
+
+Every layout is turned into the combined package, checked with a smoke
+test prediction and only then made current. With the 'flat' inference
+engine the sklearn forests are compiled into FlatForest evaluators and
+must predict identically before the model is accepted (bundles always
+use FlatForest). Requests take a reference
+to the current LoadedModel once and use it until they finish, so a swap
+never mixes two models inside one response; the old model is freed when
+its last request is done.
+"""
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+import joblib
+import numpy as np
+from app.services.features import forecast_timestamps, build_feature_matrix
+from app.services.model_bundle import (
+    MODEL_KINDS,
+    MODEL_ROLES,
+    is_model_bundle,
+    load_model_bundle,
+    compile_package,
+    compare_packages
+)
+
+SPLIT_EXTENSIONS = (".joblib", ".pkl")
+INFERENCE_ENGINES = ("sklearn", "flat")
+TARGET_CLASSIFICATION = {
+    'hourly': 'conditions',
+    'daily': 'conditions_dominant',
+}
+# Rows predicted by the smoke test
+SMOKE_TEST_START = datetime(2025, 1, 1)
+SMOKE_TEST_ROWS = {
+    'hourly': (24, 'h'),
+    'daily': (7, 'D'),
+}
+
+class LoadedModel:
+    """
+    A validated model package and its metadata
+    
+    Attributes:
+        package: Combined package
+        model_id: Unique version key (package version, training date and file fingerprint)
+        layout: 'combined', 'split' or 'bundle'
+        engine: 'sklearn' or 'flat' (forests evaluated by FlatForest)
+        path: File or directory the model was loaded from
+        fingerprint: Hash of the model files' names, sizes and modification times
+        loaded_at: Time the model was loaded
+        load_seconds: Time spent loading and validating
+        forecast_tables: Precomputed forecast tables of this model
+        cold_ms: Latency of the first prediction per kind (smoke test)
+        warmup: Latency of the warm-up predictions
+    """
+    
+    def __init__(
+        self,
+        package: dict,
+        layout: str,
+        path: str,
+        fingerprint: str,
+        load_seconds: float,
+        cold_ms: Optional[Dict[str, float]] = None,
+        engine: str = 'sklearn'
+    ):
+        self.package = package
+        self.layout = layout
+        self.engine = engine
+        self.path = path
+        self.fingerprint = fingerprint
+        self.load_seconds = load_seconds
+        self.cold_ms = cold_ms or {}
+        self.loaded_at = datetime.now()
+        self.forecast_tables: Dict[str, object] = {}
+        self.warmup: List[dict] = []
+        self.model_id = f"{self.version}@{self.trained_date}#{fingerprint[:8]}"
+    
+    @property
+    def version(self) -> str:
+        return str(self.package.get('version', 'unknown'))
+    
+    @property
+    def trained_date(self) -> str:
+        return str(self.package.get('trained_date', 'unknown'))
+    
+    @property
+    def kinds(self) -> List[str]:
+        """Prediction kinds ('hourly', 'daily') the package provides"""
+        return [kind for kind in MODEL_KINDS if kind in self.package]
+    
+    def describe(self) -> dict:
+        return {
+            'model_id': self.model_id,
+            'version': self.version,
+            'trained_date': self.trained_date,
+            'layout': self.layout,
+            'engine': self.engine,
+            'path': self.path,
+            'kinds': self.kinds,
+            'loaded_at': self.loaded_at.isoformat(timespec='seconds'),
+            'load_seconds': round(self.load_seconds, 3),
+        }
+
+def model_fingerprint(path: str) -> str:
+    """
+    Hash the names, sizes and modification times of the model files
+    
+    Args:
+        path: Model file or directory
+    
+    Returns:
+        str: Hex digest that changes when any model file is replaced
+    """
+    if os.path.isdir(path):
+        files = sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if os.path.isfile(os.path.join(path, name))
+        )
+    else:
+        files = [path]
+    
+    digest = hashlib.sha256()
+    for file_path in files:
+        stat = os.stat(file_path)
+        digest.update(f"{os.path.basename(file_path)}:{stat.st_size}:{stat.st_mtime_ns};".encode("utf-8"))
+    return digest.hexdigest()
+
+def _split_file(directory: str, kind: str, role: str) -> Optional[str]:
+    for extension in SPLIT_EXTENSIONS:
+        path = os.path.join(directory, f"{kind}_{role}{extension}")
+        if os.path.isfile(path):
+            return path
+    return None
+
+def load_split_package(directory: str) -> dict:
+    """
+    Build a combined package from per-model files
+    
+    Args:
+        directory: Directory with <kind>_regressor / <kind>_classifier files
+    
+    Returns:
+        dict: Combined package with the kinds that have both files
+    
+    Raises:
+        ValueError: If no kind has both a regressor and a classifier
+    """
+    package = {}
+    for kind in MODEL_KINDS:
+        paths = {role: _split_file(directory, kind, role) for role in MODEL_ROLES}
+        if not all(paths.values()):
+            continue
+        
+        regressor = joblib.load(paths['regressor'])
+        classifier = joblib.load(paths['classifier'])
+        package[kind] = {
+            'regressor': regressor['model'],
+            'classifier': classifier['model'],
+            'feature_columns': list(regressor.get('feature_columns') or regressor['features']),
+            'target_regression': list(regressor['target']),
+            'target_classification': TARGET_CLASSIFICATION[kind],
+        }
+        package[f'label_encoder_{kind}'] = classifier['label_encoder']
+        
+        meta = regressor.get('meta') or {}
+        package.setdefault('version', meta.get('version', 'unknown'))
+        package.setdefault('trained_date', str(meta.get('trained_date_utc', 'unknown'))[:10])
+    
+    if not any(kind in package for kind in MODEL_KINDS):
+        raise ValueError(f"No <kind>_regressor/<kind>_classifier pair found in {directory}")
+    return package
+
+def detect_layout(path: str) -> str:
+    """Get the layout of a model file or directory"""
+    if os.path.isdir(path):
+        return 'bundle' if is_model_bundle(path) else 'split'
+    return 'combined'
+
+def load_package(path: str, mmap: bool = True) -> Tuple[dict, str]:
+    """
+    Load a model in any supported layout
+    
+    Args:
+        path: Model file or directory
+        mmap: Memory-map bundle arrays
+    
+    Returns:
+        tuple: (combined package, layout)
+    """
+    layout = detect_layout(path)
+    if layout == 'bundle':
+        return load_model_bundle(path, mmap=mmap), layout
+    if layout == 'split':
+        return load_split_package(path), layout
+    return joblib.load(path), layout
+
+def smoke_test(package: dict) -> Dict[str, float]:
+    """
+    Check that a package predicts sensible output for a fixed input
+    
+    These are the first predictions of a freshly loaded model, so their
+    latency is the cold latency (lazy initialization, page faults).
+    
+    Returns:
+        dict: Milliseconds of the first prediction per kind
+    
+    Raises:
+        ValueError: If a section is missing keys or its predictions have
+            the wrong shape, non-finite values or unknown condition codes
+    """
+    kinds = [kind for kind in MODEL_KINDS if kind in package]
+    if not kinds:
+        raise ValueError("Model package has neither an hourly nor a daily section")
+    
+    cold_ms = {}
+    for kind in kinds:
+        section = package[kind]
+        missing = [key for key in ('regressor', 'classifier', 'feature_columns', 'target_regression') if key not in section]
+        if missing or f'label_encoder_{kind}' not in package:
+            raise ValueError(f"{kind} section is incomplete (missing {', '.join(missing) or 'label encoder'})")
+        
+        rows, unit = SMOKE_TEST_ROWS[kind]
+        started = time.perf_counter()
+        X = build_feature_matrix(forecast_timestamps(SMOKE_TEST_START, rows, unit), section['feature_columns'])
+        regression = np.asarray(section['regressor'].predict(X), dtype=np.float64).reshape(rows, -1)
+        codes = np.asarray(section['classifier'].predict(X)).astype(int)
+        cold_ms[kind] = round((time.perf_counter() - started) * 1000, 2)
+        
+        if regression.shape[1] != len(section['target_regression']):
+            raise ValueError(
+                f"{kind} regressor returns {regression.shape[1]} targets, expected {len(section['target_regression'])}"
+            )
+        if not np.all(np.isfinite(regression)):
+            raise ValueError(f"{kind} regressor returns non-finite values")
+        classes = len(package[f'label_encoder_{kind}'].classes_)
+        if codes.shape != (rows,) or codes.min() < 0 or codes.max() >= classes:
+            raise ValueError(f"{kind} classifier returns codes outside the {classes} known conditions")
+    return cold_ms
+
+class ModelRegistry:
+    """
+    Holds the current model and the history of loaded versions
+    
+    Args:
+        history_size: Number of previously loaded versions to remember
+    """
+    
+    def __init__(self, history_size: int = 10):
+        self.history_size = history_size
+        self._current: Optional[LoadedModel] = None
+        self._history: List[dict] = []
+        self._lock = threading.Lock()
+    
+    @property
+    def current(self) -> Optional[LoadedModel]:
+        """The model new requests should use (a plain attribute read, no lock)"""
+        return self._current
+    
+    def activate(self, model: LoadedModel) -> Optional[LoadedModel]:
+        """
+        Make a validated model current
+        
+        Returns:
+            LoadedModel: The previously current model, if any
+        """
+        with self._lock:
+            previous = self._current
+            self._current = model
+            self._history.append(model.describe())
+            del self._history[:-self.history_size]
+        return previous
+    
+    def record_failure(self, path: str, error: str) -> None:
+        """Remember a load that failed validation"""
+        with self._lock:
+            self._history.append({
+                'path': path,
+                'error': error,
+                'failed_at': datetime.now().isoformat(timespec='seconds'),
+            })
+            del self._history[:-self.history_size]
+    
+    def history(self) -> List[dict]:
+        """Loaded versions, newest first, with the current one marked active"""
+        with self._lock:
+            current_id = self._current.model_id if self._current else None
+            entries = [dict(entry) for entry in reversed(self._history)]
+        active_seen = False
+        for entry in entries:
+            entry['active'] = not active_seen and entry.get('model_id') == current_id
+            active_seen = active_seen or entry['active']
+        return entries
+
+class ModelWatcher:
+    """
+    Background thread that reloads the model when its files change
+    
+    A change is only acted on once the fingerprint has been stable for
+    one more interval, so half-copied files are not loaded.
+    
+    Args:
+        path: Callable returning the model path to watch
+        reload: Callable invoked (in the watcher thread) after a change
+        interval: Seconds between checks
+    """
+    
+    def __init__(self, path: Callable[[], str], reload: Callable[[], None], interval: float = 10.0):
+        self.path = path
+        self.reload = reload
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self, fingerprint: Optional[str]) -> None:
+        """Start watching, treating `fingerprint` as the loaded state"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(fingerprint,), name="model-watcher", daemon=True)
+        self._thread.start()
+    
+    def _run(self, loaded: Optional[str]) -> None:
+        candidate = None
+        while not self._stop.wait(self.interval):
+            try:
+                current = model_fingerprint(self.path())
+            except OSError:
+                # Files are being replaced; look again next time
+                candidate = None
+                continue
+            
+            if current == loaded:
+                candidate = None
+            elif current != candidate:
+                candidate = current
+            else:
+                candidate = None
+                loaded = current
+                try:
+                    self.reload()
+                except Exception as e:
+                    print(f"✗ Model reload after file change failed: {e}")
+    
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+def compile_flat(package: dict) -> dict:
+    """
+    Compile the sklearn forests of a package and check them
+    
+    Returns:
+        dict: Package with FlatForest evaluators
+    
+    Raises:
+        ValueError: If the compiled forests predict differently from sklearn
+    """
+    compiled = compile_package(package)
+    for result in compare_packages(package, compiled, SMOKE_TEST_START):
+        if not result['passed']:
+            raise ValueError(
+                f"Flat {result['kind']} forests differ from sklearn (max error {result['max_error']:.2e}, "
+                f"{result['mismatches']} class mismatches)"
+            )
+    return compiled
+
+def load_model(path: str, mmap: bool = True, engine: str = 'sklearn') -> LoadedModel:
+    """
+    Load and validate a model without activating it
+    
+    Args:
+        path: Model file or directory
+        mmap: Memory-map bundle arrays
+        engine: 'sklearn' or 'flat' (compile the forests into FlatForest)
+    
+    Returns:
+        LoadedModel: A model that passed the smoke test
+    
+    Raises:
+        ValueError: If the engine is unknown, the compiled forests differ
+            from sklearn or the model fails the smoke test
+    """
+    if engine not in INFERENCE_ENGINES:
+        raise ValueError(f"Unknown inference engine '{engine}', expected one of {', '.join(INFERENCE_ENGINES)}")
+    
+    started = time.perf_counter()
+    fingerprint = model_fingerprint(path)
+    package, layout = load_package(path, mmap=mmap)
+    if layout == 'bundle':
+        engine = 'flat'
+    elif engine == 'flat':
+        package = compile_flat(package)
+    cold_ms = smoke_test(package)
+    return LoadedModel(package, layout, path, fingerprint, time.perf_counter() - started, cold_ms, engine)
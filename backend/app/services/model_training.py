@@ -0,0 +1,406 @@
+"""
+Offline training of the combined AI model package
+
+Reads the training data straight from MySQL through an unbuffered
+server-side cursor (SSCursor), a chunk at a time, keeping only compact
+NumPy arrays of what was read:
+    
+    daily   historical_dataset rows (one per day)
+    hourly  weather_data readings averaged per hour (optional); the
+            sensors report rain but not cloud cover, so the hourly
+            conditions are 'Rain' or 'Clear'
+
+The forests are trained like the final models of
+ml-models/model_training.ipynb (random forests on the date features,
+balanced classifier, all cores) and returned as the combined package
+described in MODEL_GUIDE.md.
+
+The package records a watermark of the data it has seen (last
+historical_dataset id, end of the last weather_data hour). An incremental
+run reads only newer rows and adds trees fitted on them to the existing
+forests (sklearn warm start), so a nightly refresh costs a few trees
+instead of a full retrain. Trees fitted on new rows only can pull the
+forest away from the rest of the history, so the most recent new rows
+are held out and the extended forests must score no worse than the
+previous ones on them (evaluate_section()).
+"""
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from MySQLdb.cursors import SSCursor
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.preprocessing import LabelEncoder
+from sklearn.utils.class_weight import compute_sample_weight
+from app.core.database import db_pool
+from app.services.features import build_feature_matrix
+from app.services.model_bundle import MODEL_KINDS
+
+MODEL_VERSION = "4.0"
+FEATURE_COLUMNS = {
+    'hourly': ['day', 'month', 'year', 'hour'],
+    'daily': ['day', 'month', 'year'],
+}
+TARGET_CLASSIFICATION = {
+    'hourly': 'conditions',
+    'daily': 'conditions_dominant',
+}
+# Model target -> source column
+DAILY_TARGETS = {
+    'temp_min': 'tempmin',
+    'temp_max': 'tempmax',
+    'temp_mean': 'temp',
+    'humidity_avg': 'humidity',
+    'windspeed_avg': 'windspeed',
+    'pressure_avg': 'sealevelpressure',
+}
+HOURLY_TARGETS = {
+    'temp': 'temp',
+    'humidity': 'humidity',
+    'windspeed': 'windSpeed',
+    'sealevelpressure': 'airPressure',
+}
+# Share of rainy readings that makes an hour 'Rain'
+RAIN_FRACTION = 0.5
+
+class TrainingData:
+    """
+    Training rows of one model kind
+    
+    Args:
+        timestamps: datetime64 per row ('D' for daily, 'h' for hourly)
+        targets: Regression targets, shape (rows, len(target_regression))
+        conditions: Condition label per row
+        watermark: Position in the source table after these rows
+    """
+    
+    def __init__(self, timestamps: np.ndarray, targets: np.ndarray, conditions: np.ndarray, watermark):
+        self.timestamps = timestamps
+        self.targets = targets
+        self.conditions = conditions
+        self.watermark = watermark
+    
+    def __len__(self) -> int:
+        return len(self.timestamps)
+    
+    def split(self, holdout: float) -> Tuple["TrainingData", "TrainingData"]:
+        """
+        Split the rows in read order into older and most recent ones
+        
+        Args:
+            holdout: Fraction of the rows (the most recent) held out
+        
+        Returns:
+            tuple: (older rows, most recent rows); both share the watermark
+        
+        Raises:
+            ValueError: If either part would be empty
+        """
+        cut = int(round(len(self) * (1 - holdout)))
+        if not 0 < cut < len(self):
+            raise ValueError(f"Cannot hold out {holdout:.0%} of {len(self)} new rows")
+        return tuple(
+            TrainingData(self.timestamps[part], self.targets[part], self.conditions[part], self.watermark)
+            for part in (slice(None, cut), slice(cut, None))
+        )
+
+def stream_rows(query: str, params: tuple, chunk_rows: int = 5000) -> Iterator[List[tuple]]:
+    """
+    Run a query on a server-side cursor and yield its rows in chunks
+    
+    The connection is returned to the pool once every row was read and
+    discarded if the caller stops early or a read fails.
+    
+    Args:
+        query: SELECT statement
+        params: Query parameters
+        chunk_rows: Rows per chunk
+    
+    Yields:
+        list: Up to `chunk_rows` result rows
+    """
+    conn = db_pool.acquire()
+    discard = True
+    try:
+        cursor = conn.cursor(SSCursor)
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            yield rows
+        cursor.close()
+        conn.rollback()
+        discard = False
+    finally:
+        db_pool.release(conn, discard=discard)
+
+def _date(year, month, day) -> np.datetime64:
+    try:
+        return np.datetime64(date(year, month, day), 'D')
+    except (TypeError, ValueError):
+        return np.datetime64('NaT', 'D')
+
+def _float_column(rows: List[tuple], index: int) -> np.ndarray:
+    return np.array([np.nan if row[index] is None else row[index] for row in rows], dtype=np.float64)
+
+def read_daily_data(after_id: int = 0, from_year: Optional[int] = None, chunk_rows: int = 5000) -> TrainingData:
+    """
+    Read historical_dataset rows for the daily models
+    
+    Rows with an invalid date, a missing value or no condition are skipped.
+    
+    Args:
+        after_id: Only read rows with a larger id
+        from_year: Skip rows before this year
+        chunk_rows: Rows fetched per chunk
+    
+    Returns:
+        TrainingData: Daily rows; the watermark is the largest id read
+    """
+    columns = list(DAILY_TARGETS.values())
+    query = (
+        f"SELECT id, year, month, day, {', '.join(columns)}, conditions "
+        "FROM historical_dataset WHERE id > %s"
+    )
+    params: tuple = (after_id,)
+    if from_year is not None:
+        query += " AND year >= %s"
+        params += (from_year,)
+    query += " ORDER BY id"
+    
+    dates, targets, conditions = [], [], []
+    last_id = after_id
+    for rows in stream_rows(query, params, chunk_rows):
+        last_id = max(last_id, max(row[0] for row in rows))
+        chunk_dates = np.array([_date(row[1], row[2], row[3]) for row in rows], dtype="datetime64[D]")
+        values = np.column_stack([_float_column(rows, 4 + j) for j in range(len(columns))])
+        labels = np.array([row[-1] or "" for row in rows], dtype=object)
+        keep = ~np.isnat(chunk_dates) & np.all(np.isfinite(values), axis=1) & (labels != "")
+        
+        dates.append(chunk_dates[keep])
+        targets.append(values[keep])
+        conditions.append(labels[keep])
+    
+    if not dates:
+        return TrainingData(np.empty(0, "datetime64[D]"), np.empty((0, len(columns))), np.empty(0, object), last_id)
+    return TrainingData(np.concatenate(dates), np.concatenate(targets), np.concatenate(conditions), last_id)
+
+def read_hourly_data(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    location: Optional[str] = None,
+    chunk_rows: int = 5000
+) -> TrainingData:
+    """
+    Read weather_data readings and average them per hour
+    
+    Each chunk is reduced to per-hour sums right away, so memory grows
+    with the number of hours, not readings.
+    
+    Args:
+        since: First hour to read (default: all readings)
+        until: End of the last hour to read (default: start of the current hour)
+        location: Only use readings of this location (default: all)
+        chunk_rows: Readings fetched per chunk
+    
+    Returns:
+        TrainingData: Hourly rows; the watermark is `until`
+    """
+    until = until or datetime.now().replace(minute=0, second=0, microsecond=0)
+    columns = list(HOURLY_TARGETS.values())
+    query = f"SELECT createAt, {', '.join(columns)}, isRaining FROM weather_data WHERE createAt < %s"
+    params: tuple = (until,)
+    if since is not None:
+        query += " AND createAt >= %s"
+        params += (since,)
+    if location:
+        query += " AND location = %s"
+        params += (location,)
+    
+    hours, counts, sums = [], [], []
+    for rows in stream_rows(query, params, chunk_rows):
+        keys, inverse = np.unique(np.array([row[0] for row in rows], dtype="datetime64[h]"), return_inverse=True)
+        values = np.column_stack([_float_column(rows, 1 + j) for j in range(len(columns) + 1)])
+        hours.append(keys)
+        counts.append(np.bincount(inverse, minlength=len(keys)))
+        sums.append(np.column_stack([
+            np.bincount(inverse, weights=values[:, j], minlength=len(keys)) for j in range(values.shape[1])
+        ]))
+    
+    if not hours:
+        return TrainingData(np.empty(0, "datetime64[h]"), np.empty((0, len(columns))), np.empty(0, object), until)
+    
+    # The same hour can span two chunks
+    keys, inverse = np.unique(np.concatenate(hours), return_inverse=True)
+    count = np.bincount(inverse, weights=np.concatenate(counts))
+    total = np.concatenate(sums)
+    means = np.column_stack([
+        np.bincount(inverse, weights=total[:, j], minlength=len(keys)) for j in range(total.shape[1])
+    ]) / count[:, None]
+    keep = np.all(np.isfinite(means), axis=1)
+    conditions = np.where(means[:, -1] >= RAIN_FRACTION, "Rain", "Clear").astype(object)
+    return TrainingData(keys[keep], means[keep, :-1], conditions[keep], until)
+
+def new_forests(n_estimators: int, max_depth: Optional[int], seed: int) -> Tuple[RandomForestRegressor, RandomForestClassifier]:
+    """Untrained regressor and classifier configured like the notebook's final models"""
+    params = dict(n_estimators=n_estimators, max_depth=max_depth, random_state=seed, n_jobs=-1)
+    return RandomForestRegressor(**params), RandomForestClassifier(class_weight='balanced', **params)
+
+def train_section(
+    kind: str,
+    data: TrainingData,
+    n_estimators: int = 100,
+    max_depth: Optional[int] = None,
+    seed: int = 42
+) -> Tuple[dict, LabelEncoder]:
+    """
+    Train the regressor and classifier of one kind from scratch
+    
+    Args:
+        kind: 'hourly' or 'daily'
+        data: Training rows
+        n_estimators: Trees per forest
+        max_depth: Depth limit of the trees
+        seed: Random state
+    
+    Returns:
+        tuple: (package section, label encoder)
+    """
+    encoder = LabelEncoder()
+    codes = encoder.fit_transform(data.conditions.astype(str))
+    X = build_feature_matrix(data.timestamps, FEATURE_COLUMNS[kind])
+    
+    regressor, classifier = new_forests(n_estimators, max_depth, seed)
+    regressor.fit(X, data.targets)
+    classifier.fit(X, codes)
+    return {
+        'regressor': regressor,
+        'classifier': classifier,
+        'feature_columns': list(FEATURE_COLUMNS[kind]),
+        'target_regression': list(DAILY_TARGETS if kind == 'daily' else HOURLY_TARGETS),
+        'target_classification': TARGET_CLASSIFICATION[kind],
+    }, encoder
+
+def extend_section(section: dict, encoder: LabelEncoder, data: TrainingData, add_trees: int) -> dict:
+    """
+    Add trees fitted on new rows to a trained section (warm start)
+    
+    The forests are extended in place; their existing trees are not
+    changed. The classifier must keep its classes, so classes absent
+    from the new rows are passed as zero-weight rows, which have no
+    influence on the new trees. Its class weights are computed from the
+    new rows alone.
+    
+    Args:
+        section: Section of the current package (sklearn forests)
+        encoder: Label encoder of the section
+        data: New rows
+        add_trees: Trees to add to each forest
+    
+    Returns:
+        dict: Section with the extended forests
+    
+    Raises:
+        ValueError: If the section has no sklearn forests or the new rows
+            have a condition the classifier does not know
+    """
+    regressor, classifier = section['regressor'], section['classifier']
+    if not isinstance(regressor, RandomForestRegressor) or not isinstance(classifier, RandomForestClassifier):
+        raise ValueError("Incremental training needs the sklearn forests of a joblib or split model")
+    
+    known = set(encoder.classes_.astype(str))
+    unknown = sorted(set(data.conditions.astype(str)) - known)
+    if unknown:
+        raise ValueError(f"New condition(s) {', '.join(unknown)} need a full retrain")
+    
+    X = build_feature_matrix(data.timestamps, section['feature_columns'])
+    codes = encoder.transform(data.conditions.astype(str))
+    missing = np.setdiff1d(classifier.classes_, codes)
+    # Class weights are applied here, since the classifier would count the zero-weight rows
+    weights = np.concatenate([compute_sample_weight(classifier.class_weight, codes), np.zeros(missing.size)])
+    X_classes = np.vstack([X, np.repeat(X[:1], missing.size, axis=0)])
+    codes = np.concatenate([codes, missing.astype(codes.dtype)])
+    
+    class_weight = classifier.class_weight
+    for forest, X_fit, y, sample_weight, params in (
+        (regressor, X, data.targets, None, {}),
+        (classifier, X_classes, codes, weights, {'class_weight': None}),
+    ):
+        forest.set_params(warm_start=True, n_estimators=len(forest.estimators_) + add_trees, n_jobs=-1, **params)
+        forest.fit(X_fit, y, sample_weight=sample_weight)
+        forest.set_params(warm_start=False)
+    classifier.set_params(class_weight=class_weight)
+    return section
+
+def evaluate_section(section: dict, encoder: LabelEncoder, data: TrainingData) -> Dict[str, dict]:
+    """
+    Score the forests of a section on rows they were not fitted on
+    
+    Args:
+        section: Package section (sklearn forests or FlatForest)
+        encoder: Label encoder of the section
+        data: Rows to score on
+    
+    Returns:
+        dict: {'regressor': {'mae': {target: value}}, 'classifier': {'accuracy': value}}
+        (the metrics format of model_compaction.within_budget())
+    """
+    X = build_feature_matrix(data.timestamps, section['feature_columns'])
+    predicted = np.asarray(section['regressor'].predict(X), dtype=np.float64).reshape(len(X), -1)
+    errors = np.abs(predicted - data.targets)
+    labels = encoder.inverse_transform(np.asarray(section['classifier'].predict(X), dtype=np.intp))
+    return {
+        'regressor': {'mae': {
+            target: float(np.nanmean(errors[:, j])) for j, target in enumerate(section['target_regression'])
+        }},
+        'classifier': {'accuracy': float(np.mean(labels.astype(str) == data.conditions.astype(str)))},
+    }
+
+def training_watermark(package: dict) -> dict:
+    """
+    Watermark of the data a package was trained on
+    
+    Returns:
+        dict: 'historical_dataset_id' and 'weather_data_until' (None if unknown)
+    """
+    training = package.get('training') or {}
+    return {
+        'historical_dataset_id': training.get('historical_dataset_id'),
+        'weather_data_until': training.get('weather_data_until'),
+    }
+
+def build_package(
+    sections: Dict[str, Tuple[dict, LabelEncoder]],
+    base: Optional[dict],
+    training: dict,
+    version: Optional[str] = None
+) -> dict:
+    """
+    Assemble a combined package
+    
+    Kinds that were not trained are taken over from `base`.
+    
+    Args:
+        sections: (section, label encoder) per trained kind
+        base: Previous package, if any
+        training: Metadata of this run (stored under 'training')
+        version: Model version (default: the base version or MODEL_VERSION)
+    
+    Returns:
+        dict: Combined package (MODEL_GUIDE.md)
+    """
+    package = {}
+    for kind in MODEL_KINDS:
+        if kind in sections:
+            package[kind], package[f'label_encoder_{kind}'] = sections[kind]
+        elif base is not None and kind in base:
+            package[kind], package[f'label_encoder_{kind}'] = base[kind], base[f'label_encoder_{kind}']
+    if not any(kind in package for kind in MODEL_KINDS):
+        raise ValueError("No training data for either model kind")
+    
+    runs = list(((base or {}).get('training') or {}).get('runs', []))
+    runs.append({key: training[key] for key in ('mode', 'trained_date', 'rows', 'trees')})
+    package['version'] = version or (base or {}).get('version', MODEL_VERSION)
+    package['trained_date'] = training['trained_date']
+    package['training'] = {**training, 'runs': runs}
+    return package
@@ -0,0 +1,179 @@
+"""
+In-process LRU/TTL cache for AI prediction results
+
+Entries are prediction windows (a start timestamp plus a number of
+evenly spaced rows) keyed by the model version that produced them, so
+requests still running on a previous model after a hot swap never read
+or overwrite entries of the new one. A request whose window lies inside
+a cached window of the same version is answered by slicing the cached
+arrays.
+"""
+import threading
+import time
+import numpy as np
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+class PredictionCache:
+    """
+    Bounded, thread-safe cache of prediction windows
+    
+    Args:
+        max_entries: Maximum number of cached windows (0 disables the cache)
+        ttl_seconds: Lifetime of an entry in seconds (0 means no expiry)
+    """
+    
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+        # Keys of the cached windows per (kind, model version), so a slice
+        # lookup only scans the windows it could be cut from
+        self._windows: dict = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.slice_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+    
+    def _is_expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - stored_at > self.ttl_seconds
+    
+    def _remove(self, key: tuple) -> None:
+        """Remove an entry and its index key (caller holds the lock)"""
+        del self._entries[key]
+        windows = self._windows[key[:2]]
+        del windows[key]
+        if not windows:
+            del self._windows[key[:2]]
+    
+    def get(
+        self,
+        kind: str,
+        model_version: str,
+        start: datetime,
+        count: int,
+        step: timedelta
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Look up a prediction window
+        
+        Args:
+            kind: Prediction kind ('hourly' or 'daily')
+            model_version: Version of the model answering the request
+            start: Timestamp of the first requested row
+            count: Number of requested rows
+            step: Distance between rows
+        
+        Returns:
+            tuple: (regression, conditions) arrays, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        
+        now = time.monotonic()
+        with self._lock:
+            # Exact match first
+            key = (kind, model_version, start, count)
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._is_expired(entry[0], now):
+                    self._remove(key)
+                    self.expirations += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1], entry[2]
+            
+            # Otherwise slice a cached window of this version that covers the request
+            found, expired = None, []
+            for cached_key in self._windows.get((kind, model_version), ()):
+                stored_at, regression, conditions = self._entries[cached_key]
+                if self._is_expired(stored_at, now):
+                    expired.append(cached_key)
+                    continue
+                cached_start, cached_count = cached_key[2:]
+                if cached_count < count:
+                    continue
+                offset, remainder = divmod(start - cached_start, step)
+                if remainder or offset < 0 or offset + count > cached_count:
+                    continue
+                found = cached_key, regression[offset:offset + count], conditions[offset:offset + count]
+                break
+            
+            for cached_key in expired:
+                self._remove(cached_key)
+            self.expirations += len(expired)
+            if found is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(found[0])
+            self.slice_hits += 1
+            return found[1], found[2]
+    
+    def put(
+        self,
+        kind: str,
+        model_version: str,
+        start: datetime,
+        count: int,
+        regression: np.ndarray,
+        conditions: np.ndarray
+    ) -> None:
+        """Store a prediction window, evicting the least recently used ones"""
+        if not self.enabled:
+            return
+        
+        with self._lock:
+            key = (kind, model_version, start, count)
+            self._entries[key] = (time.monotonic(), regression, conditions)
+            self._entries.move_to_end(key)
+            self._windows.setdefault(key[:2], {})[key] = None
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+    
+    def invalidate(self, keep_version: Optional[str] = None) -> None:
+        """
+        Remove cached entries
+        
+        Args:
+            keep_version: Keep the entries of this model version (default: remove all)
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[1] != keep_version]:
+                self._remove(key)
+    
+    def snapshot(self) -> OrderedDict:
+        """Copy of the cached entries, safe to walk without the lock (memory report)"""
+        with self._lock:
+            return OrderedDict(self._entries)
+    
+    def stats(self) -> dict:
+        """
+        Get cache counters
+        
+        Returns:
+            dict: Size, hit/miss counters and hit rate
+        """
+        with self._lock:
+            lookups = self.hits + self.slice_hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'model_versions': sorted({key[1] for key in self._entries}),
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'slice_hits': self.slice_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round((self.hits + self.slice_hits) / lookups, 4) if lookups else 0.0,
+            }
@@ -1,34 +1,597 @@
 """
 AI Prediction service for weather forecasting
 """
-import joblib
-import pandas as pd
+import os
+import statistics
+import threading
+import time
+import warnings
+import numpy as np
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple
 from fastapi import HTTPException
 from app.core.config import settings
-from app.models import HourlyPredictionRequest, DailyPredictionRequest
+from app.core.metrics import stage_timer
+from app.core.startup import startup_timeline
+from app.models import HourlyPredictionRequest, DailyPredictionRequest, BatchPredictionRequest
+from app.services.forecast_table import ForecastTable, load_forecast_tables
+from app.services.prediction_cache import PredictionCache
+from app.services.model_registry import LoadedModel, ModelRegistry, ModelWatcher, load_model
+from app.services.features import forecast_timestamps, build_feature_matrix
 
-# Global AI model instance
-ai_model: Optional[dict] = None
+# The models were fitted on DataFrames but receive plain float32 arrays
+# built by build_feature_matrix(), in the same column order
+warnings.filterwarnings("ignore", message="X does not have valid feature names", category=UserWarning)
 
-def load_ai_model() -> bool:
+# Step between two consecutive prediction rows
+_UNITS = {
+    'hourly': 'h',
+    'daily': 'D',
+}
+_STEPS = {
+    'hourly': timedelta(hours=1),
+    'daily': timedelta(days=1),
+}
+
+# Loaded model versions; requests use model_registry.current
+model_registry = ModelRegistry(history_size=settings.MODEL_HISTORY_SIZE)
+
+# Serializes loads so two reloads cannot race each other
+_reload_lock = threading.Lock()
+
+# Set while the startup load runs; predictions answer 503 meanwhile
+model_loading = threading.Event()
+_model_loader: Optional[threading.Thread] = None
+
+# Representative requests of the warm-up pass: (kind, rows)
+WARMUP_REQUESTS = (
+    ('hourly', 24),
+    ('hourly', 168),
+    ('daily', 7),
+    ('daily', 30),
+)
+
+# Result cache for requests outside the forecast tables
+prediction_cache = PredictionCache(
+    max_entries=settings.PREDICTION_CACHE_SIZE,
+    ttl_seconds=settings.PREDICTION_CACHE_TTL_SECONDS
+)
+
+# Request stage timers (see /metrics)
+_LOOKUP_TIMER = stage_timer("prediction.lookup")
+_FEATURES_TIMER = stage_timer("prediction.features")
+_REGRESSOR_TIMER = stage_timer("prediction.regressor")
+_CLASSIFIER_TIMER = stage_timer("prediction.classifier")
+_DECODE_TIMER = stage_timer("prediction.decode")
+_LAYOUT_TIMER = stage_timer("prediction.layout")
+
+def _resolve_model_path(path: Optional[str]) -> str:
+    if not path:
+        return settings.MODEL_PATH
+    return path if os.path.isabs(path) else os.path.abspath(os.path.join(settings._BASE_DIR, path))
+
+def _activate_model(path: str) -> LoadedModel:
+    """
+    Load, validate and swap in a model
+    
+    The warm-up pass and the forecast tables run before the swap, so
+    requests never see a cold model or a model without its tables.
+    Requests already running keep the model they started with.
+    
+    Raises:
+        Exception: If the model cannot be loaded or fails the smoke test
+            (the current model stays active)
+    """
+    with _reload_lock:
+        try:
+            model = load_model(path, mmap=settings.MODEL_MMAP, engine=settings.INFERENCE_ENGINE)
+        except Exception as e:
+            model_registry.record_failure(path, str(e))
+            raise
+        
+        if settings.MODEL_WARMUP_ROUNDS > 0:
+            model.warmup = warm_up_model(model, settings.MODEL_WARMUP_ROUNDS)
+        
+        if settings.FORECAST_TABLE_ENABLED:
+            prepare_forecast_tables(model)
+        
+        model_registry.activate(model)
+        prediction_cache.invalidate(keep_version=model.model_id)
+        return model
+
+def warm_up_model(model: LoadedModel, rounds: int) -> List[dict]:
+    """
+    Run representative predictions through a model before it serves
+    
+    The smoke test already made the first (cold) prediction of each
+    kind; this runs every request shape once more plus `rounds` times
+    and reports the first call and the median of the rest (warm).
+    Caches and forecast tables are bypassed.
+    
+    Args:
+        model: Loaded, not yet active model
+        rounds: Warm calls per request shape
+    
+    Returns:
+        list: First-call and warm latency per request shape
+    """
+    start_date = datetime.now().replace(minute=0, second=0, microsecond=0)
+    results = []
+    for kind, count in WARMUP_REQUESTS:
+        if kind not in model.package:
+            continue
+        
+        timings = []
+        for _ in range(rounds + 1):
+            started = time.perf_counter()
+            pred_reg, pred_clf_encoded = _predict_arrays(model, kind, start_date, count)
+            columns = _prediction_columns(model, kind, pred_reg, pred_clf_encoded)
+            _prediction_layout(kind, start_date, count, columns, 'rows')
+            timings.append((time.perf_counter() - started) * 1000)
+        
+        results.append({
+            'kind': kind,
+            'rows': count,
+            'first_ms': round(timings[0], 2),
+            'warm_ms': round(statistics.median(timings[1:]), 2),
+        })
+    
+    for kind, cold in model.cold_ms.items():
+        warm = ', '.join(f"x{r['rows']} {r['warm_ms']:.1f} ms" for r in results if r['kind'] == kind)
+        print(f"  {kind.capitalize()} prediction latency: cold {cold:.1f} ms, warm {warm}")
+    return results
+
+def load_ai_model(path: Optional[str] = None) -> bool:
     """
     Load AI model from file
     
+    The path may be a joblib combined package, a directory of split
+    regressor/classifier files or a model bundle directory (see
+    model_registry.py); bundles are memory-mapped when MODEL_MMAP is set.
+    
+    Args:
+        path: Model file or directory (default: MODEL_PATH)
+    
     Returns:
         bool: True if model loaded successfully
     """
-    global ai_model
-    
+    path = _resolve_model_path(path)
     try:
-        ai_model = joblib.load(settings.MODEL_PATH)
-        print(f"✓ AI Model loaded successfully from {settings.MODEL_PATH}")
+        model = _activate_model(path)
+        print(f"✓ AI Model {model.model_id} loaded successfully from {path} ({model.layout}, {model.engine} engine)")
         return True
     except Exception as e:
         print(f"✗ Failed to load AI model: {e}")
-        print(f"  Model path: {settings.MODEL_PATH}")
+        print(f"  Model path: {path}")
+        return False
+
+def reload_ai_model(path: Optional[str] = None) -> dict:
+    """
+    Load a model and swap it in without a restart
+    
+    Args:
+        path: Model file or directory (default: MODEL_PATH)
+    
+    Returns:
+        dict: Status with the new and previous model ids
+    
+    Raises:
+        HTTPException: If the path is outside the directory of MODEL_PATH,
+            or the model cannot be loaded or fails validation
+    """
+    previous = model_registry.current
+    path = _resolve_model_path(path)
+    # Model files are unpickled, so only load from the configured model directory
+    model_dir = os.path.realpath(os.path.dirname(settings.MODEL_PATH))
+    if os.path.commonpath([model_dir, os.path.realpath(path)]) != model_dir:
+        raise HTTPException(status_code=400, detail=f"Model path must be inside {model_dir}")
+    
+    try:
+        model = _activate_model(path)
+    except Exception as e:
+        print(f"✗ Model reload from {path} failed: {e}")
+        raise HTTPException(status_code=422, detail=f"Model not loaded: {str(e)}")
+    
+    print(f"✓ AI Model {model.model_id} swapped in from {path} ({model.layout})")
+    return {
+        'status': 200,
+        'message': 'Model reloaded',
+        'model': model.describe(),
+        'previous_model_id': previous.model_id if previous else None,
+    }
+
+# Reloads the model in each worker when the files at MODEL_PATH change
+model_watcher = ModelWatcher(
+    path=lambda: settings.MODEL_PATH,
+    reload=lambda: reload_ai_model(settings.MODEL_PATH),
+    interval=settings.MODEL_WATCH_INTERVAL
+)
+
+def start_model_watcher() -> None:
+    """Start the model file watcher if MODEL_WATCH_ENABLED"""
+    if not settings.MODEL_WATCH_ENABLED:
+        return
+    model = model_registry.current
+    model_watcher.start(model.fingerprint if model else None)
+    print(f"✓ Watching {settings.MODEL_PATH} for model changes (every {settings.MODEL_WATCH_INTERVAL}s)")
+
+def stop_model_watcher() -> None:
+    """Stop the model file watcher"""
+    model_watcher.stop()
+
+def _load_startup_model() -> None:
+    try:
+        if load_ai_model():
+            seconds = startup_timeline.mark('model_ready')
+            print(f"✓ AI Model ready {seconds:.2f}s after start")
+        start_model_watcher()
+    finally:
+        model_loading.clear()
+
+def start_model_loading() -> None:
+    """
+    Load and warm up the AI model, then start the model watcher
+    
+    With MODEL_BACKGROUND_LOAD the load runs in a background thread and
+    returns immediately, so the worker serves non-ML routes while the
+    model loads; predictions answer 503 until it is ready (see
+    get_model_status()).
+    """
+    global _model_loader
+    model_loading.set()
+    if not settings.MODEL_BACKGROUND_LOAD:
+        _load_startup_model()
+        return
+    
+    _model_loader = threading.Thread(target=_load_startup_model, name="model-loader", daemon=True)
+    _model_loader.start()
+    print("✓ AI Model loading in the background")
+
+def get_model_status() -> dict:
+    """
+    Get the readiness of the AI model
+    
+    Returns:
+        dict: 'state' ('loading', 'ready' or 'unavailable'), the model id,
+            its cold (first prediction) and warm-up latencies
+    """
+    model = model_registry.current
+    if model_loading.is_set():
+        state = 'loading'
+    elif model is not None:
+        state = 'ready'
+    else:
+        state = 'unavailable'
+    
+    return {
+        'state': state,
+        'model_id': model.model_id if model else None,
+        'load_seconds': round(model.load_seconds, 3) if model else None,
+        'cold_ms': model.cold_ms if model else {},
+        'warmup': model.warmup if model else [],
+    }
+
+def _require_model(*kinds: str) -> LoadedModel:
+    """
+    Get the current model for one request
+    
+    Args:
+        kinds: Prediction kinds the request needs
+    
+    Raises:
+        HTTPException: If no model is loaded (503 while the startup load
+            runs) or it lacks one of `kinds`
+    """
+    model = model_registry.current
+    if model is None:
+        if model_loading.is_set():
+            raise HTTPException(status_code=503, detail="AI Model is loading, retry shortly", headers={"Retry-After": "5"})
+        raise HTTPException(status_code=500, detail="AI Model is not loaded")
+    for kind in kinds:
+        if kind not in model.package:
+            raise HTTPException(status_code=503, detail=f"The loaded model has no {kind} predictor")
+    return model
+
+def get_model_version() -> str:
+    """
+    Get a version string identifying the loaded model
+    
+    Returns:
+        str: Model version, training date and file fingerprint
+    """
+    model = model_registry.current
+    return model.model_id if model else 'none'
+
+def _predict_timestamps(model: LoadedModel, kind: str, timestamps: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Run the hourly or daily models for the given timestamps
+    
+    Args:
+        model: Model answering the request
+        kind: 'hourly' or 'daily'
+        timestamps: datetime64 array
+    
+    Returns:
+        tuple: (regression outputs, encoded conditions)
+    """
+    section = model.package[kind]
+    
+    # Build input matrix in the model's column order
+    with _FEATURES_TIMER.time():
+        X_input = build_feature_matrix(timestamps, section['feature_columns'])
+    
+    # Predict numerical values
+    with _REGRESSOR_TIMER.time():
+        pred_reg = section['regressor'].predict(X_input)
+    
+    # Predict conditions (encoded)
+    with _CLASSIFIER_TIMER.time():
+        pred_clf_encoded = section['classifier'].predict(X_input)
+    
+    return pred_reg, pred_clf_encoded.astype(int)
+
+def _predict_arrays(model: LoadedModel, kind: str, start_date: datetime, count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Run the hourly or daily models for consecutive timestamps
+    
+    Args:
+        model: Model answering the request
+        kind: 'hourly' or 'daily'
+        start_date: First timestamp to predict
+        count: Number of consecutive rows
+    
+    Returns:
+        tuple: (regression outputs, encoded conditions)
+    """
+    return _predict_timestamps(model, kind, forecast_timestamps(start_date, count, _UNITS[kind]))
+
+def _lookup_precomputed(
+    model: LoadedModel,
+    kind: str,
+    start_date: datetime,
+    count: int
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Get predictions from the model's forecast table or the result cache"""
+    with _LOOKUP_TIMER.time():
+        table = model.forecast_tables.get(kind)
+        if table is not None:
+            rows = table.lookup(start_date, count)
+            if rows is not None:
+                return rows
+        
+        return prediction_cache.get(kind, model.model_id, start_date, count, _STEPS[kind])
+
+def _forecast(model: LoadedModel, kind: str, start_date: datetime, count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get predictions from the forecast table, the result cache or the model
+    
+    Args:
+        model: Model answering the request
+        kind: 'hourly' or 'daily'
+        start_date: First timestamp to predict
+        count: Number of consecutive rows
+    
+    Returns:
+        tuple: (regression outputs, encoded conditions)
+    """
+    rows = _lookup_precomputed(model, kind, start_date, count)
+    if rows is not None:
+        return rows
+    
+    rows = _predict_arrays(model, kind, start_date, count)
+    prediction_cache.put(kind, model.model_id, start_date, count, *rows)
+    return rows
+
+def _forecast_many(
+    model: LoadedModel,
+    kind: str,
+    windows: List[Tuple[datetime, int]]
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Get predictions for several windows with at most one model call
+    
+    Windows that are not precomputed or cached are merged: their
+    timestamps are deduplicated, predicted as a single matrix and split
+    back per window.
+    
+    Args:
+        model: Model answering the request
+        kind: 'hourly' or 'daily'
+        windows: List of (start timestamp, row count)
+    
+    Returns:
+        list: (regression outputs, encoded conditions) per window
+    """
+    results: List[Optional[Tuple[np.ndarray, np.ndarray]]] = [None] * len(windows)
+    pending = []
+    for i, (start_date, count) in enumerate(windows):
+        results[i] = _lookup_precomputed(model, kind, start_date, count)
+        if results[i] is None:
+            pending.append(i)
+    
+    if pending:
+        # Consecutive timestamps of one window stay adjacent after np.unique,
+        # so every window maps to a contiguous slice of the merged output
+        first_stamps = [np.datetime64(windows[i][0], _UNITS[kind]) for i in pending]
+        unique = np.unique(np.concatenate([
+            forecast_timestamps(windows[i][0], windows[i][1], _UNITS[kind]) for i in pending
+        ]))
+        pred_reg, pred_clf_encoded = _predict_timestamps(model, kind, unique)
+        
+        for i, first in zip(pending, first_stamps):
+            start_date, count = windows[i]
+            offset = int(np.searchsorted(unique, first))
+            rows = (pred_reg[offset:offset + count], pred_clf_encoded[offset:offset + count])
+            prediction_cache.put(kind, model.model_id, start_date, count, *rows)
+            results[i] = rows
+    
+    return results
+
+def _prediction_columns(
+    model: LoadedModel,
+    kind: str,
+    pred_reg: np.ndarray,
+    pred_clf_encoded: np.ndarray
+) -> Dict[str, list]:
+    """
+    Decode labels and round regression outputs in bulk
+    
+    Args:
+        model: Model that produced the predictions
+        kind: 'hourly' or 'daily'
+        pred_reg: Regression outputs of shape (rows, targets)
+        pred_clf_encoded: Encoded conditions of shape (rows,)
+    
+    Returns:
+        dict: 'conditions' and one list per regression target
+    """
+    label_encoder = model.package[f'label_encoder_{kind}']
+    target_cols = model.package[kind]['target_regression']
+    
+    with _DECODE_TIMER.time():
+        labels = np.asarray(label_encoder.classes_).astype(str)
+        rounded = np.round(pred_reg, 2).reshape(len(pred_clf_encoded), -1)
+        
+        columns = {'conditions': labels[pred_clf_encoded].tolist()}
+        for j, col in enumerate(target_cols):
+            columns[col] = rounded[:, j].tolist()
+    return columns
+
+def _prediction_layout(
+    kind: str,
+    start_date: datetime,
+    count: int,
+    columns: Dict[str, list],
+    layout: str
+) -> dict:
+    """
+    Shape prediction columns into the response payload
+    
+    Args:
+        kind: 'hourly' or 'daily'
+        start_date: First predicted timestamp
+        count: Number of predicted rows
+        columns: Output of _prediction_columns()
+        layout: 'rows' or 'columnar'
+    
+    Returns:
+        dict: Either {'data': [...]} or the columnar fields
+    """
+    if layout == 'columnar':
+        return {
+            'layout': 'columnar',
+            'start': start_date.isoformat(),
+            'step_seconds': int(_STEPS[kind].total_seconds()),
+            'count': count,
+            'columns': columns,
+        }
+    
+    timestamps = forecast_timestamps(start_date, count, _UNITS[kind])
+    if kind == 'hourly':
+        leading = {
+            'datetime': np.datetime_as_string(timestamps, unit='s').tolist(),
+            'date_formatted': np.char.replace(np.datetime_as_string(timestamps, unit='m'), 'T', ' ').tolist(),
+        }
+    else:
+        leading = {'date': np.datetime_as_string(timestamps, unit='D').tolist()}
+    
+    keys = [*leading, *columns]
+    rows = zip(*leading.values(), *columns.values())
+    return {'data': [dict(zip(keys, values)) for values in rows]}
+
+def get_prediction_cache_stats() -> dict:
+    """
+    Get prediction cache counters
+    
+    Returns:
+        dict: Cache statistics
+    """
+    model = model_registry.current
+    return {
+        'status': 200,
+        'model_id': model.model_id if model else None,
+        'forecast_tables': {
+            name: {
+                'start': table.start.isoformat(),
+                'end': table.end.isoformat(),
+                'rows': len(table),
+                'model_version': table.model_version,
+            }
+            for name, table in (model.forecast_tables.items() if model else ())
+        },
+        'cache': prediction_cache.stats(),
+    }
+
+def build_forecast_tables(
+    start_date: datetime,
+    num_days: int,
+    model: Optional[LoadedModel] = None
+) -> Dict[str, ForecastTable]:
+    """
+    Evaluate a model over a window of dates
+    
+    Args:
+        start_date: First day of the window (time of day is ignored)
+        num_days: Number of days in the window
+        model: Model to evaluate (default: the current model)
+    
+    Returns:
+        dict: 'hourly' and/or 'daily' forecast tables, for the kinds the model has
+    """
+    model = model or model_registry.current
+    if model is None:
+        raise RuntimeError("AI Model is not loaded")
+    
+    start_date = datetime(start_date.year, start_date.month, start_date.day)
+    rows = {'hourly': num_days * 24, 'daily': num_days}
+    
+    tables = {}
+    for kind in model.kinds:
+        regression, codes = _predict_arrays(model, kind, start_date, rows[kind])
+        tables[kind] = ForecastTable(start_date, _STEPS[kind], regression, codes, model.model_id)
+    return tables
+
+def prepare_forecast_tables(model: LoadedModel) -> bool:
+    """
+    Load the forecast tables of a model from FORECAST_TABLE_PATH, or
+    build them when the file is missing or was produced by a different
+    model version.
+    
+    Args:
+        model: Model the tables are attached to
+    
+    Returns:
+        bool: True if forecast tables are available
+    """
+    version = model.model_id
+    path = settings.FORECAST_TABLE_PATH
+    
+    if path and os.path.exists(path):
+        try:
+            tables = load_forecast_tables(path)
+            if tables and all(t.model_version == version for t in tables.values()):
+                model.forecast_tables = tables
+                print(f"✓ Forecast tables loaded from {path}")
+                return True
+            print(f"  Forecast tables in {path} belong to another model version, rebuilding")
+        except Exception as e:
+            print(f"✗ Failed to load forecast tables: {e}")
+    
+    if settings.FORECAST_TABLE_START:
+        start_date = datetime.strptime(settings.FORECAST_TABLE_START, '%Y-%m-%d')
+    else:
+        start_date = datetime.now()
+    
+    try:
+        tables = build_forecast_tables(start_date, settings.FORECAST_TABLE_DAYS, model)
+    except Exception as e:
+        print(f"✗ Failed to build forecast tables: {e}")
         return False
+    
+    model.forecast_tables = tables
+    size_kb = sum(t.nbytes for t in tables.values()) / 1024
+    print(f"✓ Forecast tables built for {settings.FORECAST_TABLE_DAYS} days ({size_kb:.0f} KB)")
+    return True
 
 def get_model_info() -> dict:
     """
@@ -37,30 +600,40 @@ def get_model_info() -> dict:
     Returns:
         dict: Model information
     """
-    if ai_model is None:
+    model = model_registry.current
+    if model is None:
         return {
             'status': 400,
             'message': 'Model not loaded',
-            'model_loaded': False
+            'model_loaded': False,
+            'history': model_registry.history(),
         }
     
+    hourly = model.package.get('hourly', {})
+    daily = model.package.get('daily', {})
     return {
         'status': 200,
         'model_loaded': True,
-        'version': ai_model.get('version', 'unknown'),
-        'trained_date': ai_model.get('trained_date', 'unknown'),
-        'hourly_features': ai_model['hourly']['feature_columns'],
-        'hourly_targets': ai_model['hourly']['target_regression'],
-        'daily_features': ai_model['daily']['feature_columns'],
-        'daily_targets': ai_model['daily']['target_regression'],
+        'version': model.version,
+        'trained_date': model.trained_date,
+        'model_id': model.model_id,
+        'layout': model.layout,
+        'engine': model.engine,
+        'loaded_at': model.loaded_at.isoformat(timespec='seconds'),
+        'hourly_features': hourly.get('feature_columns'),
+        'hourly_targets': hourly.get('target_regression'),
+        'daily_features': daily.get('feature_columns'),
+        'daily_targets': daily.get('target_regression'),
+        'history': model_registry.history(),
     }
 
-def predict_hourly_weather(request: HourlyPredictionRequest) -> dict:
+def predict_hourly_weather(request: HourlyPredictionRequest, layout: str = 'rows') -> dict:
     """
     Predict hourly weather using AI model
     
     Args:
         request: Hourly prediction request parameters
+        layout: 'rows' (one dict per hour) or 'columnar' (one list per target)
     
     Returns:
         dict: Prediction results
@@ -68,8 +641,7 @@ def predict_hourly_weather(request: HourlyPredictionRequest) -> dict:
     Raises:
         HTTPException: If model not loaded or prediction fails
     """
-    if ai_model is None:
-        raise HTTPException(status_code=500, detail="AI Model is not loaded")
+    model = _require_model('hourly')
     
     try:
         # Validate input
@@ -79,57 +651,19 @@ def predict_hourly_weather(request: HourlyPredictionRequest) -> dict:
         # Create start datetime
         start_date = datetime(request.year, request.month, request.day, request.hour or 0)
         
-        # Generate future datetimes
-        future_dates = [start_date + timedelta(hours=i) for i in range(request.num_hours)]
-        
-        # Create input DataFrame
-        X_input = pd.DataFrame({
-            'day': [d.day for d in future_dates],
-            'month': [d.month for d in future_dates],
-            'year': [d.year for d in future_dates],
-            'hour': [d.hour for d in future_dates]
-        })
-        
-        # Ensure column order matches model
-        hourly_features = ai_model['hourly']['feature_columns']
-        X_input = X_input[hourly_features]
-        
-        # Make predictions
-        h_reg = ai_model['hourly']['regressor']
-        h_clf = ai_model['hourly']['classifier']
-        
-        # Predict numerical values
-        pred_reg = h_reg.predict(X_input)
-        
-        # Predict conditions (encoded)
-        pred_clf_encoded = h_clf.predict(X_input)
-        
-        # Decode conditions
-        label_encoder = ai_model['label_encoder_hourly']
-        pred_conditions = label_encoder.inverse_transform(pred_clf_encoded.astype(int))
+        # Make predictions (forecast table, cache or model)
+        pred_reg, pred_clf_encoded = _forecast(model, 'hourly', start_date, request.num_hours)
         
         # Format results
-        results = []
-        target_cols = ai_model['hourly']['target_regression']
-        
-        for i, future_date in enumerate(future_dates):
-            result = {
-                'datetime': future_date.isoformat(),
-                'date_formatted': future_date.strftime('%Y-%m-%d %H:%M'),
-                'conditions': str(pred_conditions[i]),
-            }
-            
-            # Add predicted numerical values
-            for j, col in enumerate(target_cols):
-                result[col] = float(round(pred_reg[i][j], 2))
-            
-            results.append(result)
+        columns = _prediction_columns(model, 'hourly', pred_reg, pred_clf_encoded)
+        with _LAYOUT_TIMER.time():
+            data = _prediction_layout('hourly', start_date, request.num_hours, columns, layout)
         
         return {
             'status': 200,
             'message': 'Hourly prediction successful',
-            'model_version': ai_model.get('version', 'unknown'),
-            'data': results
+            'model_version': model.version,
+            **data
         }
     
     except HTTPException:
@@ -138,12 +672,13 @@ def predict_hourly_weather(request: HourlyPredictionRequest) -> dict:
         print(f"Error in hourly prediction: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
-def predict_daily_weather(request: DailyPredictionRequest) -> dict:
+def predict_daily_weather(request: DailyPredictionRequest, layout: str = 'rows') -> dict:
     """
     Predict daily weather using AI model
     
     Args:
         request: Daily prediction request parameters
+        layout: 'rows' (one dict per day) or 'columnar' (one list per target)
     
     Returns:
         dict: Prediction results
@@ -151,8 +686,7 @@ def predict_daily_weather(request: DailyPredictionRequest) -> dict:
     Raises:
         HTTPException: If model not loaded or prediction fails
     """
-    if ai_model is None:
-        raise HTTPException(status_code=500, detail="AI Model is not loaded")
+    model = _require_model('daily')
     
     try:
         # Validate input
@@ -162,55 +696,19 @@ def predict_daily_weather(request: DailyPredictionRequest) -> dict:
         # Create start date
         start_date = datetime(request.year, request.month, request.day)
         
-        # Generate future dates
-        future_dates = [start_date + timedelta(days=i) for i in range(request.num_days)]
-        
-        # Create input DataFrame
-        X_input = pd.DataFrame({
-            'day': [d.day for d in future_dates],
-            'month': [d.month for d in future_dates],
-            'year': [d.year for d in future_dates],
-        })
-        
-        # Ensure column order matches model
-        daily_features = ai_model['daily']['feature_columns']
-        X_input = X_input[daily_features]
-        
-        # Make predictions
-        d_reg = ai_model['daily']['regressor']
-        d_clf = ai_model['daily']['classifier']
-        
-        # Predict numerical values
-        pred_reg = d_reg.predict(X_input)
-        
-        # Predict conditions (encoded)
-        pred_clf_encoded = d_clf.predict(X_input)
-        
-        # Decode conditions
-        label_encoder = ai_model['label_encoder_daily']
-        pred_conditions = label_encoder.inverse_transform(pred_clf_encoded.astype(int))
+        # Make predictions (forecast table, cache or model)
+        pred_reg, pred_clf_encoded = _forecast(model, 'daily', start_date, request.num_days)
         
         # Format results
-        results = []
-        target_cols = ai_model['daily']['target_regression']
-        
-        for i, future_date in enumerate(future_dates):
-            result = {
-                'date': future_date.strftime('%Y-%m-%d'),
-                'conditions': str(pred_conditions[i]),
-            }
-            
-            # Add predicted numerical values
-            for j, col in enumerate(target_cols):
-                result[col] = float(round(pred_reg[i][j], 2))
-            
-            results.append(result)
+        columns = _prediction_columns(model, 'daily', pred_reg, pred_clf_encoded)
+        with _LAYOUT_TIMER.time():
+            data = _prediction_layout('daily', start_date, request.num_days, columns, layout)
         
         return {
             'status': 200,
             'message': 'Daily prediction successful',
-            'model_version': ai_model.get('version', 'unknown'),
-            'data': results
+            'model_version': model.version,
+            **data
         }
     
     except HTTPException:
@@ -218,3 +716,62 @@ def predict_daily_weather(request: DailyPredictionRequest) -> dict:
     except Exception as e:
         print(f"Error in daily prediction: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+def predict_batch_weather(request: BatchPredictionRequest, layout: str = 'rows') -> dict:
+    """
+    Predict hourly and daily weather for many requests at once
+    
+    Overlapping date ranges are predicted once and each forest runs at
+    most once per kind for the whole batch. The model only uses the
+    calendar, so items for different locations with the same dates share
+    their predictions.
+    
+    Args:
+        request: Batch of hourly and daily prediction requests
+        layout: 'rows' or 'columnar', applied to every item
+    
+    Returns:
+        dict: Prediction results per item, in request order
+    
+    Raises:
+        HTTPException: If model not loaded, an item has an invalid date or prediction fails
+    """
+    model = _require_model(*[
+        kind for kind, items in (('hourly', request.hourly), ('daily', request.daily)) if items
+    ])
+    
+    try:
+        windows = {'hourly': [], 'daily': []}
+        for kind, items in (('hourly', request.hourly), ('daily', request.daily)):
+            for i, item in enumerate(items):
+                try:
+                    start_date = datetime(item.year, item.month, item.day, getattr(item, 'hour', 0) or 0)
+                except ValueError:
+                    raise HTTPException(status_code=400, detail=f"Invalid date input in {kind} item {i}")
+                count = item.num_hours if kind == 'hourly' else item.num_days
+                windows[kind].append((start_date, count))
+        
+        response = {
+            'status': 200,
+            'message': 'Batch prediction successful',
+            'model_version': model.version,
+        }
+        for kind, items in (('hourly', request.hourly), ('daily', request.daily)):
+            results = []
+            predictions = _forecast_many(model, kind, windows[kind]) if items else []
+            for item, (start_date, count), (pred_reg, pred_clf_encoded) in zip(items, windows[kind], predictions):
+                columns = _prediction_columns(model, kind, pred_reg, pred_clf_encoded)
+                with _LAYOUT_TIMER.time():
+                    results.append({
+                        'location': item.location,
+                        **_prediction_layout(kind, start_date, count, columns, layout)
+                    })
+            response[kind] = results
+        
+        return response
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error in batch prediction: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
@@ -0,0 +1,299 @@
+"""
+Rollups of sensor readings at minute, hour and day resolution
+
+The weather_rollup table (migration 0002) holds, per location and time
+bucket, the number of readings and the running sum/min/max of every
+metric. The ingest path upserts pre-aggregated rows in the same
+transaction as the raw INSERT, so aggregate queries read one row per
+bucket instead of every raw reading.
+"""
+from datetime import datetime, timedelta
+from typing import List, Optional, Dict, Iterable
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import get_cursor
+from app.core.async_database import get_async_cursor, is_async_db_ready
+
+# Metric columns in the order of the values in INSERT_READING_QUERY
+METRICS = ("temp", "humidity", "isRaining", "lightIntensity", "windSpeed", "airPressure")
+
+# Bucket length, MySQL DATE_FORMAT pattern (escaped for parameter binding)
+# and default query span of every resolution
+RESOLUTIONS = {
+    "minute": (timedelta(minutes=1), "%%Y-%%m-%%d %%H:%%i:00", timedelta(hours=6)),
+    "hour": (timedelta(hours=1), "%%Y-%%m-%%d %%H:00:00", timedelta(days=7)),
+    "day": (timedelta(days=1), "%%Y-%%m-%%d 00:00:00", timedelta(days=90)),
+}
+
+_ROLLUP_COLUMNS = ", ".join(f"{m}_sum, {m}_min, {m}_max" for m in METRICS)
+_ROLLUP_PLACEHOLDERS = ", ".join(["%s"] * (4 + 3 * len(METRICS)))
+_ROLLUP_MERGE = ",\n        ".join(
+    f"{m}_sum = {m}_sum + VALUES({m}_sum), "
+    f"{m}_min = LEAST({m}_min, VALUES({m}_min)), "
+    f"{m}_max = GREATEST({m}_max, VALUES({m}_max))"
+    for m in METRICS
+)
+
+# VALUES() instead of a row alias so the statement also runs on MariaDB
+UPSERT_ROLLUP_QUERY = f"""
+    INSERT INTO weather_rollup(location, resolution, bucket, cnt, {_ROLLUP_COLUMNS})
+    VALUES ({_ROLLUP_PLACEHOLDERS})
+    ON DUPLICATE KEY UPDATE
+        cnt = cnt + VALUES(cnt),
+        {_ROLLUP_MERGE}
+"""
+ROLLUP_TABLE_CHECK_QUERY = "SELECT 1 FROM weather_rollup LIMIT 1"
+
+# Set by init_rollups() once the weather_rollup table is known to exist
+rollups_ready = False
+
+def bucket_start(timestamp: datetime, resolution: str) -> datetime:
+    """Start of the bucket containing `timestamp`"""
+    if resolution == "minute":
+        return timestamp.replace(second=0, microsecond=0)
+    if resolution == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def _bucket_end(timestamp: datetime, resolution: str) -> datetime:
+    """First bucket boundary at or after `timestamp`"""
+    start = bucket_start(timestamp, resolution)
+    return start if start == timestamp else start + RESOLUTIONS[resolution][0]
+
+def _local_naive(timestamp: datetime) -> datetime:
+    """Drop the time zone of a timestamp, converting it to local server time"""
+    if timestamp.tzinfo is not None:
+        return timestamp.astimezone().replace(tzinfo=None)
+    return timestamp
+
+def rollup_rows(params: Iterable[tuple]) -> List[tuple]:
+    """
+    Pre-aggregate readings into rollup rows
+    
+    Args:
+        params: INSERT_READING_QUERY parameters (6 metric values, location, createAt)
+    
+    Returns:
+        list: UPSERT_ROLLUP_QUERY parameters, one per (location, resolution,
+        bucket), sorted so concurrent writers lock rows in the same order
+    """
+    groups: Dict[tuple, list] = {}
+    for row in params:
+        values = [float(value) for value in row[:6]]
+        location, created_at = row[6], row[7]
+        for resolution in RESOLUTIONS:
+            key = (location, resolution, bucket_start(created_at, resolution))
+            aggregate = groups.get(key)
+            if aggregate is None:
+                groups[key] = [1] + [v for value in values for v in (value, value, value)]
+                continue
+            aggregate[0] += 1
+            for i, value in enumerate(values):
+                j = 1 + 3 * i
+                aggregate[j] += value
+                aggregate[j + 1] = min(aggregate[j + 1], value)
+                aggregate[j + 2] = max(aggregate[j + 2], value)
+    return [key + tuple(groups[key]) for key in sorted(groups)]
+
+def update_rollups(cursor, params: List[tuple]) -> None:
+    """Upsert the rollups of readings inside the caller's transaction"""
+    if rollups_ready:
+        cursor.executemany(UPSERT_ROLLUP_QUERY, rollup_rows(params))
+
+async def update_rollups_async(cursor, params: List[tuple]) -> None:
+    """Async version of update_rollups()"""
+    if rollups_ready:
+        await cursor.executemany(UPSERT_ROLLUP_QUERY, rollup_rows(params))
+
+def init_rollups() -> bool:
+    """
+    Enable rollup maintenance if ROLLUPS_ENABLED and the table exists
+    
+    Returns:
+        bool: True if readings will update the rollups
+    """
+    global rollups_ready
+    
+    rollups_ready = False
+    if not settings.ROLLUPS_ENABLED:
+        return False
+    
+    try:
+        with get_cursor() as cursor:
+            cursor.execute(ROLLUP_TABLE_CHECK_QUERY)
+            cursor.fetchall()
+        rollups_ready = True
+        print("✓ Weather rollups enabled")
+    except Exception as e:
+        print(f"✗ Weather rollups disabled, weather_rollup table is not available: {e}")
+    return rollups_ready
+
+def _aggregate_query(metric: str) -> str:
+    return f"""
+        SELECT bucket, cnt, {metric}_sum, {metric}_min, {metric}_max
+        FROM weather_rollup
+        WHERE location=%s AND resolution=%s AND bucket >= %s AND bucket < %s
+        ORDER BY bucket
+    """
+
+def _resolve_range(resolution: str, start: Optional[datetime], end: Optional[datetime]) -> tuple:
+    """
+    Fill in the default query window and align it to bucket boundaries
+    
+    Raises:
+        HTTPException: If the window is empty or spans too many buckets
+    """
+    step, _, default_span = RESOLUTIONS[resolution]
+    end = _local_naive(end) if end else datetime.now()
+    start = _local_naive(start) if start else end - default_span
+    start, end = bucket_start(start, resolution), _bucket_end(end, resolution)
+    
+    if start >= end:
+        raise HTTPException(status_code=400, detail="'from' must be before 'to'")
+    buckets = (end - start) // step
+    if buckets > settings.ROLLUP_MAX_BUCKETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range spans {buckets} {resolution} buckets, the maximum is {settings.ROLLUP_MAX_BUCKETS}"
+        )
+    return start, end
+
+def _aggregate_response(location: str, metric: str, resolution: str, start: datetime, end: datetime, rows) -> dict:
+    return {
+        "status": 200,
+        "location": location,
+        "metric": metric,
+        "resolution": resolution,
+        "start": start.strftime("%Y-%m-%d %H:%M:%S"),
+        "end": end.strftime("%Y-%m-%d %H:%M:%S"),
+        "data": [
+            {
+                "bucket": bucket.strftime("%Y-%m-%d %H:%M:%S"),
+                "count": count,
+                "avg": round(total / count, 2) if count else None,
+                "min": round(minimum, 2),
+                "max": round(maximum, 2),
+            }
+            for bucket, count, total, minimum, maximum in rows
+        ],
+    }
+
+def _check_ready() -> None:
+    if not rollups_ready:
+        raise HTTPException(status_code=503, detail="Weather rollups are not available")
+
+def get_aggregate(
+    location: str,
+    metric: str,
+    resolution: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> dict:
+    """
+    Get bucketed count/avg/min/max of a metric from the rollups
+    
+    Args:
+        location: Location name
+        metric: One of METRICS
+        resolution: 'minute', 'hour' or 'day'
+        start: First timestamp (default: end minus a per-resolution span)
+        end: Last timestamp (default: now)
+    
+    Returns:
+        dict: One entry per non-empty bucket
+    
+    Raises:
+        HTTPException: If the rollups are not available or the range is invalid
+    """
+    _check_ready()
+    start, end = _resolve_range(resolution, start, end)
+    
+    with get_cursor() as cursor:
+        cursor.execute(_aggregate_query(metric), (location, resolution, start, end))
+        rows = cursor.fetchall()
+    return _aggregate_response(location, metric, resolution, start, end, rows)
+
+async def get_aggregate_async(
+    location: str,
+    metric: str,
+    resolution: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> dict:
+    """
+    Async version of get_aggregate()
+    
+    Args:
+        location: Location name
+        metric: One of METRICS
+        resolution: 'minute', 'hour' or 'day'
+        start: First timestamp
+        end: Last timestamp
+    
+    Returns:
+        dict: One entry per non-empty bucket
+    """
+    if not is_async_db_ready():
+        return await run_in_threadpool(get_aggregate, location, metric, resolution, start, end)
+    
+    _check_ready()
+    start, end = _resolve_range(resolution, start, end)
+    
+    async with get_async_cursor() as cursor:
+        await cursor.execute(_aggregate_query(metric), (location, resolution, start, end))
+        rows = await cursor.fetchall()
+    return _aggregate_response(location, metric, resolution, start, end, rows)
+
+def rebuild_rollups(
+    location: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    resolutions: Iterable[str] = tuple(RESOLUTIONS)
+) -> Dict[str, int]:
+    """
+    Recompute rollups from the raw weather_data rows
+    
+    The window is widened to whole buckets of each resolution, and the
+    rollups inside it are replaced in one transaction. Readings ingested
+    while the rebuild runs may be counted twice or not at all, so run it
+    while ingestion is paused or rebuild the affected window again.
+    
+    Args:
+        location: Only rebuild this location (default: all)
+        start: First timestamp (default: beginning of the data)
+        end: Last timestamp (default: end of the data)
+        resolutions: Resolutions to rebuild
+    
+    Returns:
+        dict: Number of rollup rows written per resolution
+    """
+    written = {}
+    with get_cursor() as cursor:
+        for resolution in resolutions:
+            _, date_format, _ = RESOLUTIONS[resolution]
+            conditions, params = [], []
+            if location is not None:
+                conditions.append("location = %s")
+                params.append(location)
+            if start is not None:
+                conditions.append("{column} >= %s")
+                params.append(bucket_start(_local_naive(start), resolution))
+            if end is not None:
+                conditions.append("{column} < %s")
+                params.append(_bucket_end(_local_naive(end), resolution))
+            where = " AND ".join(conditions)
+            
+            delete_where = "resolution = %s" + (" AND " + where.format(column="bucket") if where else "")
+            cursor.execute(f"DELETE FROM weather_rollup WHERE {delete_where}", [resolution] + params)
+            
+            raw_where = "WHERE " + where.format(column="createAt") if where else ""
+            aggregates = ", ".join(f"SUM({m}), MIN({m}), MAX({m})" for m in METRICS)
+            cursor.execute(f"""
+                INSERT INTO weather_rollup(location, resolution, bucket, cnt, {_ROLLUP_COLUMNS})
+                SELECT location, %s, DATE_FORMAT(createAt, '{date_format}') AS rollup_bucket, COUNT(*), {aggregates}
+                FROM weather_data {raw_where}
+                GROUP BY location, rollup_bucket
+            """, [resolution] + params)
+            written[resolution] = cursor.rowcount
+    return written
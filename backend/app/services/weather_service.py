@@ -1,9 +1,422 @@
 """
 Weather data service for managing sensor data
 """
-from typing import Optional, List
+import asyncio
+import time
+import numpy as np
+from datetime import datetime, timedelta
+from typing import Optional, List, Any, Tuple
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
 from app.core.database import get_cursor
-from app.models import WeatherDataCreate
+from app.core.async_database import get_async_cursor, is_async_db_ready
+from app.core.metrics import stage_timer
+from app.models import WeatherDataCreate, WeatherReading
+from app.services.ingest_buffer import IngestBuffer
+from app.services.latest_cache import LatestReadingCache
+from app.services.live_feed import LiveFeedHub
+from app.services.rollup_service import update_rollups, update_rollups_async
+
+# Both lookups are served by the (location, id) index from migration 0001
+LAST_WEATHER_QUERY = """
+    SELECT id, temp, humidity, isRaining, lightIntensity, windSpeed, airPressure
+    FROM weather_data WHERE location=%s ORDER BY id DESC LIMIT 1
+"""
+LINE_CHART_QUERY = "SELECT windSpeed FROM weather_data WHERE location=%s ORDER BY id DESC LIMIT %s"
+RECENT_WEATHER_QUERY = """
+    SELECT id, temp, humidity, isRaining, lightIntensity, windSpeed, airPressure
+    FROM weather_data WHERE location=%s ORDER BY id DESC LIMIT %s
+"""
+LOCATIONS_QUERY = "SELECT DISTINCT location FROM weather_data LIMIT %s"
+# Plain %s placeholders only, so that executemany() can rewrite the
+# statement into a single multi-row INSERT
+INSERT_READING_QUERY = """
+    INSERT INTO weather_data(temp, humidity, isRaining, lightIntensity, windSpeed, airPressure, location, createAt)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+"""
+# /create leaves createAt, and location unless one is given, to the column
+# defaults and reads the stored values back for the rollups and caches
+CREATE_READING_QUERY = """
+    INSERT INTO weather_data(temp, humidity, isRaining, lightIntensity, windSpeed, airPressure)
+    VALUES (%s, %s, %s, %s, %s, %s)
+"""
+CREATE_READING_AT_QUERY = """
+    INSERT INTO weather_data(temp, humidity, isRaining, lightIntensity, windSpeed, airPressure, location)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+STORED_READING_QUERY = "SELECT location, createAt FROM weather_data WHERE id=%s"
+# Bulk and write-behind rows are inserted in batches and resolve both values themselves
+LOCATION_DEFAULT_QUERY = """
+    SELECT COLUMN_DEFAULT FROM information_schema.COLUMNS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'weather_data' AND COLUMN_NAME = 'location'
+"""
+DB_NOW_QUERY = "SELECT NOW()"
+
+# Request stage timers (see /metrics)
+_INSERT_TIMER = stage_timer("ingest.insert")
+_ROLLUPS_TIMER = stage_timer("ingest.rollups")
+
+def _weather_row_to_dict(row) -> dict:
+    """Convert a weather_data row into the API response shape"""
+    return {
+        "id": row[0],
+        "temp": row[1],
+        "humidity": row[2],
+        "isRaining": row[3],
+        "lightIntensity": row[4],
+        "windSpeed": row[5],
+        "airPressure": row[6],
+    }
+
+def _as_stored(value):
+    """Round a float the way the FLOAT column returns it"""
+    return float(str(np.float32(value))) if isinstance(value, float) else value
+
+def _insert_params(data: WeatherDataCreate) -> tuple:
+    """Get the metric values of a reading in INSERT_READING_QUERY order"""
+    return (
+        data.temp,
+        data.humidity,
+        data.isRaining,
+        data.lightIntensity,
+        data.windSpeed,
+        data.pressure
+    )
+
+def _reading_params(reading: WeatherReading, received_at: datetime) -> tuple:
+    """Get INSERT_READING_QUERY parameters for a bulk reading"""
+    created_at = reading.createAt or received_at
+    if created_at.tzinfo is not None:
+        # The createAt column has no time zone, store local server time
+        created_at = created_at.astimezone().replace(tzinfo=None)
+    return _insert_params(reading) + (_create_location(reading), created_at)
+
+def _create_location(data: WeatherDataCreate) -> Optional[str]:
+    """Location of a /create or bulk reading, None for the column default"""
+    return data.location or settings.WEATHER_DEFAULT_LOCATION or None
+
+def _create_statement(data: WeatherDataCreate) -> Tuple[str, tuple]:
+    """Get the INSERT statement and parameters of a /create reading"""
+    location = _create_location(data)
+    if location is None:
+        return CREATE_READING_QUERY, _insert_params(data)
+    return CREATE_READING_AT_QUERY, _insert_params(data) + (location,)
+
+def _queued_params(data: WeatherDataCreate) -> tuple:
+    """Get the queue item of a write-behind reading (see _stored_params())"""
+    return _insert_params(data) + (_create_location(data), time.monotonic())
+
+def _validation_message(error: ValidationError) -> str:
+    """Short description of the first validation error of a reading"""
+    first = error.errors()[0]
+    field = ".".join(str(part) for part in first["loc"])
+    return f"{field}: {first['msg']}" if field else first["msg"]
+
+def _prepare_bulk(readings: List[Any]) -> Tuple[List[tuple], List[dict]]:
+    """
+    Validate raw bulk readings one by one
+    
+    Args:
+        readings: Raw reading objects from the request body
+    
+    Returns:
+        tuple: (INSERT parameters of the valid readings, per-row results).
+        Valid rows get a None status until the INSERT outcome is known.
+    """
+    received_at = datetime.now().replace(microsecond=0)
+    params = []
+    results = []
+    
+    for index, raw in enumerate(readings):
+        try:
+            reading = WeatherReading.model_validate(raw)
+        except ValidationError as e:
+            results.append({"index": index, "status": 422, "message": _validation_message(e)})
+            continue
+        params.append(_reading_params(reading, received_at))
+        results.append({"index": index, "status": None, "message": ""})
+    
+    return params, results
+
+def _finish_bulk(results: List[dict], status: int, message: str) -> dict:
+    """Set the outcome of the pending rows and build the bulk response"""
+    for row in results:
+        if row["status"] is None:
+            row["status"] = status
+            row["message"] = message
+    
+    inserted = sum(1 for row in results if row["status"] == 200)
+    rejected = len(results) - inserted
+    
+    if not rejected:
+        response_status, response_message = 200, "Weather data created successfully"
+    elif inserted:
+        response_status, response_message = 207, f"Inserted {inserted} of {len(results)} readings"
+    elif status == 500:
+        response_status, response_message = 500, "Failed to create weather data"
+    else:
+        response_status, response_message = 422, "No readings were inserted"
+    
+    return {
+        "status": response_status,
+        "message": response_message,
+        "inserted": inserted,
+        "rejected": rejected,
+        "results": results,
+    }
+
+# Recent readings per location for /last and /line-chart
+latest_cache = LatestReadingCache(
+    history_size=settings.LATEST_CACHE_HISTORY,
+    max_locations=settings.LATEST_CACHE_MAX_LOCATIONS,
+    max_age=settings.LATEST_CACHE_MAX_AGE,
+)
+
+# Subscribers of /weather-data/stream
+live_feed = LiveFeedHub(
+    queue_size=settings.LIVE_FEED_QUEUE_SIZE,
+    max_subscribers=settings.LIVE_FEED_MAX_SUBSCRIBERS,
+)
+
+def _live_reading(row: tuple, row_id: Optional[int] = None) -> dict:
+    """Convert INSERT_READING_QUERY parameters into a live feed event"""
+    reading = _weather_row_to_dict((row_id,) + tuple(_as_stored(value) for value in row[:6]))
+    reading["location"] = row[6]
+    reading["createAt"] = row[7].strftime("%Y-%m-%d %H:%M:%S")
+    return reading
+
+def _readings_committed(params: List[tuple], row_id: Optional[int] = None) -> None:
+    """
+    Post-commit hook shared by every insert path
+    
+    Args:
+        params: INSERT_READING_QUERY parameters of the committed readings
+        row_id: Id of the row when a single reading was inserted
+    """
+    if row_id is not None and len(params) == 1:
+        values = tuple(_as_stored(value) for value in params[0][:6])
+        latest_cache.record(params[0][6], _weather_row_to_dict((row_id,) + values))
+    else:
+        # Batch inserts do not report every new id, reload these locations
+        latest_cache.invalidate({row[6] for row in params})
+    
+    single_id = row_id if len(params) == 1 else None
+    live_feed.publish((row[6], _live_reading(row, single_id)) for row in params)
+
+# weather_data.location column default, read once by the flusher
+_column_defaults: dict = {}
+
+def _parse_column_default(row: Optional[tuple]) -> Optional[str]:
+    # MariaDB quotes string defaults and reports a missing one as NULL
+    default = row[0].strip("'") if row and row[0] else None
+    return None if default == "NULL" else default
+
+def _location_default(cursor) -> Optional[str]:
+    """Get the weather_data.location column default"""
+    if "location" not in _column_defaults:
+        cursor.execute(LOCATION_DEFAULT_QUERY)
+        _column_defaults["location"] = _parse_column_default(cursor.fetchone())
+    return _column_defaults["location"]
+
+async def _location_default_async(cursor) -> Optional[str]:
+    """Async version of _location_default()"""
+    if "location" not in _column_defaults:
+        await cursor.execute(LOCATION_DEFAULT_QUERY)
+        _column_defaults["location"] = _parse_column_default(await cursor.fetchone())
+    return _column_defaults["location"]
+
+def _fill_locations(params: List[tuple], default: Optional[str]) -> List[tuple]:
+    """Give readings without a location the column default"""
+    return [row if row[6] is not None else row[:6] + (default,) + row[7:] for row in params]
+
+def _stored_params(cursor, queued: List[tuple]) -> List[tuple]:
+    """
+    Turn queued readings into INSERT_READING_QUERY parameters
+    
+    Readings queued without a location get the column default. Arrival
+    times are moved onto the database clock, so createAt matches what the
+    column default would have stamped on arrival.
+    
+    Args:
+        cursor: Cursor of the flush transaction
+        queued: Queue items from _queued_params()
+    
+    Returns:
+        List[tuple]: INSERT_READING_QUERY parameters
+    """
+    cursor.execute(DB_NOW_QUERY)
+    db_now = cursor.fetchone()[0]
+    flushed_at = time.monotonic()
+    default = _location_default(cursor) if any(row[6] is None for row in queued) else None
+    return [
+        row[:6] + (row[6] or default, (db_now - timedelta(seconds=flushed_at - row[7])).replace(microsecond=0))
+        for row in queued
+    ]
+
+def _write_readings(queued: List[tuple]) -> None:
+    """Store a batch of queued readings in one transaction"""
+    with get_cursor() as cursor:
+        params = _stored_params(cursor, queued)
+        cursor.executemany(INSERT_READING_QUERY, params)
+        update_rollups(cursor, params)
+    _readings_committed(params)
+
+# Write-behind buffer for /weather-data/create (started only when enabled)
+ingest_buffer = IngestBuffer(
+    _write_readings,
+    max_size=settings.INGEST_QUEUE_SIZE,
+    batch_size=settings.INGEST_BATCH_SIZE,
+    flush_interval=settings.INGEST_FLUSH_INTERVAL,
+    put_timeout=settings.INGEST_PUT_TIMEOUT,
+    max_attempts=settings.INGEST_MAX_ATTEMPTS,
+)
+
+def start_ingest_buffer() -> None:
+    """Start the write-behind flusher if INGEST_WRITE_BEHIND is enabled"""
+    if settings.INGEST_WRITE_BEHIND:
+        ingest_buffer.start()
+        print(f"✓ Write-behind ingestion enabled (batch {ingest_buffer.batch_size}, every {ingest_buffer.flush_interval}s)")
+
+def stop_ingest_buffer() -> None:
+    """Stop the write-behind flusher and write out the queued readings"""
+    ingest_buffer.stop()
+
+def get_ingest_stats() -> dict:
+    """
+    Get write-behind buffer counters
+    
+    Returns:
+        dict: Queue depth, flush counters and flush latency
+    """
+    return {
+        'status': 200,
+        'write_behind': settings.INGEST_WRITE_BEHIND,
+        **ingest_buffer.stats(),
+    }
+
+def _queue_full_error() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Ingest queue is full, retry later",
+        headers={"Retry-After": str(max(1, round(ingest_buffer.flush_interval)))}
+    )
+
+def _queued_status() -> dict:
+    return {"status": 202, "message": "Weather data queued"}
+
+def start_live_feed() -> None:
+    """Attach the live feed to the running event loop (call from startup)"""
+    live_feed.bind(asyncio.get_running_loop())
+
+def stop_live_feed() -> None:
+    """End every live feed stream"""
+    live_feed.close()
+
+def get_live_feed_stats() -> dict:
+    """
+    Get live feed counters
+    
+    Returns:
+        dict: Subscriber count and delivery counters
+    """
+    return {'status': 200, **live_feed.stats()}
+
+def stream_weather_data(location: str = "Gazipur") -> StreamingResponse:
+    """
+    Subscribe to the readings committed for a location
+    
+    Args:
+        location: Location name
+    
+    Returns:
+        StreamingResponse: Server-Sent Events stream, one `reading` event per reading
+    
+    Raises:
+        HTTPException: If the maximum number of subscribers is reached
+    """
+    subscription = live_feed.subscribe(location)
+    if subscription is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many live feed subscribers, retry later",
+            headers={"Retry-After": "5"}
+        )
+    return StreamingResponse(
+        live_feed.events(subscription, settings.LIVE_FEED_HEARTBEAT),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def get_latest_cache_stats() -> dict:
+    """
+    Get latest reading cache counters
+    
+    Returns:
+        dict: Hit rate and staleness of the cached locations
+    """
+    return {'status': 200, **latest_cache.stats()}
+
+def _load_recent(location: str) -> List[dict]:
+    """Read the newest readings of a location into the cache"""
+    token = latest_cache.begin_load(location)
+    with get_cursor() as cursor:
+        cursor.execute(RECENT_WEATHER_QUERY, (location, latest_cache.history_size))
+        readings = [_weather_row_to_dict(row) for row in cursor.fetchall()]
+    latest_cache.fill(location, readings, token)
+    return readings
+
+async def _load_recent_async(location: str) -> List[dict]:
+    """Async version of _load_recent()"""
+    token = latest_cache.begin_load(location)
+    async with get_async_cursor() as cursor:
+        await cursor.execute(RECENT_WEATHER_QUERY, (location, latest_cache.history_size))
+        readings = [_weather_row_to_dict(row) for row in await cursor.fetchall()]
+    latest_cache.fill(location, readings, token)
+    return readings
+
+def warm_latest_cache() -> None:
+    """Load the recent readings of every known location at startup"""
+    if not latest_cache.enabled:
+        return
+    
+    try:
+        with get_cursor() as cursor:
+            cursor.execute(LOCATIONS_QUERY, (latest_cache.max_locations,))
+            locations = [row[0] for row in cursor.fetchall()]
+        for location in locations:
+            _load_recent(location)
+        print(f"✓ Latest reading cache warmed ({len(locations)} locations)")
+    except Exception as e:
+        print(f"✗ Failed to warm latest reading cache: {e}")
+
+def _insert_status(rowcount: int) -> dict:
+    """Build the create response from the number of inserted rows"""
+    if rowcount == 1:
+        return {"status": 200, "message": "Weather data created successfully"}
+    else:
+        return {"status": 403, "message": "Failed to create weather data"}
+
+def _read_last_weather_data(location: str) -> dict:
+    """Read the most recent reading from MySQL, refilling the cache"""
+    try:
+        if latest_cache.covers(1):
+            readings = _load_recent(location)
+            return readings[0] if readings else {}
+        
+        with get_cursor() as cursor:
+            cursor.execute(LAST_WEATHER_QUERY, (location,))
+            row = cursor.fetchone()
+            
+            if row:
+                return _weather_row_to_dict(row)
+            return {}
+    
+    except Exception as e:
+        print(f"Error getting last weather data: {e}")
+        return {}
 
 def get_last_weather_data(location: str = "Gazipur") -> dict:
     """
@@ -15,28 +428,60 @@ def get_last_weather_data(location: str = "Gazipur") -> dict:
     Returns:
         dict: Weather data or empty dict if not found
     """
+    readings = latest_cache.get(location, 1)
+    if readings is not None:
+        return readings[0] if readings else {}
+    return _read_last_weather_data(location)
+
+async def get_last_weather_data_async(location: str = "Gazipur") -> dict:
+    """
+    Async version of get_last_weather_data()
+    
+    Args:
+        location: Location name
+    
+    Returns:
+        dict: Weather data or empty dict if not found
+    """
+    readings = latest_cache.get(location, 1)
+    if readings is not None:
+        return readings[0] if readings else {}
+    if not is_async_db_ready():
+        return await run_in_threadpool(_read_last_weather_data, location)
+    
     try:
-        with get_cursor() as cursor:
-            query = "SELECT * FROM weather_data WHERE location=%s ORDER BY id DESC LIMIT 1"
-            cursor.execute(query, (location,))
-            row = cursor.fetchone()
+        if latest_cache.covers(1):
+            readings = await _load_recent_async(location)
+            return readings[0] if readings else {}
+        
+        async with get_async_cursor() as cursor:
+            await cursor.execute(LAST_WEATHER_QUERY, (location,))
+            row = await cursor.fetchone()
             
             if row:
-                return {
-                    "id": row[0],
-                    "temp": row[1],
-                    "humidity": row[2],
-                    "isRaining": row[3],
-                    "lightIntensity": row[4],
-                    "windSpeed": row[5],
-                    "airPressure": row[6],
-                }
+                return _weather_row_to_dict(row)
             return {}
     
     except Exception as e:
         print(f"Error getting last weather data: {e}")
         return {}
 
+def _read_line_chart_data(location: str, limit: int) -> List[float]:
+    """Read recent wind speeds from MySQL, refilling the cache"""
+    try:
+        if latest_cache.covers(limit):
+            return [reading["windSpeed"] for reading in _load_recent(location)[:limit]]
+        
+        with get_cursor() as cursor:
+            cursor.execute(LINE_CHART_QUERY, (location, limit))
+            rows = cursor.fetchall()
+            
+            return [row[0] for row in rows]
+    
+    except Exception as e:
+        print(f"Error getting line chart data: {e}")
+        return []
+
 def get_line_chart_data(location: str = "Gazipur", limit: int = 10) -> List[float]:
     """
     Get wind speed data for line chart
@@ -48,11 +493,36 @@ def get_line_chart_data(location: str = "Gazipur", limit: int = 10) -> List[floa
     Returns:
         list: Wind speed values
     """
+    readings = latest_cache.get(location, limit)
+    if readings is not None:
+        return [reading["windSpeed"] for reading in readings]
+    return _read_line_chart_data(location, limit)
+
+async def get_line_chart_data_async(location: str = "Gazipur", limit: int = 10) -> List[float]:
+    """
+    Async version of get_line_chart_data()
+    
+    Args:
+        location: Location name
+        limit: Number of records to retrieve
+    
+    Returns:
+        list: Wind speed values
+    """
+    readings = latest_cache.get(location, limit)
+    if readings is not None:
+        return [reading["windSpeed"] for reading in readings]
+    if not is_async_db_ready():
+        return await run_in_threadpool(_read_line_chart_data, location, limit)
+    
     try:
-        with get_cursor() as cursor:
-            query = "SELECT windSpeed FROM weather_data WHERE location=%s ORDER BY id DESC LIMIT %s"
-            cursor.execute(query, (location, limit))
-            rows = cursor.fetchall()
+        if latest_cache.covers(limit):
+            readings = await _load_recent_async(location)
+            return [reading["windSpeed"] for reading in readings[:limit]]
+        
+        async with get_async_cursor() as cursor:
+            await cursor.execute(LINE_CHART_QUERY, (location, limit))
+            rows = await cursor.fetchall()
             
             return [row[0] for row in rows]
     
@@ -69,27 +539,146 @@ def create_weather_data(data: WeatherDataCreate) -> dict:
     
     Returns:
         dict: Status response
+    
+    Raises:
+        HTTPException: If write-behind is enabled and its queue is full
     """
+    if ingest_buffer.running:
+        if not ingest_buffer.submit(_queued_params(data)):
+            raise _queue_full_error()
+        return _queued_status()
+    
     try:
+        query, values = _create_statement(data)
         with get_cursor() as cursor:
-            query = """
-                INSERT INTO weather_data(temp, humidity, isRaining, lightIntensity, windSpeed, airPressure) 
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """
-            cursor.execute(query, (
-                data.temp,
-                data.humidity,
-                data.isRaining,
-                data.lightIntensity,
-                data.windSpeed,
-                data.pressure
-            ))
-            
-            if cursor.rowcount == 1:
-                return {"status": 200, "message": "Weather data created successfully"}
-            else:
-                return {"status": 403, "message": "Failed to create weather data"}
+            with _INSERT_TIMER.time():
+                cursor.execute(query, values)
+            rowcount, row_id = cursor.rowcount, cursor.lastrowid
+            if rowcount != 1:
+                return _insert_status(rowcount)
+            cursor.execute(STORED_READING_QUERY, (row_id,))
+            params = _insert_params(data) + tuple(cursor.fetchone())
+            with _ROLLUPS_TIMER.time():
+                update_rollups(cursor, [params])
+        _readings_committed([params], row_id)
+        return _insert_status(rowcount)
     
     except Exception as e:
         print(f"Error creating weather data: {e}")
         return {"status": 500, "message": f"Error: {str(e)}"}
+
+async def create_weather_data_async(data: WeatherDataCreate) -> dict:
+    """
+    Async version of create_weather_data()
+    
+    Args:
+        data: Weather data to insert
+    
+    Returns:
+        dict: Status response
+    
+    Raises:
+        HTTPException: If write-behind is enabled and its queue is full
+    """
+    if ingest_buffer.running:
+        params = _queued_params(data)
+        # Only wait for room (blocking) in a worker thread
+        if not ingest_buffer.submit(params, block=False):
+            if not await run_in_threadpool(ingest_buffer.submit, params):
+                raise _queue_full_error()
+        return _queued_status()
+    
+    if not is_async_db_ready():
+        return await run_in_threadpool(create_weather_data, data)
+    
+    try:
+        query, values = _create_statement(data)
+        async with get_async_cursor() as cursor:
+            with _INSERT_TIMER.time():
+                await cursor.execute(query, values)
+            rowcount, row_id = cursor.rowcount, cursor.lastrowid
+            if rowcount != 1:
+                return _insert_status(rowcount)
+            await cursor.execute(STORED_READING_QUERY, (row_id,))
+            params = _insert_params(data) + tuple(await cursor.fetchone())
+            with _ROLLUPS_TIMER.time():
+                await update_rollups_async(cursor, [params])
+        _readings_committed([params], row_id)
+        return _insert_status(rowcount)
+    
+    except Exception as e:
+        print(f"Error creating weather data: {e}")
+        return {"status": 500, "message": f"Error: {str(e)}"}
+
+def create_weather_data_bulk(readings: List[Any], on_error: str = "skip") -> dict:
+    """
+    Insert many weather readings with a single multi-row INSERT
+    
+    Every reading is validated on its own. All valid readings are written
+    with one executemany() call inside one transaction.
+    
+    Args:
+        readings: Raw reading objects (see WeatherReading)
+        on_error: 'skip' to insert the valid readings and report the bad
+            ones, 'reject' to insert nothing if any reading is invalid
+    
+    Returns:
+        dict: Overall status plus a status for every reading
+    """
+    params, results = _prepare_bulk(readings)
+    
+    if on_error == "reject" and len(params) < len(results):
+        return _finish_bulk(results, 409, "Not inserted: batch contains invalid readings")
+    if not params:
+        return _finish_bulk(results, 200, "Inserted")
+    
+    try:
+        with get_cursor() as cursor:
+            if any(row[6] is None for row in params):
+                params = _fill_locations(params, _location_default(cursor))
+            with _INSERT_TIMER.time():
+                cursor.executemany(INSERT_READING_QUERY, params)
+            with _ROLLUPS_TIMER.time():
+                update_rollups(cursor, params)
+        _readings_committed(params)
+        return _finish_bulk(results, 200, "Inserted")
+    
+    except Exception as e:
+        print(f"Error creating bulk weather data: {e}")
+        return _finish_bulk(results, 500, f"Error: {str(e)}")
+
+async def create_weather_data_bulk_async(readings: List[Any], on_error: str = "skip") -> dict:
+    """
+    Async version of create_weather_data_bulk()
+    
+    Args:
+        readings: Raw reading objects (see WeatherReading)
+        on_error: 'skip' or 'reject'
+    
+    Returns:
+        dict: Overall status plus a status for every reading
+    """
+    if not is_async_db_ready():
+        return await run_in_threadpool(create_weather_data_bulk, readings, on_error)
+    
+    params, results = _prepare_bulk(readings)
+    
+    if on_error == "reject" and len(params) < len(results):
+        return _finish_bulk(results, 409, "Not inserted: batch contains invalid readings")
+    if not params:
+        return _finish_bulk(results, 200, "Inserted")
+    
+    try:
+        async with get_async_cursor() as cursor:
+            if any(row[6] is None for row in params):
+                params = _fill_locations(params, await _location_default_async(cursor))
+            with _INSERT_TIMER.time():
+                await cursor.executemany(INSERT_READING_QUERY, params)
+            with _ROLLUPS_TIMER.time():
+                await update_rollups_async(cursor, params)
+        _readings_committed(params)
+        return _finish_bulk(results, 200, "Inserted")
+    
+    except Exception as e:
+        print(f"Error creating bulk weather data: {e}")
+        return _finish_bulk(results, 500, f"Error: {str(e)}")
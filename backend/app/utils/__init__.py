@@ -2,12 +2,17 @@
 Utility functions package
 """
 from app.utils.email import send_email, send_otp_email
-from app.utils.security import hash_password, verify_password, generate_otp
+from app.utils.security import hash_password, verify_password, generate_otp, require_admin_token
+from app.utils.serialization import dumps, json_safe, FastJSONResponse
 
 __all__ = [
     'send_email', 
     'send_otp_email',
     'hash_password', 
     'verify_password', 
-    'generate_otp'
+    'generate_otp',
+    'require_admin_token',
+    'dumps',
+    'json_safe',
+    'FastJSONResponse'
 ]
@@ -3,6 +3,9 @@ Security and authentication utilities
 """
 import bcrypt
 import secrets
+from typing import Optional
+from fastapi import Header, HTTPException
+from app.core.config import settings
 
 def hash_password(password: str) -> str:
     """
@@ -37,3 +40,18 @@ def generate_otp() -> str:
         str: 6-digit OTP string
     """
     return str(secrets.randbelow(900000) + 100000)
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    FastAPI dependency guarding admin endpoints
+    
+    Args:
+        x_admin_token: Value of the X-Admin-Token header
+    
+    Raises:
+        HTTPException: If ADMIN_TOKEN is not configured or the header does not match
+    """
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN is not set)")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token.encode('utf-8'), settings.ADMIN_TOKEN.encode('utf-8')):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
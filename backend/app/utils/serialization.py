@@ -0,0 +1,53 @@
+"""
+Fast JSON serialization utilities
+"""
+import json
+import math
+from typing import Any
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+def dumps(content: Any) -> bytes:
+    """
+    Serialize content to JSON bytes
+    
+    Uses orjson when it is installed and falls back to the standard
+    library otherwise.
+    
+    Args:
+        content: JSON-compatible content
+    
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+def json_safe(content: Any) -> Any:
+    """
+    Replace NaN and Infinity (not valid JSON) by their string form
+    
+    Args:
+        content: Content that may hold non-finite floats (in dicts, lists or tuples)
+    
+    Returns:
+        Any: The content with every non-finite float as a string
+    """
+    if isinstance(content, float) and not math.isfinite(content):
+        return str(content)
+    if isinstance(content, dict):
+        return {key: json_safe(value) for key, value in content.items()}
+    if isinstance(content, (list, tuple)):
+        return [json_safe(value) for value in content]
+    return content
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with dumps(), skipping response model validation"""
+    
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
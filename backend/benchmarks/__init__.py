@@ -0,0 +1,6 @@
+"""
+Benchmarks for the Weather Prediction API
+
+Run from the backend/ folder, e.g.:
+    python -m benchmarks.latest_reading_queries --help
+"""
@@ -0,0 +1,10 @@
+"""
+Endpoint benchmark suite
+
+Drives create_app() in-process against the AI model and a SQLite
+stand-in for MySQL, and reports throughput and latency percentiles per
+endpoint, concurrency level and request size. Run from the backend/
+folder:
+    python -m benchmarks.endpoints --output before.json
+    python -m benchmarks.endpoints.compare before.json after.json
+"""
@@ -0,0 +1,160 @@
+"""
+Endpoint benchmark: throughput and latency percentiles per endpoint
+
+Builds the app with create_app() against the AI model at --model and a
+SQLite stand-in seeded from weather_app_db.sql (see stand_in.py), then
+loads every endpoint at each concurrency level and request size:
+
+    endpoint     route (and request size: hours, days or readings)
+    conc         requests in flight
+    rps          successful requests per second
+    p50/p95/p99  latency percentiles in ms
+    err          requests that did not return 200
+
+Routes use the synchronous pool (DB_ASYNC_ENABLED=false), the only path
+the stand-in can serve. Results are written as JSON; compare two runs
+with `python -m benchmarks.endpoints.compare`.
+
+Usage:
+    python -m benchmarks.endpoints --output bench.json
+    python -m benchmarks.endpoints --model ml_models/combined.joblib --concurrency 1,16,64 --duration 10
+    python -m benchmarks.endpoints --endpoints ai-prediction/hourly,auth/login --hours 24,168 --output after.json
+    python -m benchmarks.endpoints --dump weather_app_bd.sql --output schema-only.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+from datetime import datetime
+from typing import List, Optional
+import httpx
+from app import create_app
+from app.core.config import settings
+from app.core.database import db_pool
+from app.services import get_model_status
+from app.services.auth_service import INSERT_USER_QUERY
+from app.utils.security import hash_password
+from benchmarks.endpoints.stand_in import StandInDatabase, default_dump
+from benchmarks.endpoints.runner import (
+    BENCH_USERNAME,
+    BENCH_PASSWORD,
+    build_scenarios,
+    run_scenario
+)
+
+def parse_sizes(value: str) -> List[int]:
+    return [int(n) for n in value.split(",") if n]
+
+def git_revision() -> Optional[str]:
+    """Commit of the benchmarked tree, marked -dirty with local changes"""
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run(args: argparse.Namespace) -> dict:
+    app = create_app()
+    await app.router.startup()
+    try:
+        status = get_model_status()
+        if status['state'] != 'ready':
+            raise RuntimeError(f"AI model at {settings.MODEL_PATH} is {status['state']}")
+        
+        scenarios = build_scenarios(parse_sizes(args.hours), parse_sizes(args.days), parse_sizes(args.bulk))
+        if args.endpoints:
+            wanted = set(args.endpoints.split(","))
+            scenarios = [s for s in scenarios if s.name in wanted]
+        
+        results = []
+        offset = 0
+        print(f"\n{'endpoint':<28} {'conc':>5} {'rps':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'err':>5}")
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            for scenario in scenarios:
+                for concurrency in parse_sizes(args.concurrency):
+                    result = await run_scenario(
+                        client, scenario, concurrency, args.duration, args.max_requests, args.warmup, offset
+                    )
+                    offset += result['requests'] + result['errors'] + args.warmup
+                    results.append(result)
+                    label = scenario.name if scenario.size == 1 else f"{scenario.name} ({scenario.size})"
+                    print(f"{label:<28} {concurrency:>5} {result['throughput_rps']:>9.1f} {result['p50_ms']:>9.2f} "
+                          f"{result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} {result['errors']:>5}")
+                    if 'first_error' in result:
+                        print(f"    ✗ {result['first_error']}")
+        return {'model_id': status['model_id'], 'results': results}
+    finally:
+        await app.router.shutdown()
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the API endpoints in-process against a database stand-in")
+    parser.add_argument("--model", default=settings.MODEL_PATH, help="AI model file or bundle (default: MODEL_PATH)")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma separated requests in flight (default: 1,8,32)")
+    parser.add_argument("--duration", type=float, default=5, help="Seconds per endpoint and level (default: 5)")
+    parser.add_argument("--max-requests", type=int, default=2000, help="Requests per endpoint and level at most")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed requests before each run (default: 5)")
+    parser.add_argument("--hours", default="24,168", help="num_hours of /ai-prediction/hourly (default: 24,168)")
+    parser.add_argument("--days", default="7,30", help="num_days of /ai-prediction/daily (default: 7,30)")
+    parser.add_argument("--bulk", default="10,100", help="Readings per /weather-data/bulk request (default: 10,100)")
+    parser.add_argument("--endpoints", help="Comma separated endpoints to run (default: all)")
+    parser.add_argument("--engine", choices=["sklearn", "flat"], default=settings.INFERENCE_ENGINE,
+                        help="Inference engine (default: INFERENCE_ENGINE)")
+    parser.add_argument("--database", help="Stand-in database file to create (default: a temporary file)")
+    parser.add_argument("--dump", default=default_dump(),
+                        help="MySQL dump to seed the stand-in from (default: ../weather_app_db.sql)")
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+    
+    settings.MODEL_PATH = args.model
+    settings.INFERENCE_ENGINE = args.engine
+    settings.MODEL_BACKGROUND_LOAD = False
+    settings.MODEL_WATCH_ENABLED = False
+    settings.DB_ASYNC_ENABLED = False
+    settings.MIGRATIONS_ENABLED = False
+    
+    started = datetime.now()
+    database = StandInDatabase(args.database, args.dump)
+    try:
+        database.install(db_pool)
+        database.execute(INSERT_USER_QUERY, (BENCH_USERNAME, hash_password(BENCH_PASSWORD), "bench@example.com", "user"))
+        outcome = asyncio.run(run(args))
+    finally:
+        db_pool.close()
+        if not args.database:
+            database.remove()
+    
+    errors = sum(result['errors'] for result in outcome['results'])
+    if args.output:
+        report = {
+            'started': started.isoformat(timespec='seconds'),
+            'environment': {
+                'revision': git_revision(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+                'model_path': args.model,
+                'model_id': outcome['model_id'],
+                'inference_engine': args.engine,
+                'dump': os.path.basename(args.dump),
+                'db_pool_max_size': settings.DB_POOL_MAX_SIZE,
+            },
+            'parameters': {
+                'duration': args.duration,
+                'max_requests': args.max_requests,
+                'warmup': args.warmup,
+            },
+            'results': outcome['results'],
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Results written to {args.output}")
+    if errors:
+        print(f"✗ {errors} requests failed")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,83 @@
+"""
+Compare two endpoint benchmark runs
+
+Matches the results of two JSON files written by
+`python -m benchmarks.endpoints --output` by endpoint, request size and
+concurrency, prints the change of throughput and latency percentiles and
+flags regressions: throughput down or p95/p99 up by more than
+--threshold.
+
+Runs on one machine only compare with each other; check that the
+environment (revision, CPUs, model, engine) printed first is the one
+you meant to compare.
+
+Usage:
+    python -m benchmarks.endpoints.compare before.json after.json
+    python -m benchmarks.endpoints.compare before.json after.json --threshold 0.05
+"""
+import argparse
+import json
+from typing import Dict, List, Tuple
+
+Key = Tuple[str, int, int]
+
+def load_results(path: str) -> Tuple[dict, Dict[Key, dict]]:
+    """Environment and results keyed by (endpoint, size, concurrency)"""
+    with open(path, "r", encoding="utf-8") as f:
+        report = json.load(f)
+    results = {(r['endpoint'], r['size'], r['concurrency']): r for r in report['results']}
+    return report.get('environment', {}), results
+
+def change(before: float, after: float) -> float:
+    """Relative change from before to after"""
+    return (after - before) / before if before else 0.0
+
+def regressions(before: dict, after: dict, threshold: float) -> List[str]:
+    """Metrics of one result that got worse by more than threshold"""
+    worse = []
+    if change(before['throughput_rps'], after['throughput_rps']) < -threshold:
+        worse.append('rps')
+    for metric in ('p95_ms', 'p99_ms'):
+        if change(before[metric], after[metric]) > threshold:
+            worse.append(metric[:3])
+    if after['errors'] > before['errors']:
+        worse.append('errors')
+    return worse
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare two endpoint benchmark runs")
+    parser.add_argument("before", help="Baseline results JSON")
+    parser.add_argument("after", help="Results JSON to check")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative change counted as a regression (default: 0.10)")
+    args = parser.parse_args()
+    
+    before_env, before = load_results(args.before)
+    after_env, after = load_results(args.after)
+    for name in sorted(set(before_env) | set(after_env)):
+        old, new = before_env.get(name), after_env.get(name)
+        print(f"{name + ':':<18} {old}" + ("" if old == new else f" -> {new}"))
+    
+    print(f"\n{'endpoint':<28} {'conc':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    flagged = 0
+    for key in sorted(before.keys() & after.keys()):
+        endpoint, size, concurrency = key
+        old, new = before[key], after[key]
+        worse = regressions(old, new, args.threshold)
+        flagged += bool(worse)
+        label = endpoint if size == 1 else f"{endpoint} ({size})"
+        print(f"{label:<28} {concurrency:>5} "
+              + " ".join(f"{change(old[m], new[m]):>+8.1%}" for m in ('throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms'))
+              + (f"  ✗ {', '.join(worse)}" if worse else ""))
+    
+    for key in sorted(before.keys() ^ after.keys()):
+        print(f"  only in {'before' if key in before else 'after'}: {key[0]} size {key[1]} concurrency {key[2]}")
+    
+    if flagged:
+        print(f"\n✗ {flagged} results regressed by more than {args.threshold:.0%}")
+        return 1
+    print(f"\n✓ No regression above {args.threshold:.0%}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
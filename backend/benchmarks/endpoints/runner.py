@@ -0,0 +1,187 @@
+"""
+In-process load runner for the API endpoints
+
+Sends requests to the ASGI app through httpx's ASGITransport from a
+number of concurrent tasks, so the measured time covers routing,
+validation, the services, the pool and response serialization, but no
+sockets or HTTP parsing.
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, NamedTuple, Optional
+import httpx
+import numpy as np
+
+BENCH_USERNAME = "bench"
+BENCH_PASSWORD = "bench-password"
+BENCH_LOCATION = "Bench"
+# Prediction requests step through distinct start hours, so each one
+# misses the prediction cache (the first PREDICTION_CACHE_SIZE at least)
+PREDICTION_START = datetime(2025, 1, 1)
+
+class Scenario(NamedTuple):
+    """
+    One endpoint at one request size
+    
+    Attributes:
+        name: Endpoint name used in the results
+        size: Hours, days or readings per request (1 if not applicable)
+        build: Callable mapping the request number to httpx.request() arguments
+    """
+    name: str
+    size: int
+    build: Callable[[int], dict]
+
+def _hourly(hours: int) -> Callable[[int], dict]:
+    def build(i: int) -> dict:
+        start = PREDICTION_START + timedelta(hours=i)
+        return {"method": "POST", "url": "/ai-prediction/hourly", "json": {
+            "day": start.day, "month": start.month, "year": start.year, "hour": start.hour, "num_hours": hours,
+        }}
+    return build
+
+def _daily(days: int) -> Callable[[int], dict]:
+    def build(i: int) -> dict:
+        start = PREDICTION_START + timedelta(days=i)
+        return {"method": "POST", "url": "/ai-prediction/daily", "json": {
+            "day": start.day, "month": start.month, "year": start.year, "num_days": days,
+        }}
+    return build
+
+def _reading(i: int) -> dict:
+    return {
+        "temp": 25 + i % 10, "humidity": 60 + i % 30, "isRaining": i % 2,
+        "lightIntensity": 500, "windSpeed": 3.5, "pressure": 1010,
+    }
+
+def _create(i: int) -> dict:
+    return {"method": "POST", "url": "/weather-data/create", "json": _reading(i)}
+
+def _bulk(readings: int) -> Callable[[int], dict]:
+    def build(i: int) -> dict:
+        return {"method": "POST", "url": "/weather-data/bulk", "json": [
+            {**_reading(i * readings + j), "location": BENCH_LOCATION} for j in range(readings)
+        ]}
+    return build
+
+def _login(i: int) -> dict:
+    return {"method": "POST", "url": "/auth/login", "json": {"username": BENCH_USERNAME, "password": BENCH_PASSWORD}}
+
+def _last(i: int) -> dict:
+    return {"method": "GET", "url": "/weather-data/last", "params": {"location": "Gazipur"}}
+
+def build_scenarios(hours: List[int], days: List[int], bulk: List[int]) -> List[Scenario]:
+    """
+    The benchmarked endpoints at their request sizes
+    
+    Args:
+        hours: num_hours values for /ai-prediction/hourly
+        days: num_days values for /ai-prediction/daily
+        bulk: Readings per /weather-data/bulk request
+    
+    Returns:
+        list: Scenarios in run order
+    """
+    return (
+        [Scenario("ai-prediction/hourly", n, _hourly(n)) for n in hours]
+        + [Scenario("ai-prediction/daily", n, _daily(n)) for n in days]
+        + [Scenario("weather-data/create", 1, _create)]
+        + [Scenario("weather-data/bulk", n, _bulk(n)) for n in bulk]
+        + [Scenario("weather-data/last", 1, _last)]
+        + [Scenario("auth/login", 1, _login)]
+    )
+
+def summarize(latencies_ms: List[float], errors: int, seconds: float) -> dict:
+    """
+    Throughput and latency percentiles of one run
+    
+    Args:
+        latencies_ms: Latency of every successful request
+        errors: Requests that failed or did not return 200
+        seconds: Wall time of the run
+    
+    Returns:
+        dict: requests, errors, throughput_rps, mean/p50/p95/p99/max in ms
+    """
+    values = np.asarray(latencies_ms, dtype=np.float64)
+    if not values.size:
+        values = np.asarray([np.nan])
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        'requests': len(latencies_ms),
+        'errors': errors,
+        'seconds': round(seconds, 3),
+        'throughput_rps': round(len(latencies_ms) / seconds, 2) if seconds else 0.0,
+        'mean_ms': round(float(np.mean(values)), 3),
+        'p50_ms': round(float(p50), 3),
+        'p95_ms': round(float(p95), 3),
+        'p99_ms': round(float(p99), 3),
+        'max_ms': round(float(np.max(values)), 3),
+    }
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    concurrency: int,
+    duration: float,
+    max_requests: int,
+    warmup: int = 5,
+    offset: int = 0
+) -> dict:
+    """
+    Load one scenario from `concurrency` tasks
+    
+    Every task sends its next request as soon as the previous one
+    answered, until `duration` seconds passed or `max_requests` were sent.
+    
+    Args:
+        client: Client bound to the app
+        scenario: Endpoint and request size
+        concurrency: Requests in flight
+        duration: Seconds to run (after the warm-up)
+        max_requests: Upper bound of timed requests
+        warmup: Untimed requests sent first
+        offset: First request number (keeps prediction starts distinct across runs)
+    
+    Returns:
+        dict: summarize() of the run plus scenario, size and concurrency
+    """
+    for i in range(warmup):
+        await client.request(**scenario.build(offset + i))
+    
+    latencies: List[float] = []
+    errors = 0
+    counter = offset + warmup
+    sent = 0
+    deadline = time.perf_counter() + duration
+    first_error: Optional[str] = None
+    
+    async def worker() -> None:
+        nonlocal counter, sent, errors, first_error
+        while sent < max_requests and time.perf_counter() < deadline:
+            number, counter, sent = counter, counter + 1, sent + 1
+            started = time.perf_counter()
+            try:
+                response = await client.request(**scenario.build(number))
+                ok = response.status_code == 200
+                detail = f"HTTP {response.status_code}: {response.text[:200]}"
+            except Exception as e:
+                ok, detail = False, repr(e)
+            if ok:
+                latencies.append((time.perf_counter() - started) * 1000)
+            else:
+                errors += 1
+                first_error = first_error or detail
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result = {
+        'endpoint': scenario.name,
+        'size': scenario.size,
+        'concurrency': concurrency,
+        **summarize(latencies, errors, time.perf_counter() - started),
+    }
+    if first_error:
+        result['first_error'] = first_error
+    return result
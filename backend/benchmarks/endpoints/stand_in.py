@@ -0,0 +1,213 @@
+"""
+SQLite stand-in for the MySQL database
+
+Builds a scratch SQLite file from a MySQL dump (the repository's
+weather_app_db.sql with its sensor readings, or backend/weather_app_bd.sql)
+and the schema migrations (tables, indexes, seed rows) and serves it through objects
+with the MySQLdb connection/cursor interface the connection pool and the
+services use. Statements are translated on the fly from the MySQL
+dialect the services speak (%s placeholders, ON DUPLICATE KEY UPDATE,
+VALUES(), LEAST/GREATEST).
+
+The stand-in has no network round trip and a different storage engine,
+so timings against it show the cost of the API itself (routing,
+validation, pooling, model, serialization), not of MySQL.
+"""
+import os
+import re
+import sqlite3
+import tempfile
+from datetime import datetime
+from typing import List, Optional
+from app.core.database import ConnectionPool
+from app.core.migrations import load_migrations
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SCHEMA_DUMP = os.path.join(BACKEND_DIR, "weather_app_bd.sql")
+DATA_DUMP = os.path.join(os.path.dirname(BACKEND_DIR), "weather_app_db.sql")
+
+def default_dump() -> str:
+    """The repository's data dump if it is checked out, else the schema dump"""
+    return DATA_DUMP if os.path.exists(DATA_DUMP) else SCHEMA_DUMP
+
+_CREATE_TABLE = re.compile(r"CREATE TABLE (?:IF NOT EXISTS )?`(\w+)` \((.*?)\n\)[^;]*;", re.S)
+_INSERT = re.compile(r"^INSERT INTO `\w+`.*?\);$", re.S | re.M)
+_ADD_INDEX = re.compile(r"ALTER TABLE `(\w+)`\s+ADD INDEX `(\w+)` \(([^)]*)\)", re.S)
+_UPSERT = re.compile(r"ON DUPLICATE KEY UPDATE")
+_VALUES_REF = re.compile(r"VALUES\((\w+)\)")
+_CHARSET = re.compile(r" (?:CHARACTER SET|COLLATE) \w+")
+_COLUMN_DEFAULT = re.compile(r"information_schema\.COLUMNS.*TABLE_NAME = '(\w+)' AND COLUMN_NAME = '(\w+)'", re.S)
+_NOW = re.compile(r"\s*SELECT NOW\(\)\s*$")
+_ID_KEY = "`id` INTEGER PRIMARY KEY AUTOINCREMENT"
+
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(sep=" "))
+# Read TIMESTAMP/DATETIME columns back as datetime, like MySQLdb
+for _type in ("timestamp", "datetime"):
+    sqlite3.register_converter(_type, lambda value: datetime.fromisoformat(value.decode()))
+
+def _column_definition(line: str) -> Optional[str]:
+    line = line.strip().rstrip(",")
+    if not line.startswith("`"):
+        # PRIMARY KEY (...) of a migration table
+        return line if line.startswith("PRIMARY KEY") else None
+    if re.match(r"`id` ", line):
+        return _ID_KEY
+    line = re.sub(r"enum\([^)]*\)", "TEXT", line)
+    line = _CHARSET.sub("", line)
+    line = line.replace(" UNSIGNED", "").replace("current_timestamp()", "CURRENT_TIMESTAMP")
+    return line
+
+def schema_statements(dump: str) -> List[str]:
+    """
+    SQLite statements creating and filling the tables of a MySQL dump
+    
+    Works with keys added after the tables (phpMyAdmin, weather_app_bd.sql)
+    or declared inline (mysqldump / HeidiSQL, ../weather_app_db.sql).
+    
+    Args:
+        dump: Contents of a mysqldump / phpMyAdmin export
+    
+    Returns:
+        list: CREATE TABLE, CREATE INDEX and INSERT statements
+    """
+    statements = []
+    for table, body in _CREATE_TABLE.findall(dump):
+        columns = [c for c in map(_column_definition, body.split("\n")) if c]
+        if _ID_KEY in columns:
+            # An inline PRIMARY KEY (`id`) of the dump; id already is the key
+            columns = [c for c in columns if not c.startswith("PRIMARY KEY")]
+        statements.append(f"CREATE TABLE IF NOT EXISTS `{table}` ({', '.join(columns)})")
+    for table, index, columns in _ADD_INDEX.findall(dump):
+        statements.append(f"CREATE INDEX IF NOT EXISTS `{index}` ON `{table}` ({columns})")
+    statements.extend(_INSERT.findall(dump))
+    return statements
+
+def translate(query: str) -> str:
+    """Rewrite a MySQL statement of the services for SQLite"""
+    column_default = _COLUMN_DEFAULT.search(query)
+    if column_default:
+        return "SELECT dflt_value FROM pragma_table_info('%s') WHERE name = '%s'" % column_default.groups()
+    if _NOW.match(query):
+        # Same clock as the CURRENT_TIMESTAMP column defaults
+        return 'SELECT CURRENT_TIMESTAMP AS "now [timestamp]"'
+    if _UPSERT.search(query):
+        # Tables written with upserts key on their PRIMARY KEY
+        query = _UPSERT.sub("ON CONFLICT DO UPDATE SET", query)
+        query = _VALUES_REF.sub(r"excluded.\1", query)
+        query = query.replace("LEAST(", "MIN(").replace("GREATEST(", "MAX(")
+    return query.replace("%s", "?")
+
+class StandInCursor:
+    """MySQLdb-style cursor over a SQLite cursor"""
+    
+    def __init__(self, cursor: sqlite3.Cursor):
+        self._cursor = cursor
+    
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+    
+    @property
+    def lastrowid(self) -> Optional[int]:
+        return self._cursor.lastrowid
+    
+    @property
+    def description(self):
+        return self._cursor.description
+    
+    def execute(self, query: str, params=()) -> int:
+        self._cursor.execute(translate(query), tuple(params or ()))
+        return self._cursor.rowcount
+    
+    def executemany(self, query: str, params) -> int:
+        self._cursor.executemany(translate(query), [tuple(p) for p in params])
+        return self._cursor.rowcount
+    
+    def fetchone(self):
+        return self._cursor.fetchone()
+    
+    def fetchmany(self, size: int = 1):
+        return self._cursor.fetchmany(size)
+    
+    def fetchall(self):
+        return self._cursor.fetchall()
+    
+    def close(self) -> None:
+        self._cursor.close()
+
+class StandInConnection:
+    """MySQLdb-style connection to the stand-in database file"""
+    
+    def __init__(self, path: str):
+        # Pooled connections move between worker threads
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False,
+                                     detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
+    
+    def cursor(self, *args) -> StandInCursor:
+        return StandInCursor(self._conn.cursor())
+    
+    def commit(self) -> None:
+        self._conn.commit()
+    
+    def rollback(self) -> None:
+        self._conn.rollback()
+    
+    def ping(self, *args) -> None:
+        pass
+    
+    def close(self) -> None:
+        self._conn.close()
+
+class StandInDatabase:
+    """
+    Scratch SQLite database seeded like a fresh MySQL install
+    
+    Args:
+        path: Database file (default: a new temporary file)
+        dump: SQL dump to seed from (default: default_dump())
+    """
+    
+    def __init__(self, path: Optional[str] = None, dump: Optional[str] = None):
+        dump = dump or default_dump()
+        if path is None:
+            handle, path = tempfile.mkstemp(prefix="weather_bench_", suffix=".sqlite")
+            os.close(handle)
+        self.path = path
+        
+        with open(dump, "r", encoding="utf-8") as f:
+            sql = f.read()
+        # Migrations add tables and indexes on top of the dump
+        sql += "\n" + "\n".join(s + ";" for m in load_migrations() for s in m.statements)
+        
+        conn = sqlite3.connect(self.path)
+        try:
+            # WAL lets readers run while a write is committing
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in schema_statements(sql):
+                conn.execute(statement)
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def connect(self) -> StandInConnection:
+        return StandInConnection(self.path)
+    
+    def execute(self, query: str, params=()) -> None:
+        """Run one statement (MySQL dialect) and commit it"""
+        conn = self.connect()
+        try:
+            conn.cursor().execute(query, params)
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def install(self, pool: ConnectionPool) -> None:
+        """Make a connection pool hand out stand-in connections"""
+        pool.close()
+        pool.factory = self.connect
+    
+    def remove(self) -> None:
+        """Delete the database files"""
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
@@ -0,0 +1,90 @@
+"""
+Prediction latency of the sklearn forests vs. the flat-array engine
+
+Loads the AI model (combined package or split directory), compiles its forests into FlatForest
+evaluators (INFERENCE_ENGINE=flat), checks that both engines predict the
+same, then times regressor + classifier predictions per request size:
+
+    rows     hours/days predicted by one call
+    sklearn  median ms of RandomForest*.predict (validation, thread dispatch)
+    flat     median ms of FlatForest.predict
+    speedup  sklearn / flat
+
+API requests cover 1-168 hours and 1-30 days; the larger sizes show
+where sklearn's compiled tree walk catches up (forecast table builds).
+
+Usage:
+    python -m benchmarks.inference_engine
+    python -m benchmarks.inference_engine --model ml_models/combined.joblib --sizes 1,24,168 --repeat 200
+    python -m benchmarks.inference_engine --model ../ml-models/new
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime
+from typing import Callable, List
+import numpy as np
+from app.core.config import settings
+from app.services.features import forecast_timestamps, build_feature_matrix
+from app.services.model_bundle import MODEL_KINDS, compile_package, compare_packages
+from app.services.model_registry import load_package
+
+UNITS = {
+    'hourly': 'h',
+    'daily': 'D',
+}
+
+def time_call(fn: Callable[[], object], repeat: int) -> float:
+    """Median milliseconds of `repeat` calls after one untimed call"""
+    fn()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+def predict_both(section: dict, X: np.ndarray) -> None:
+    section['regressor'].predict(X)
+    section['classifier'].predict(X)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare sklearn and flat-array forest inference")
+    parser.add_argument("--model", default=settings.MODEL_PATH, help="Combined package or split model directory (default: MODEL_PATH)")
+    parser.add_argument("--sizes", default="1,24,168,720,8760", help="Comma separated rows per call")
+    parser.add_argument("--repeat", type=int, default=50, help="Timed calls per size")
+    args = parser.parse_args()
+    
+    sizes: List[int] = [int(n) for n in args.sizes.split(",")]
+    package, layout = load_package(args.model, mmap=False)
+    if layout == 'bundle':
+        print(f"✗ {args.model} is a model bundle, its forests are already flat; pass the sklearn model")
+        return 1
+    
+    started = time.perf_counter()
+    compiled = compile_package(package)
+    print(f"Compiled forests in {time.perf_counter() - started:.2f}s")
+    
+    results = compare_packages(package, compiled, datetime(datetime.now().year, 1, 1))
+    for result in results:
+        print(f"  {'✓' if result['passed'] else '✗'} {result['kind']}: {result['rows']} rows, "
+              f"max regression error {result['max_error']:.2e}, {result['mismatches']} class mismatches")
+    if not all(result['passed'] for result in results):
+        print("✗ Flat engine predictions differ from sklearn")
+        return 1
+    
+    print(f"\nRegressor + classifier latency in ms (median of {args.repeat})\n")
+    print(f"{'kind':<8} {'rows':>6} {'sklearn':>10} {'flat':>10} {'speedup':>8}")
+    start = datetime(datetime.now().year, 1, 1)
+    for kind in MODEL_KINDS:
+        if kind not in package:
+            continue
+        for rows in sizes:
+            X = build_feature_matrix(forecast_timestamps(start, rows, UNITS[kind]), package[kind]['feature_columns'])
+            sklearn_ms = time_call(lambda: predict_both(package[kind], X), args.repeat)
+            flat_ms = time_call(lambda: predict_both(compiled[kind], X), args.repeat)
+            print(f"{kind:<8} {rows:>6} {sklearn_ms:>10.2f} {flat_ms:>10.2f} {sklearn_ms / flat_ms:>7.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
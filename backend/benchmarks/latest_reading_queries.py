@@ -0,0 +1,164 @@
+"""
+Query-plan benchmark for the latest-reading lookups
+
+Fills a scratch copy of the weather_data table with synthetic readings
+(two million by default), then EXPLAINs and times the queries behind
+/weather-data/last and /weather-data/line-chart, first with only the
+primary key and again after applying the indexes of migration 0001.
+
+Needs a MySQL server reachable with the DB_* settings. The scratch table
+is dropped afterwards unless --keep is given.
+
+Usage:
+    python -m benchmarks.latest_reading_queries
+    python -m benchmarks.latest_reading_queries --rows 5000000 --locations 50 --repeat 50
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import List
+from app.core.database import get_db_connection
+from app.core.migrations import load_migrations
+from app.services.weather_service import LAST_WEATHER_QUERY, LINE_CHART_QUERY
+
+BENCH_TABLE = "weather_data_bench"
+SEED_ROWS = 10000
+READING_INTERVAL_SECONDS = 10
+
+# Same columns as weather_data in weather_app_bd.sql, primary key only
+CREATE_BENCH_TABLE_QUERY = f"""
+    CREATE TABLE {BENCH_TABLE} (
+        id int(10) UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        temp float NOT NULL DEFAULT 0,
+        humidity float NOT NULL DEFAULT 0,
+        isRaining tinyint(1) NOT NULL DEFAULT 0,
+        lightIntensity float NOT NULL DEFAULT 0,
+        windSpeed float NOT NULL DEFAULT 0,
+        airPressure float NOT NULL DEFAULT 0,
+        location varchar(30) NOT NULL DEFAULT 'Gazipur',
+        createAt timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+"""
+INSERT_SEED_QUERY = f"""
+    INSERT INTO {BENCH_TABLE}(temp, humidity, isRaining, lightIntensity, windSpeed, airPressure, location, createAt)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+"""
+# Copies existing rows shifted forward in time, doubling the table
+DOUBLE_ROWS_QUERY = f"""
+    INSERT INTO {BENCH_TABLE}(temp, humidity, isRaining, lightIntensity, windSpeed, airPressure, location, createAt)
+    SELECT temp, humidity, isRaining, lightIntensity, windSpeed, airPressure, location,
+           createAt + INTERVAL %s SECOND
+    FROM {BENCH_TABLE} ORDER BY id LIMIT %s
+"""
+
+def _bench_query(query: str) -> str:
+    return query.replace("FROM weather_data", f"FROM {BENCH_TABLE}")
+
+def _index_statements() -> List[str]:
+    """Statements of migration 0001, pointed at the scratch table"""
+    migration = next(m for m in load_migrations() if m.version == 1)
+    return [s.replace("`weather_data`", f"`{BENCH_TABLE}`") for s in migration.statements]
+
+def fill_table(cursor, conn, rows: int, locations: List[str]) -> None:
+    """Insert `rows` synthetic readings spread over `locations`"""
+    rng = random.Random(42)
+    start = datetime(2020, 1, 1)
+    seed = min(rows, SEED_ROWS)
+    cursor.executemany(INSERT_SEED_QUERY, [
+        (
+            round(rng.uniform(20, 35), 2),
+            round(rng.uniform(40, 100), 2),
+            rng.randint(0, 1),
+            rng.randint(0, 1024),
+            round(rng.uniform(0, 20), 2),
+            round(rng.uniform(990, 1020), 2),
+            rng.choice(locations),
+            start + timedelta(seconds=i * READING_INTERVAL_SECONDS),
+        )
+        for i in range(seed)
+    ])
+    conn.commit()
+    
+    count = seed
+    while count < rows:
+        batch = min(count, rows - count)
+        cursor.execute(DOUBLE_ROWS_QUERY, (count * READING_INTERVAL_SECONDS, batch))
+        conn.commit()
+        count += batch
+        print(f"  {count:,} rows")
+    cursor.execute(f"ANALYZE TABLE {BENCH_TABLE}")
+    cursor.fetchall()
+
+def explain(cursor, query: str, params: tuple) -> dict:
+    """Get the EXPLAIN row of a single-table query"""
+    cursor.execute("EXPLAIN " + query, params)
+    columns = [d[0] for d in cursor.description]
+    row = dict(zip(columns, cursor.fetchone()))
+    return {key: row.get(key) for key in ("type", "key", "rows", "Extra")}
+
+def time_query(cursor, query: str, params: tuple, repeat: int) -> dict:
+    """Run a query `repeat` times and get its latency in milliseconds"""
+    cursor.execute(query, params)
+    cursor.fetchall()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cursor.execute(query, params)
+        cursor.fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(timings[max(0, int(len(timings) * 0.95) - 1)], 3),
+    }
+
+def run_queries(cursor, location: str, limit: int, repeat: int) -> None:
+    queries = {
+        '/weather-data/last': (_bench_query(LAST_WEATHER_QUERY), (location,)),
+        '/weather-data/line-chart': (_bench_query(LINE_CHART_QUERY), (location, limit)),
+    }
+    for name, (query, params) in queries.items():
+        plan = explain(cursor, query, params)
+        timing = time_query(cursor, query, params, repeat)
+        print(f"  {name:<26} median {timing['median_ms']:>9.3f} ms  p95 {timing['p95_ms']:>9.3f} ms")
+        print(f"  {'':<26} plan: type={plan['type']} key={plan['key']} rows={plan['rows']} extra={plan['Extra']}")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the latest-reading queries")
+    parser.add_argument("--rows", type=int, default=2_000_000, help="Synthetic readings to generate")
+    parser.add_argument("--locations", type=int, default=20, help="Number of distinct locations")
+    parser.add_argument("--limit", type=int, default=10, help="Line chart LIMIT")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per query")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch table")
+    args = parser.parse_args()
+    
+    locations = ["Gazipur"] + [f"Station-{i:03d}" for i in range(1, args.locations)]
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+        cursor.execute(CREATE_BENCH_TABLE_QUERY)
+        print(f"Filling {BENCH_TABLE} with {args.rows:,} rows over {len(locations)} locations...")
+        fill_table(cursor, conn, args.rows, locations)
+        
+        print("\nPrimary key only:")
+        run_queries(cursor, "Gazipur", args.limit, args.repeat)
+        
+        started = time.perf_counter()
+        for statement in _index_statements():
+            cursor.execute(statement)
+        cursor.execute(f"ANALYZE TABLE {BENCH_TABLE}")
+        cursor.fetchall()
+        print(f"\nWith migration 0001 indexes (built in {time.perf_counter() - started:.1f}s):")
+        run_queries(cursor, "Gazipur", args.limit, args.repeat)
+    finally:
+        if not args.keep:
+            cursor.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+        cursor.close()
+        conn.close()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,363 @@
+"""
+Load generator: LoRa gateways and mobile clients against a running server
+
+Simulates the traffic of one backend host and ramps it up in stages
+until the server saturates:
+
+    gateways  post a reading to /weather-data/create every --cadence
+              seconds. Readings that fail, time out or are taken while
+              the uplink is down (--outage-rate) stay in the gateway's
+              buffer and are sent back-to-back with the next reading
+              (retry bursts), or as one /weather-data/bulk request with
+              --flush bulk.
+    clients   mobile apps that poll /weather-data/last and /line-chart
+              every --poll-interval seconds and open the hourly and daily
+              forecast on --forecast-share of their polls.
+
+Every stage multiplies both populations by --step and runs for --stage
+seconds; the first cadence of a stage (new gateways and clients starting
+up) is not measured. Per stage it reports requests per second,
+p50/p95/p99 per endpoint, the error rate and how long gateway readings
+took from measurement to acknowledgement (outside outages). The ramp
+stops at the first stage that breaks a limit (--max-p95-ms,
+--max-error-rate, --max-delivery-delay) and names the endpoint that
+broke it; the stage before it is the capacity of the host.
+
+Run the generator on another machine than the server (or pin both to
+separate cores): when its own event loop lags behind (loop lag p99 over
+--max-loop-lag-ms) the stage is reported as generator-bound, not as
+server saturation.
+
+Usage:
+    python -m benchmarks.load_generator --url http://127.0.0.1:8000
+    python -m benchmarks.load_generator --gateways 200 --clients 500 --step 1.5 --stage 120 --output load.json
+    python -m benchmarks.load_generator --outage-rate 0.01 --outage-seconds 120 --flush bulk
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+from typing import Deque, Dict, List, NamedTuple, Optional
+import httpx
+from benchmarks.endpoints.runner import summarize
+
+CREATE_ENDPOINT = "weather-data/create"
+BULK_ENDPOINT = "weather-data/bulk"
+LOOP_LAG_INTERVAL = 0.1
+
+class Reading(NamedTuple):
+    """One gateway measurement waiting to be delivered"""
+    measured: float
+    created: datetime
+    outage: bool
+    payload: dict
+
+class StageRecorder:
+    """Latencies, errors and delivery delays of one stage"""
+    
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.first_error: Dict[str, str] = {}
+        self.delivery_delays: List[float] = []
+        self.retried = 0
+        self.dropped = 0
+        self.loop_lag_ms: List[float] = []
+    
+    def result(self, endpoint: str, latency_ms: Optional[float], error: Optional[str] = None) -> None:
+        if error is None:
+            self.latencies[endpoint].append(latency_ms)
+        else:
+            self.errors[endpoint] += 1
+            self.first_error.setdefault(endpoint, error)
+
+class LoadState:
+    """Stage recorder shared by all simulated devices"""
+    
+    def __init__(self, client: httpx.AsyncClient, args: argparse.Namespace):
+        self.client = client
+        self.args = args
+        self.recorder = StageRecorder()
+        self.stop = asyncio.Event()
+    
+    async def request(self, endpoint: str, method: str, url: str, **kwargs) -> bool:
+        """
+        Send one request and record it
+        
+        A response counts as failed unless it is HTTP 2xx and, for the
+        ingest endpoints, its body status is 2xx too (they report
+        database errors in the body).
+        """
+        recorder = self.recorder
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            recorder.result(endpoint, None, f"{type(e).__name__}: {e}")
+            return False
+        latency_ms = (time.perf_counter() - started) * 1000
+        
+        error = None
+        if response.status_code >= 300:
+            error = f"HTTP {response.status_code}: {response.text[:200]}"
+        elif endpoint in (CREATE_ENDPOINT, BULK_ENDPOINT):
+            body = response.json()
+            if body.get("status", 200) >= 300:
+                error = f"status {body['status']}: {body.get('message')}"
+        recorder.result(endpoint, latency_ms, error)
+        return error is None
+
+def sensor_reading(rng: random.Random, location: str) -> dict:
+    return {
+        "temp": round(rng.uniform(20, 35), 1),
+        "humidity": round(rng.uniform(50, 95), 1),
+        "isRaining": int(rng.random() < 0.2),
+        "lightIntensity": round(rng.uniform(0, 1000)),
+        "windSpeed": round(rng.uniform(0, 8), 1),
+        "pressure": round(rng.uniform(1000, 1020), 1),
+        "location": location,
+    }
+
+async def flush_buffer(state: LoadState, buffer: Deque[Reading]) -> None:
+    """Deliver buffered readings oldest first, stopping at the first failure"""
+    args = state.args
+    # Everything before the newest reading was due earlier: a retry burst
+    newest = buffer[-1] if buffer else None
+    while buffer:
+        if args.flush == "bulk" and len(buffer) > 1:
+            batch = [buffer[i] for i in range(min(len(buffer), args.bulk_size))]
+            ok = await state.request(BULK_ENDPOINT, "POST", "/weather-data/bulk", json=[
+                {**reading.payload, "createAt": reading.created.isoformat(timespec="seconds")} for reading in batch
+            ])
+        else:
+            batch = [buffer[0]]
+            # /create has no location or timestamp: the server stamps the reading
+            payload = {k: v for k, v in batch[0].payload.items() if k != "location"}
+            ok = await state.request(CREATE_ENDPOINT, "POST", "/weather-data/create", json=payload)
+        if not ok:
+            return
+        
+        delivered = time.monotonic()
+        for reading in batch:
+            buffer.popleft()
+            if not reading.outage:
+                state.recorder.delivery_delays.append(delivered - reading.measured)
+            if reading is not newest:
+                state.recorder.retried += 1
+
+async def gateway(state: LoadState, number: int) -> None:
+    """One LoRa gateway: a reading every cadence, buffered while undeliverable"""
+    args = state.args
+    rng = random.Random(number)
+    buffer: Deque[Reading] = deque()
+    location = f"Gateway-{number}"
+    offline_until = 0.0
+    
+    # Gateways are not synchronized
+    await asyncio.sleep(rng.uniform(0, args.cadence))
+    next_tick = time.monotonic()
+    while not state.stop.is_set():
+        now = time.monotonic()
+        # Readings taken while the previous flush was still running
+        while next_tick <= now:
+            if now >= offline_until and rng.random() < args.outage_rate:
+                offline_until = now + args.outage_seconds
+            if len(buffer) == args.gateway_buffer:
+                buffer.popleft()
+                state.recorder.dropped += 1
+            outage = next_tick < offline_until
+            buffer.append(Reading(next_tick, datetime.now() - timedelta(seconds=now - next_tick), outage,
+                                  sensor_reading(rng, location)))
+            next_tick += args.cadence
+        
+        if now >= offline_until:
+            await flush_buffer(state, buffer)
+        await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+
+async def mobile_client(state: LoadState, number: int) -> None:
+    """One app user polling the dashboard and sometimes opening the forecast"""
+    args = state.args
+    rng = random.Random(-number - 1)
+    params = {"location": args.location}
+    
+    await asyncio.sleep(rng.uniform(0, args.poll_interval))
+    while not state.stop.is_set():
+        await state.request("weather-data/last", "GET", "/weather-data/last", params=params)
+        await state.request("weather-data/line-chart", "GET", "/weather-data/line-chart", params={**params, "limit": 10})
+        if rng.random() < args.forecast_share:
+            now = datetime.now()
+            await state.request("ai-prediction/hourly", "POST", "/ai-prediction/hourly", json={
+                "day": now.day, "month": now.month, "year": now.year, "hour": now.hour, "num_hours": 24,
+            })
+            await state.request("ai-prediction/daily", "POST", "/ai-prediction/daily", json={
+                "day": now.day, "month": now.month, "year": now.year, "num_days": 7,
+            })
+        await asyncio.sleep(args.poll_interval * rng.uniform(0.8, 1.2))
+
+async def loop_lag(state: LoadState) -> None:
+    """Measure how late the generator's event loop wakes up"""
+    while not state.stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        state.recorder.loop_lag_ms.append((time.perf_counter() - started - LOOP_LAG_INTERVAL) * 1000)
+
+def offered_rps(gateways: int, clients: int, args: argparse.Namespace) -> float:
+    """Requests per second the populations send when the server keeps up"""
+    polls = clients / args.poll_interval
+    return gateways / args.cadence + polls * (2 + 2 * args.forecast_share)
+
+def evaluate(stage: dict, args: argparse.Namespace) -> List[str]:
+    """Limits broken by one stage, most specific first"""
+    broken = []
+    if stage['loop_lag_p99_ms'] > args.max_loop_lag_ms:
+        broken.append(f"load generator lags {stage['loop_lag_p99_ms']:.0f} ms (generator-bound)")
+    for endpoint, result in stage['endpoints'].items():
+        total = result['requests'] + result['errors']
+        if total and result['errors'] / total > args.max_error_rate:
+            broken.append(f"{endpoint} errors {result['errors'] / total:.1%} > {args.max_error_rate:.1%}"
+                          + (f" ({result['first_error']})" if 'first_error' in result else ""))
+        if result['p95_ms'] > args.max_p95_ms:
+            broken.append(f"{endpoint} p95 {result['p95_ms']:.0f} ms > {args.max_p95_ms:.0f} ms")
+    if stage['delivery_p95_s'] > args.max_delivery_delay:
+        broken.append(f"gateway delivery p95 {stage['delivery_p95_s']:.1f} s > {args.max_delivery_delay:.1f} s")
+    return broken
+
+def stage_report(recorder: StageRecorder, gateways: int, clients: int, seconds: float, args: argparse.Namespace) -> dict:
+    endpoints = {}
+    for endpoint in sorted(set(recorder.latencies) | set(recorder.errors)):
+        endpoints[endpoint] = summarize(recorder.latencies[endpoint], recorder.errors[endpoint], seconds)
+        if endpoint in recorder.first_error:
+            endpoints[endpoint]['first_error'] = recorder.first_error[endpoint]
+    delivery = summarize([d * 1000 for d in recorder.delivery_delays], 0, seconds)
+    lag = summarize(recorder.loop_lag_ms, 0, seconds)
+    return {
+        'gateways': gateways,
+        'clients': clients,
+        'offered_rps': round(offered_rps(gateways, clients, args), 2),
+        'achieved_rps': round(sum(result['throughput_rps'] for result in endpoints.values()), 2),
+        'endpoints': endpoints,
+        'delivery_p95_s': round(delivery['p95_ms'] / 1000, 3) if recorder.delivery_delays else 0.0,
+        'retried_readings': recorder.retried,
+        'dropped_readings': recorder.dropped,
+        'loop_lag_p99_ms': lag['p99_ms'] if recorder.loop_lag_ms else 0.0,
+    }
+
+def print_stage(number: int, stage: dict) -> None:
+    print(f"\nStage {number}: {stage['gateways']} gateways, {stage['clients']} clients, "
+          f"{stage['achieved_rps']:.1f} of {stage['offered_rps']:.1f} req/s, "
+          f"delivery p95 {stage['delivery_p95_s']:.2f} s, {stage['retried_readings']} retried, "
+          f"{stage['dropped_readings']} dropped, loop lag p99 {stage['loop_lag_p99_ms']:.1f} ms")
+    print(f"  {'endpoint':<26} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>6}")
+    for endpoint, result in stage['endpoints'].items():
+        print(f"  {endpoint:<26} {result['throughput_rps']:>8.1f} {result['p50_ms']:>8.1f} "
+              f"{result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['errors']:>6}")
+    for limit in stage['broken']:
+        print(f"  ✗ {limit}")
+    if not stage['broken']:
+        print("  ✓ within limits")
+
+async def ramp(args: argparse.Namespace) -> List[dict]:
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        response = await client.get("/health/ready")
+        if response.status_code != 200:
+            raise RuntimeError(f"{args.url} is not ready: HTTP {response.status_code} {response.text[:200]}")
+        
+        state = LoadState(client, args)
+        tasks = [asyncio.create_task(loop_lag(state))]
+        gateways = clients = 0
+        stages = []
+        try:
+            for number in range(1, args.max_stages + 1):
+                scale = args.step ** (number - 1)
+                target_gateways, target_clients = round(args.gateways * scale), round(args.clients * scale)
+                tasks += [asyncio.create_task(gateway(state, n)) for n in range(gateways, target_gateways)]
+                tasks += [asyncio.create_task(mobile_client(state, n)) for n in range(clients, target_clients)]
+                gateways, clients = target_gateways, target_clients
+                
+                # New devices start within one cadence / poll interval
+                await asyncio.sleep(min(args.settle, args.stage))
+                state.recorder = StageRecorder()
+                measured = max(args.stage - args.settle, 1.0)
+                await asyncio.sleep(measured)
+                stage = stage_report(state.recorder, gateways, clients, measured, args)
+                stage['broken'] = evaluate(stage, args)
+                stages.append(stage)
+                print_stage(number, stage)
+                if stage['broken']:
+                    break
+        finally:
+            state.stop.set()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return stages
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Ramp simulated gateways and mobile clients until the server saturates")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Server base URL (default: http://127.0.0.1:8000)")
+    parser.add_argument("--gateways", type=int, default=50, help="Gateways in the first stage (default: 50)")
+    parser.add_argument("--clients", type=int, default=100, help="Mobile clients in the first stage (default: 100)")
+    parser.add_argument("--step", type=float, default=2.0, help="Population factor between stages (default: 2)")
+    parser.add_argument("--max-stages", type=int, default=8, help="Stages at most (default: 8)")
+    parser.add_argument("--stage", type=float, default=60, help="Seconds per stage (default: 60)")
+    parser.add_argument("--settle", type=float, help="Unmeasured seconds at the start of a stage "
+                                                     "(default: the longer of cadence and poll interval)")
+    parser.add_argument("--cadence", type=float, default=10, help="Seconds between gateway readings (default: 10)")
+    parser.add_argument("--outage-rate", type=float, default=0.0,
+                        help="Chance per reading that a gateway's uplink goes down (default: 0)")
+    parser.add_argument("--outage-seconds", type=float, default=60, help="Length of an uplink outage (default: 60)")
+    parser.add_argument("--gateway-buffer", type=int, default=360, help="Readings a gateway buffers at most (default: 360)")
+    parser.add_argument("--flush", choices=["create", "bulk"], default="create",
+                        help="Send buffered readings one by one to /create or batched to /bulk (default: create)")
+    parser.add_argument("--bulk-size", type=int, default=100, help="Readings per /bulk retry request (default: 100)")
+    parser.add_argument("--poll-interval", type=float, default=30, help="Seconds between client polls (default: 30)")
+    parser.add_argument("--forecast-share", type=float, default=0.2,
+                        help="Share of polls that also load the forecasts (default: 0.2)")
+    parser.add_argument("--location", default="Gazipur", help="Location the clients poll (default: Gazipur)")
+    parser.add_argument("--max-p95-ms", type=float, default=500, help="p95 limit of every endpoint (default: 500)")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Error rate limit per endpoint (default: 0.01)")
+    parser.add_argument("--max-delivery-delay", type=float, help="p95 limit of reading delivery in seconds "
+                                                                 "(default: the cadence)")
+    parser.add_argument("--max-loop-lag-ms", type=float, default=100, help="Generator loop lag limit (default: 100)")
+    parser.add_argument("--timeout", type=float, default=10, help="Request timeout in seconds (default: 10)")
+    parser.add_argument("--max-connections", type=int, default=1000, help="Open connections at most (default: 1000)")
+    parser.add_argument("--output", help="Write the stages as JSON")
+    args = parser.parse_args()
+    if args.settle is None:
+        args.settle = max(args.cadence, args.poll_interval)
+    if args.max_delivery_delay is None:
+        args.max_delivery_delay = args.cadence
+    
+    started = datetime.now()
+    stages = asyncio.run(ramp(args))
+    passed = [stage for stage in stages if not stage['broken']]
+    print()
+    if passed:
+        capacity = passed[-1]
+        print(f"✓ Capacity: {capacity['gateways']} gateways and {capacity['clients']} clients "
+              f"({capacity['achieved_rps']:.1f} req/s)")
+    else:
+        print("✗ The first stage already breaks the limits; start with fewer gateways and clients")
+    if stages and stages[-1]['broken']:
+        print(f"✗ Saturation at {stages[-1]['gateways']} gateways and {stages[-1]['clients']} clients:")
+        for limit in stages[-1]['broken']:
+            print(f"    {limit}")
+    else:
+        print(f"No saturation within {len(stages)} stages; raise --max-stages or --step")
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                'started': started.isoformat(timespec='seconds'),
+                'parameters': vars(args),
+                'stages': stages,
+            }, f, indent=2)
+        print(f"✓ Stages written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,124 @@
+"""
+Per-worker memory benchmark for joblib vs. memory-mapped model loading
+
+Starts 1, 4 and 16 processes (like uvicorn workers) that each load the
+AI model, once unpickled with joblib (combined package or split
+directory) and once from a model bundle mapped with mmap, runs predictions over two years of hours and five years of
+days so every tree page is touched, and reports the memory of every
+worker while all of them are alive:
+    
+    RSS  resident pages, counting shared pages in full for every process
+    PSS  shared pages divided by the number of processes sharing them
+    USS  pages private to the process (what one more worker costs)
+
+Summing PSS over the workers gives the real host memory. Needs Linux
+(/proc/self/smaps_rollup).
+
+Usage:
+    python -m benchmarks.worker_memory
+    python -m benchmarks.worker_memory --model ml_models/combined.joblib --bundle ml_models/combined_bundle --workers 1,2,8
+    python -m benchmarks.worker_memory --model ../ml-models/new
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+from datetime import datetime
+from typing import List
+from app.core.config import settings
+from app.core.memory import SMAPS_ROLLUP, read_process_memory
+from app.services.features import forecast_timestamps, build_feature_matrix
+from app.services.model_bundle import is_model_bundle, load_model_bundle, save_model_bundle
+from app.services.model_registry import load_package
+
+TOUCH_HOURS = 24 * 365 * 2
+TOUCH_DAYS = 365 * 5
+# Predict in request-sized windows so temporary arrays stay small
+TOUCH_WINDOW = 168
+
+def _touch(package: dict) -> None:
+    """Run every forest over many inputs so all of its nodes are read"""
+    start = datetime(datetime.now().year, 1, 1)
+    for kind, count, unit in (("hourly", TOUCH_HOURS, "h"), ("daily", TOUCH_DAYS, "D")):
+        if kind not in package:
+            continue
+        X = build_feature_matrix(forecast_timestamps(start, count, unit), package[kind]["feature_columns"])
+        for offset in range(0, count, TOUCH_WINDOW):
+            package[kind]["regressor"].predict(X[offset:offset + TOUCH_WINDOW])
+            package[kind]["classifier"].predict(X[offset:offset + TOUCH_WINDOW])
+
+def _worker(mode: str, path: str, results, measure, release) -> None:
+    before = read_process_memory()
+    package = load_package(path, mmap=False)[0] if mode == "joblib" else load_model_bundle(path, mmap=True)
+    _touch(package)
+    results.put(("loaded", os.getpid(), None))
+    
+    # Measure only once every worker has mapped the model, so PSS is split
+    # between all of them
+    measure.wait()
+    results.put(("measured", os.getpid(), {'before': before, 'after': read_process_memory()}))
+    release.wait()
+
+def run_workers(mode: str, path: str, count: int) -> List[dict]:
+    """Start `count` workers loading the model and collect their memory"""
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    measure = context.Event()
+    release = context.Event()
+    processes = [
+        context.Process(target=_worker, args=(mode, path, results, measure, release))
+        for _ in range(count)
+    ]
+    for process in processes:
+        process.start()
+    
+    try:
+        for _ in range(count):
+            results.get(timeout=300)
+        measure.set()
+        return [results.get(timeout=60)[2] for _ in range(count)]
+    finally:
+        release.set()
+        for process in processes:
+            process.join(30)
+
+def _mb(kb: float) -> float:
+    return kb / 1024
+
+def print_row(mode: str, count: int, samples: List[dict]) -> None:
+    def avg(key: str, phase: str = 'after') -> float:
+        return sum(s[phase][key] for s in samples) / len(samples)
+    
+    model_uss = sum(s['after']['uss'] - s['before']['uss'] for s in samples) / len(samples)
+    total_pss = sum(s['after']['pss'] for s in samples)
+    print(f"{mode:<8} {count:>7} {_mb(avg('rss')):>10.1f} {_mb(avg('pss')):>10.1f} {_mb(avg('uss')):>10.1f} "
+          f"{_mb(model_uss):>12.1f} {_mb(total_pss):>11.1f}")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare per-worker memory of joblib and mmap model loading")
+    parser.add_argument("--model", default=settings.MODEL_PATH, help="Combined package or split model directory (default: MODEL_PATH)")
+    parser.add_argument("--bundle", help="Model bundle directory (default: exported to a temporary directory)")
+    parser.add_argument("--workers", default="1,4,16", help="Comma separated worker counts")
+    args = parser.parse_args()
+    
+    if not os.path.exists(SMAPS_ROLLUP):
+        print(f"✗ {SMAPS_ROLLUP} is not available, this benchmark needs Linux 4.14 or newer")
+        return 1
+    
+    worker_counts = [int(n) for n in args.workers.split(",")]
+    with tempfile.TemporaryDirectory() as scratch:
+        bundle = args.bundle
+        if not bundle or not is_model_bundle(bundle):
+            bundle = bundle or os.path.join(scratch, "bundle")
+            print(f"Exporting {args.model} to {bundle}...")
+            save_model_bundle(load_package(args.model, mmap=False)[0], bundle)
+        
+        print(f"\nMemory per worker in MB (model USS = private memory added by loading the model)\n")
+        print(f"{'mode':<8} {'workers':>7} {'RSS':>10} {'PSS':>10} {'USS':>10} {'model USS':>12} {'total PSS':>11}")
+        for mode, path in (("joblib", args.model), ("mmap", bundle)):
+            for count in worker_counts:
+                print_row(mode, count, run_workers(mode, path, count))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
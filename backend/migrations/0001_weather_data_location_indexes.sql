@@ -0,0 +1,8 @@
+-- Latest-reading lookups filter by location and order by id or createAt:
+--   SELECT ... FROM weather_data WHERE location=%s ORDER BY id DESC LIMIT n
+-- Without these indexes every dashboard refresh scans the whole table.
+ALTER TABLE `weather_data`
+  ADD INDEX `idx_weather_data_location_id` (`location`, `id`);
+
+ALTER TABLE `weather_data`
+  ADD INDEX `idx_weather_data_location_createAt` (`location`, `createAt`);
@@ -0,0 +1,28 @@
+-- Per-location aggregates of weather_data at minute, hour and day resolution.
+-- Kept up to date by the ingest path (see app/services/rollup_service.py) and
+-- recomputed from raw rows with `python -m scripts.rebuild_rollups`.
+CREATE TABLE IF NOT EXISTS `weather_rollup` (
+  `location` varchar(30) NOT NULL,
+  `resolution` enum('minute','hour','day') NOT NULL,
+  `bucket` datetime NOT NULL,
+  `cnt` int(10) UNSIGNED NOT NULL DEFAULT 0,
+  `temp_sum` double NOT NULL DEFAULT 0,
+  `temp_min` float NOT NULL DEFAULT 0,
+  `temp_max` float NOT NULL DEFAULT 0,
+  `humidity_sum` double NOT NULL DEFAULT 0,
+  `humidity_min` float NOT NULL DEFAULT 0,
+  `humidity_max` float NOT NULL DEFAULT 0,
+  `isRaining_sum` double NOT NULL DEFAULT 0,
+  `isRaining_min` float NOT NULL DEFAULT 0,
+  `isRaining_max` float NOT NULL DEFAULT 0,
+  `lightIntensity_sum` double NOT NULL DEFAULT 0,
+  `lightIntensity_min` float NOT NULL DEFAULT 0,
+  `lightIntensity_max` float NOT NULL DEFAULT 0,
+  `windSpeed_sum` double NOT NULL DEFAULT 0,
+  `windSpeed_min` float NOT NULL DEFAULT 0,
+  `windSpeed_max` float NOT NULL DEFAULT 0,
+  `airPressure_sum` double NOT NULL DEFAULT 0,
+  `airPressure_min` float NOT NULL DEFAULT 0,
+  `airPressure_max` float NOT NULL DEFAULT 0,
+  PRIMARY KEY (`location`, `resolution`, `bucket`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -0,0 +1,6 @@
+"""
+Command-line tools for the Weather Prediction API
+
+Run from the backend/ folder, e.g.:
+    python -m scripts.build_forecast_table --help
+"""
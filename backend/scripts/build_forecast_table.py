@@ -0,0 +1,49 @@
+"""
+Build the precomputed forecast table offline
+
+Evaluates the AI model over a window of dates and writes the results to
+an .npz file. Point FORECAST_TABLE_PATH at the file and set
+FORECAST_TABLE_ENABLED=true so the API serves predictions from it.
+
+Usage:
+    python -m scripts.build_forecast_table --output ml_models/forecast_table.npz
+    python -m scripts.build_forecast_table --start 2025-01-01 --days 730
+"""
+import argparse
+import time
+from datetime import datetime
+from app.core.config import settings
+from app.services import prediction_service
+from app.services.forecast_table import save_forecast_tables
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build the precomputed forecast table")
+    parser.add_argument("--start", default=datetime.now().strftime("%Y-%m-%d"),
+                        help="First day of the window (YYYY-MM-DD, default: today)")
+    parser.add_argument("--days", type=int, default=settings.FORECAST_TABLE_DAYS,
+                        help="Number of days in the window")
+    parser.add_argument("--output", default=settings.FORECAST_TABLE_PATH,
+                        help="Output .npz file (default: FORECAST_TABLE_PATH)")
+    args = parser.parse_args()
+    
+    if not args.output:
+        parser.error("--output is required when FORECAST_TABLE_PATH is not set")
+    
+    # Only load the model here; the table is built explicitly below
+    settings.FORECAST_TABLE_ENABLED = False
+    if not prediction_service.load_ai_model():
+        return 1
+    
+    started = time.perf_counter()
+    start_date = datetime.strptime(args.start, "%Y-%m-%d")
+    tables = prediction_service.build_forecast_tables(start_date, args.days)
+    save_forecast_tables(tables, args.output)
+    
+    elapsed = time.perf_counter() - started
+    for name, table in tables.items():
+        print(f"  {name}: {len(table)} rows from {table.start.isoformat()} ({table.nbytes / 1024:.0f} KB)")
+    print(f"✓ Forecast table written to {args.output} in {elapsed:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,163 @@
+"""
+Compact the AI model within an accuracy budget
+
+Prunes trees and depth and narrows the dtypes of every forest (see
+app/services/model_compaction.py), choosing the trees and depth on the
+older historical_dataset days and checking the result on the most
+recent ones, and writes it as a model bundle. Prints the size on
+disk, load time, prediction latency and error of the original and the
+compacted model.
+
+Usage:
+    python -m scripts.compact_model --output ml_models/combined_compact
+    python -m scripts.compact_model --data historical.csv --max-mae-increase 0.05 --holdout 0.3 --output /srv/models/v4-small
+    python -m scripts.compact_model --trees 30 --max-depth 12 --output /srv/models/v4-small --report compaction.json
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from datetime import datetime
+from typing import Callable
+from app.core.config import settings
+from app.core.database import db_pool
+from app.services.features import forecast_timestamps, build_feature_matrix
+from app.services.model_bundle import MODEL_KINDS, MODEL_ROLES, save_model_bundle, load_model_bundle
+from app.services.model_compaction import compact_package, read_historical_file, fetch_historical_data
+from app.services.model_registry import load_package
+
+# Rows of a typical API request per kind
+REQUEST_ROWS = {
+    'hourly': (24, 'h'),
+    'daily': (7, 'D'),
+}
+
+def disk_size(path: str) -> int:
+    """Bytes of a model file or bundle directory"""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path) for name in names
+    )
+
+def timed(fn: Callable[[], object]) -> float:
+    """Seconds taken by one call"""
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+def request_latency(package: dict, repeat: int = 50) -> dict:
+    """Median ms of regressor + classifier predictions for a typical request per kind"""
+    latency = {}
+    start = datetime(datetime.now().year, 1, 1)
+    for kind in MODEL_KINDS:
+        if kind not in package:
+            continue
+        rows, unit = REQUEST_ROWS[kind]
+        section = package[kind]
+        X = build_feature_matrix(forecast_timestamps(start, rows, unit), section['feature_columns'])
+        latency[kind] = statistics.median(
+            timed(lambda: [section[role].predict(X) for role in MODEL_ROLES]) * 1000
+            for _ in range(repeat)
+        )
+    return latency
+
+def format_metrics(metrics: dict) -> str:
+    if 'mae' in metrics:
+        return ", ".join(f"{target} {value:.3f}" for target, value in metrics['mae'].items())
+    return f"accuracy {metrics['accuracy']:.3f}"
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compact the AI model within an accuracy budget")
+    parser.add_argument("--model", default=settings.MODEL_PATH, help="Model to compact (default: MODEL_PATH)")
+    parser.add_argument("--output", required=True, help="Bundle directory to write")
+    parser.add_argument("--data", help="historical_dataset CSV/NDJSON export (default: read the database)")
+    parser.add_argument("--from-year", type=int, help="Only use historical rows from this year on")
+    parser.add_argument("--holdout", type=float, default=0.25,
+                        help="Fraction of the most recent days the budget is checked on (default: 0.25)")
+    parser.add_argument("--max-mae-increase", type=float, default=0.02,
+                        help="Allowed relative MAE increase per regression target (default: 0.02)")
+    parser.add_argument("--max-accuracy-drop", type=float, default=0.01,
+                        help="Allowed absolute condition accuracy drop (default: 0.01)")
+    parser.add_argument("--trees", type=int, help="Keep exactly this many trees per forest")
+    parser.add_argument("--max-depth", type=int, help="Cut every tree at this depth")
+    parser.add_argument("--keep-float64", action="store_true", help="Do not narrow thresholds and values")
+    parser.add_argument("--report", help="Also write the report as JSON")
+    args = parser.parse_args()
+    
+    try:
+        started = time.perf_counter()
+        package, layout = load_package(args.model, mmap=False)
+        print(f"Loaded {args.model} ({layout}) in {time.perf_counter() - started:.2f}s")
+        
+        if args.data:
+            data = read_historical_file(args.data, args.from_year)
+        else:
+            data = fetch_historical_data(args.from_year)
+        selection, holdout = data.split(args.holdout)
+        split = {
+            "selection": [str(selection.dates[0]), str(selection.dates[-1]), len(selection)],
+            "holdout": [str(holdout.dates[0]), str(holdout.dates[-1]), len(holdout)],
+        }
+        print(f"Selecting on {len(selection):,} days of historical_dataset "
+              f"({selection.dates[0]} to {selection.dates[-1]}), checking the budget on "
+              f"{len(holdout):,} held-out days ({holdout.dates[0]} to {holdout.dates[-1]})")
+        
+        started = time.perf_counter()
+        compacted, forests = compact_package(
+            package, selection, args.max_mae_increase, args.max_accuracy_drop,
+            args.trees, args.max_depth, not args.keep_float64, holdout
+        )
+        print(f"Compacted in {time.perf_counter() - started:.1f}s\n")
+        
+        budget = {
+            "max_mae_increase": args.max_mae_increase,
+            "max_accuracy_drop": args.max_accuracy_drop,
+        }
+        save_model_bundle(compacted, args.output, {
+            "compaction": {"source": os.path.abspath(args.model), "budget": budget, "days": len(data), "split": split},
+        })
+        
+        report = {
+            "budget": budget,
+            "split": split,
+            "forests": forests,
+            "size_bytes": [disk_size(args.model), disk_size(args.output)],
+            "load_seconds": [
+                timed(lambda: load_package(args.model, mmap=False)),
+                timed(lambda: load_model_bundle(args.output, mmap=False)),
+            ],
+            "latency_ms": [request_latency(package), request_latency(load_model_bundle(args.output))],
+        }
+        
+        for name, forest in forests.items():
+            status = "✓" if forest["within_budget"] else "✗"
+            print(f"{status} {name}: {forest['trees'][0]} -> {forest['trees'][1]} trees, "
+                  f"depth {forest['max_depth'][0]} -> {forest['max_depth'][1]}, "
+                  f"{forest['nodes'][0]:,} -> {forest['nodes'][1]:,} nodes, "
+                  f"{forest['nbytes'][0] / 1024 / 1024:.1f} -> {forest['nbytes'][1] / 1024 / 1024:.1f} MB "
+                  f"({forest['threshold_dtype']} thresholds, {forest['value_dtype']} values)")
+            print(f"    before (held out): {format_metrics(forest['baseline'])}")
+            print(f"    after (held out):  {format_metrics(forest['compacted'])}")
+            print(f"    after (selection): {format_metrics(forest['selection']['compacted'])}")
+        
+        original, compact = report["size_bytes"]
+        print(f"\nSize on disk:  {original / 1024 / 1024:.1f} MB -> {compact / 1024 / 1024:.1f} MB")
+        print(f"Load time:     {report['load_seconds'][0]:.2f}s -> {report['load_seconds'][1]:.2f}s")
+        for kind, before in report["latency_ms"][0].items():
+            print(f"Latency {kind + ':':<7}{before:.2f} ms -> {report['latency_ms'][1][kind]:.2f} ms "
+                  f"({REQUEST_ROWS[kind][0]} rows)")
+        print(f"✓ Compacted model bundle written to {args.output}")
+        
+        if args.report:
+            with open(args.report, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print(f"✓ Report written to {args.report}")
+        return 0 if all(forest["within_budget"] for forest in forests.values()) else 1
+    finally:
+        db_pool.close()
+
+if __name__ == "__main__":
+    raise SystemExit(main())
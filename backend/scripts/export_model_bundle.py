@@ -0,0 +1,64 @@
+"""
+Export the AI model as a memory-mapped model bundle
+
+Converts the AI model (combined package or split directory, see
+app/services/model_registry.py) into a bundle directory (see
+app/services/model_bundle.py) and checks that the bundle predicts the
+same as the original forests. Point MODEL_PATH at the directory so every
+worker maps the same files instead of unpickling its own copy.
+
+Usage:
+    python -m scripts.export_model_bundle --output ml_models/combined_bundle
+    python -m scripts.export_model_bundle --model ml_models/combined.joblib --output /srv/models/v4
+    python -m scripts.export_model_bundle --model ../ml-models/new --output /srv/models/v4
+"""
+import argparse
+import os
+import time
+from datetime import datetime
+from app.core.config import settings
+from app.services.model_bundle import save_model_bundle, load_model_bundle, compare_packages
+from app.services.model_registry import load_package
+
+def verify_bundle(package: dict, bundle: dict, start: datetime) -> bool:
+    """Compare bundle predictions with the sklearn forests"""
+    results = compare_packages(package, bundle, start)
+    for result in results:
+        print(f"  {'✓' if result['passed'] else '✗'} {result['kind']}: {result['rows']} rows, "
+              f"max regression error {result['max_error']:.2e}, {result['mismatches']} class mismatches")
+    return all(result["passed"] for result in results)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Export the AI model as a memory-mapped bundle")
+    parser.add_argument("--model", default=settings.MODEL_PATH,
+                        help="Combined package or split model directory (default: MODEL_PATH)")
+    parser.add_argument("--output", required=True, help="Bundle directory to write")
+    parser.add_argument("--no-verify", action="store_true", help="Skip the comparison with sklearn")
+    args = parser.parse_args()
+    
+    started = time.perf_counter()
+    try:
+        package, layout = load_package(args.model, mmap=False)
+    except Exception as e:
+        print(f"✗ Failed to load {args.model}: {e}")
+        return 1
+    print(f"Loaded {args.model} ({layout}) in {time.perf_counter() - started:.2f}s")
+    
+    manifest = save_model_bundle(package, args.output)
+    size = sum(
+        os.path.getsize(os.path.join(args.output, name)) for name in os.listdir(args.output)
+    )
+    for name, meta in manifest["forests"].items():
+        print(f"  {name}: {meta['n_estimators']} trees, {meta['nodes']:,} nodes, depth {meta['max_depth']}")
+    print(f"✓ Model bundle written to {args.output} ({size / 1024 / 1024:.1f} MB)")
+    
+    if args.no_verify:
+        return 0
+    print("Checking bundle predictions against sklearn...")
+    if not verify_bundle(package, load_model_bundle(args.output), datetime(datetime.now().year, 1, 1)):
+        print("✗ Bundle predictions differ from the original model")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,148 @@
+"""
+Report where a worker's memory goes, for sizing worker counts
+
+Offline (default), loads the AI model like a worker and prints the bytes
+of every forest, label encoder and the package metadata, the RSS the load
+added, and what each heavy import costs in a fresh interpreter. With
+--tracemalloc the model load is traced and its top allocators listed.
+
+With --url, prints the report of a running worker from /admin/memory
+instead, including its caches and the tracemalloc snapshots it took
+over time (MEMORY_TRACEMALLOC_FRAMES).
+
+Usage:
+    python -m scripts.memory_report
+    python -m scripts.memory_report --model ml_models/combined_bundle --trees --tracemalloc 5
+    python -m scripts.memory_report --url http://localhost:8000 --token $ADMIN_TOKEN --output memory.json
+"""
+import argparse
+import json
+import tracemalloc
+import urllib.parse
+import urllib.request
+from typing import Optional
+from app.core.config import settings
+from app.core.memory import AllocationTracker, HEAVY_MODULES, measure_imports, read_process_memory
+from app.services.memory_service import model_memory
+from app.services.model_registry import INFERENCE_ENGINES, load_model
+
+def _mb(value: float) -> float:
+    return value / 1024 / 1024
+
+def fetch_report(url: str, token: Optional[str], trees: bool, imports: bool, top: int) -> dict:
+    """Get /admin/memory of a running worker (taking a fresh snapshot)"""
+    query = urllib.parse.urlencode({
+        'trees': str(trees).lower(), 'imports': str(imports).lower(), 'top': top, 'snapshot': 'true',
+    })
+    request = urllib.request.Request(f"{url.rstrip('/')}/admin/memory?{query}", headers={'X-Admin-Token': token or ""})
+    with urllib.request.urlopen(request, timeout=300) as response:
+        return json.load(response)
+
+def build_report(args: argparse.Namespace) -> dict:
+    """Load the model in this process and measure it"""
+    report = {}
+    if not args.skip_imports:
+        report['imports'] = measure_imports(args.modules.split(","))
+    
+    tracker = None
+    if args.tracemalloc:
+        tracker = AllocationTracker(frames=args.tracemalloc, top=args.top)
+        tracemalloc.start(args.tracemalloc)
+        tracker.take_snapshot()
+    
+    before = read_process_memory()
+    model = load_model(args.model, mmap=not args.no_mmap, engine=args.engine)
+    after = read_process_memory()
+    if tracker is not None:
+        tracker.take_snapshot()
+        report['allocations'] = tracker.report()
+        tracemalloc.stop()
+    
+    report['process_kb'] = after
+    report['model_load_kb'] = {key: after[key] - before.get(key, 0) for key in after}
+    report['model'] = model_memory(model, trees=args.trees)
+    return report
+
+def print_report(report: dict) -> None:
+    process = report.get('process_kb') or {}
+    if process:
+        print(f"Process: RSS {process['rss'] / 1024:.1f} MB, PSS {process['pss'] / 1024:.1f} MB, "
+              f"USS {process['uss'] / 1024:.1f} MB")
+    if report.get('model_load_kb'):
+        print(f"Model load added RSS {report['model_load_kb']['rss'] / 1024:.1f} MB, "
+              f"USS {report['model_load_kb']['uss'] / 1024:.1f} MB")
+    
+    model = report.get('model')
+    if model:
+        print(f"\nModel {model['model_id']} ({model['layout']}, {model['engine']}): "
+              f"{_mb(model['bytes']):.1f} MB in memory, {_mb(model['mapped_bytes']):.1f} MB mapped")
+        print(f"  {'component':<24} {'type':<24} {'trees':>6} {'nodes':>10} {'MB':>9} {'mapped MB':>10}")
+        for component in model['components']:
+            print(f"  {component['component']:<24} {component['type']:<24} {component.get('trees', ''):>6} "
+                  f"{component.get('nodes', ''):>10} {_mb(component['bytes']):>9.2f} "
+                  f"{_mb(component['mapped_bytes']):>10.2f}")
+            for number, tree in enumerate(component.get('per_tree', [])):
+                print(f"    tree {number:<4} {tree['nodes']:>8} nodes {tree.get('depth', ''):>4} "
+                      f"{tree['bytes'] / 1024:>10.1f} kB")
+    
+    if report.get('caches'):
+        print("\nCaches:")
+        for name, size in report['caches'].items():
+            print(f"  {name:<24} {_mb(size):>9.2f} MB")
+    
+    if report.get('imports'):
+        print("\nImports (fresh interpreter, in order; each excludes what the ones above imported):")
+        for entry in report['imports']:
+            note = f"  ✗ {entry['error']}" if entry.get('error') else ""
+            print(f"  {entry['module']:<24} {_mb(entry['rss_bytes']):>9.1f} MB {entry['seconds']:>8.3f}s{note}")
+    
+    allocations = report.get('allocations')
+    if allocations and allocations.get('snapshots'):
+        print("\nTraced memory over time:")
+        for snapshot in allocations['snapshots']:
+            print(f"  {snapshot['time']}  {_mb(snapshot['traced_bytes']):>9.1f} MB "
+                  f"(peak {_mb(snapshot['peak_bytes']):.1f} MB)")
+        print("\nTop allocators (last snapshot):")
+        for entry in allocations['snapshots'][-1]['top']:
+            print(f"  {_mb(entry['bytes']):>9.2f} MB {entry['blocks']:>9} blocks  {entry['where']}")
+        if allocations.get('growth'):
+            print("\nGrowth since the first snapshot:")
+            for entry in allocations['growth']:
+                print(f"  {_mb(entry['size_diff']):>+9.2f} MB {entry['blocks_diff']:>+9} blocks  {entry['where']}")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Report the memory of the AI model, caches and heavy imports")
+    parser.add_argument("--model", default=settings.MODEL_PATH, help="Model file or bundle (default: MODEL_PATH)")
+    parser.add_argument("--engine", choices=INFERENCE_ENGINES, default=settings.INFERENCE_ENGINE,
+                        help="Inference engine (default: INFERENCE_ENGINE)")
+    parser.add_argument("--no-mmap", action="store_true", help="Read bundle arrays into memory instead of mapping them")
+    parser.add_argument("--trees", action="store_true", help="List every tree of every forest")
+    parser.add_argument("--modules", default=",".join(HEAVY_MODULES),
+                        help="Comma separated modules to measure, in import order")
+    parser.add_argument("--skip-imports", action="store_true", help="Do not measure the imports")
+    parser.add_argument("--tracemalloc", type=int, default=0, metavar="FRAMES",
+                        help="Trace the model load with this many frames per allocation")
+    parser.add_argument("--top", type=int, default=15, help="Allocators listed (default: 15)")
+    parser.add_argument("--url", help="Report a running worker instead (its /admin/memory)")
+    parser.add_argument("--token", default=settings.ADMIN_TOKEN, help="Admin token for --url (default: ADMIN_TOKEN)")
+    parser.add_argument("--output", help="Also write the report as JSON")
+    args = parser.parse_args()
+    
+    try:
+        if args.url:
+            report = fetch_report(args.url, args.token, args.trees, not args.skip_imports, args.top)
+        else:
+            report = build_report(args)
+    except Exception as e:
+        print(f"✗ Memory report failed: {e}")
+        return 1
+    
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Report written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
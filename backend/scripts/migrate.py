@@ -0,0 +1,43 @@
+"""
+Apply or inspect the schema migrations in backend/migrations
+
+The API applies pending migrations at startup (MIGRATIONS_ENABLED=true);
+this command does the same on demand, e.g. before a deploy.
+
+Usage:
+    python -m scripts.migrate            # apply pending migrations
+    python -m scripts.migrate --status   # list applied/pending migrations
+"""
+import argparse
+from app.core.config import settings
+from app.core.database import db_pool
+from app.core.migrations import apply_migrations, get_migration_status
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Apply the schema migrations")
+    parser.add_argument("--status", action="store_true",
+                        help="Only list the migrations and whether they are applied")
+    parser.add_argument("--dir", default=settings.MIGRATIONS_DIR,
+                        help="Migration directory (default: MIGRATIONS_DIR)")
+    args = parser.parse_args()
+    
+    try:
+        if args.status:
+            for migration in get_migration_status(args.dir):
+                state = "applied" if migration['applied'] else "pending"
+                if migration['modified']:
+                    state += " (file changed since)"
+                print(f"  {migration['version']:04d}_{migration['name']}: {state}")
+            return 0
+        
+        applied = apply_migrations(args.dir)
+        print(f"✓ {len(applied)} migration(s) applied" if applied else "✓ Schema is up to date")
+        return 0
+    except Exception as e:
+        print(f"✗ Migration failed: {e}")
+        return 1
+    finally:
+        db_pool.close()
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,46 @@
+"""
+Recompute the weather_rollup table from the raw weather_data rows
+
+Useful after enabling rollups on an existing database, after editing raw
+rows by hand, or when rollups were disabled while readings came in.
+Pause ingestion for the rebuilt window, otherwise readings written during
+the rebuild may be counted twice or not at all.
+
+Usage:
+    python -m scripts.rebuild_rollups
+    python -m scripts.rebuild_rollups --location Gazipur --from 2025-01-01 --to 2025-02-01
+    python -m scripts.rebuild_rollups --resolution hour --resolution day
+"""
+import argparse
+import time
+from datetime import datetime
+from app.core.database import db_pool
+from app.services.rollup_service import RESOLUTIONS, rebuild_rollups
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild the weather rollups from raw readings")
+    parser.add_argument("--location", help="Only rebuild this location (default: all)")
+    parser.add_argument("--from", dest="start", type=datetime.fromisoformat,
+                        help="First timestamp, e.g. 2025-01-01 or 2025-01-01T06:00 (default: all data)")
+    parser.add_argument("--to", dest="end", type=datetime.fromisoformat,
+                        help="Last timestamp (default: all data)")
+    parser.add_argument("--resolution", action="append", choices=list(RESOLUTIONS),
+                        help="Resolution to rebuild, repeatable (default: all)")
+    args = parser.parse_args()
+    
+    started = time.perf_counter()
+    try:
+        written = rebuild_rollups(args.location, args.start, args.end, args.resolution or tuple(RESOLUTIONS))
+    except Exception as e:
+        print(f"✗ Rollup rebuild failed: {e}")
+        return 1
+    finally:
+        db_pool.close()
+    
+    for resolution, rows in written.items():
+        print(f"  {resolution}: {rows} rows")
+    print(f"✓ Rollups rebuilt in {time.perf_counter() - started:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,194 @@
+"""
+Train the AI model from the database
+
+Reads historical_dataset (daily models) and, with --weather-data, the
+sensor readings in weather_data (hourly models) in chunks, trains the
+random forests on all cores and writes the combined package described
+in MODEL_GUIDE.md (see app/services/model_training.py). Kinds without
+training data are taken over from --base.
+
+--incremental only reads the rows added since the run that produced
+--base and adds --add-trees trees fitted on them to each forest. Run a
+full training now and then: the existing trees never see the new rows.
+The newest --holdout share of the new rows is not fitted on; if the
+extended forests score worse on it than the previous ones (beyond
+--max-mae-increase / --max-accuracy-drop), nothing is written.
+
+The package is written to a temporary file and renamed, so a model
+watcher (MODEL_WATCH_ENABLED) never loads a half-written file.
+
+Usage:
+    python -m scripts.train_model --output ml_models/combined.joblib
+    python -m scripts.train_model --weather-data --location Gazipur --trees 200 --output ml_models/combined.joblib
+    python -m scripts.train_model --incremental --output ml_models/combined.joblib
+"""
+import argparse
+import os
+import time
+from datetime import datetime
+import joblib
+from app.core.database import db_pool
+from app.services.model_compaction import within_budget
+from app.services.model_registry import load_package, smoke_test
+from app.services.model_training import (
+    read_daily_data,
+    read_hourly_data,
+    train_section,
+    extend_section,
+    evaluate_section,
+    build_package,
+    training_watermark
+)
+
+def write_package(package: dict, path: str) -> None:
+    """Write a package so readers see either the old or the new file"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temporary = os.path.join(directory, f".{os.path.basename(path)}.tmp")
+    joblib.dump(package, temporary)
+    os.replace(temporary, path)
+
+def format_scores(scores: dict) -> str:
+    mae = ", ".join(f"{target} {value:.3f}" for target, value in scores['regressor']['mae'].items())
+    return f"{mae}, accuracy {scores['classifier']['accuracy']:.3f}"
+
+def extend_checked(base: dict, kind: str, data, args: argparse.Namespace) -> tuple:
+    """
+    Add trees to a base section and check them on the newest rows
+    
+    The trees are first fitted on the older rows and scored on the newest
+    ones. If they pass, they are replaced by trees fitted on all rows, so
+    no row below the new watermark is left out of the model.
+    
+    Returns:
+        tuple: ((section, label encoder), whether the extended forests are no worse)
+    """
+    encoder = base[f'label_encoder_{kind}']
+    if args.holdout <= 0:
+        return (extend_section(base[kind], encoder, data, args.add_trees), encoder), True
+    
+    fit, check = data.split(args.holdout)
+    # The forests are extended in place, score the previous ones first
+    before = evaluate_section(base[kind], encoder, check)
+    counts = {role: len(base[kind][role].estimators_) for role in ('regressor', 'classifier')}
+    section = extend_section(base[kind], encoder, fit, args.add_trees)
+    after = evaluate_section(section, encoder, check)
+    passed = all(
+        within_budget(after[role], before[role], args.max_mae_increase, args.max_accuracy_drop)
+        for role in before
+    )
+    print(f"  {kind}: checked on the newest {len(check):,} rows")
+    print(f"    previous: {format_scores(before)}")
+    print(f"    extended: {format_scores(after)}")
+    if passed:
+        for role, count in counts.items():
+            forest = section[role]
+            forest.estimators_ = forest.estimators_[:count]
+            forest.set_params(n_estimators=count)
+        section = extend_section(section, encoder, data, args.add_trees)
+        print(f"    refitted the added trees on all {len(data):,} rows")
+    return (section, encoder), passed
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Train the AI model from historical_dataset and weather_data")
+    parser.add_argument("--output", required=True, help="Joblib file to write the combined package to")
+    parser.add_argument("--base", help="Previous package: kept kinds and the incremental starting point "
+                                       "(default with --incremental: --output)")
+    parser.add_argument("--incremental", action="store_true", help="Add trees fitted on the rows added since --base")
+    parser.add_argument("--weather-data", action="store_true", help="Train the hourly models from weather_data")
+    parser.add_argument("--location", help="Only use weather_data readings of this location")
+    parser.add_argument("--from-year", type=int, help="Skip historical_dataset rows before this year")
+    parser.add_argument("--trees", type=int, default=100, help="Trees per forest in a full training (default: 100)")
+    parser.add_argument("--add-trees", type=int, default=10, help="Trees added per forest by --incremental (default: 10)")
+    parser.add_argument("--holdout", type=float, default=0.2,
+                        help="Share of the newest rows --incremental checks the new trees on (default: 0.2, 0 skips)")
+    parser.add_argument("--max-mae-increase", type=float, default=0.0,
+                        help="Allowed relative MAE increase per target on those rows (default: 0)")
+    parser.add_argument("--max-accuracy-drop", type=float, default=0.0,
+                        help="Allowed absolute condition accuracy drop on those rows (default: 0)")
+    parser.add_argument("--min-rows", type=int, default=30,
+                        help="Fewest new rows worth adding trees for (default: 30)")
+    parser.add_argument("--max-depth", type=int, help="Depth limit of new trees")
+    parser.add_argument("--seed", type=int, default=42, help="Random state (default: 42)")
+    parser.add_argument("--chunk-rows", type=int, default=5000, help="Rows fetched per chunk (default: 5000)")
+    parser.add_argument("--version", help="Model version (default: the base version or 4.0)")
+    args = parser.parse_args()
+    
+    base_path = args.base or (args.output if args.incremental else None)
+    try:
+        base = None
+        if base_path:
+            base, layout = load_package(base_path, mmap=False)
+            print(f"Loaded base model {base_path} ({layout})")
+        
+        previous = training_watermark(base) if base is not None else {}
+        watermark = previous if args.incremental else {}
+        if args.incremental and watermark.get('historical_dataset_id') is None:
+            print("✗ The base model has no training watermark; run a full training first")
+            return 1
+        
+        started = time.perf_counter()
+        datasets = {'daily': read_daily_data(watermark.get('historical_dataset_id') or 0, args.from_year, args.chunk_rows)}
+        print(f"Read {len(datasets['daily']):,} days from historical_dataset")
+        if args.weather_data:
+            since = watermark.get('weather_data_until')
+            datasets['hourly'] = read_hourly_data(
+                datetime.fromisoformat(since) if since else None, location=args.location, chunk_rows=args.chunk_rows
+            )
+            print(f"Read {len(datasets['hourly']):,} hours from weather_data")
+        print(f"Read training data in {time.perf_counter() - started:.1f}s")
+        
+        sections, rows, trees, worse = {}, {}, {}, []
+        for kind, data in datasets.items():
+            if len(data) < max(args.min_rows, 1):
+                print(f"  {kind}: {len(data)} new rows, keeping the current models")
+                continue
+            
+            started = time.perf_counter()
+            if args.incremental and base is not None and kind in base:
+                sections[kind], passed = extend_checked(base, kind, data, args)
+                if not passed:
+                    worse.append(kind)
+            else:
+                sections[kind] = train_section(kind, data, args.trees, args.max_depth, args.seed)
+            rows[kind] = len(data)
+            trees[kind] = len(sections[kind][0]['regressor'].estimators_)
+            print(f"  {kind}: trained on {len(data):,} rows in {time.perf_counter() - started:.1f}s "
+                  f"({trees[kind]} trees per forest)")
+        
+        if not sections and args.incremental:
+            print(f"✓ No new training data, {args.output} is unchanged")
+            return 0
+        if worse:
+            print(f"✗ The added {', '.join(worse)} trees make the model worse on the newest rows, "
+                  f"{args.output} is unchanged; run a full training")
+            return 1
+        
+        # Rows of a kind that was not trained are read again by the next run
+        package = build_package(sections, base, {
+            'mode': 'incremental' if args.incremental else 'full',
+            'trained_date': datetime.now().isoformat(timespec='seconds'),
+            'rows': rows,
+            'trees': trees,
+            'historical_dataset_id': (
+                datasets['daily'].watermark if 'daily' in sections else previous.get('historical_dataset_id')
+            ),
+            'weather_data_until': (
+                datasets['hourly'].watermark.isoformat(sep=' ') if 'hourly' in sections
+                else previous.get('weather_data_until')
+            ),
+        }, args.version)
+        cold_ms = smoke_test(package)
+        
+        write_package(package, args.output)
+        print(f"✓ Model {package['version']}@{package['trained_date']} written to {args.output} "
+              f"({os.path.getsize(args.output) / 1024 / 1024:.1f} MB, kinds: {', '.join(cold_ms)})")
+        return 0
+    except ValueError as e:
+        print(f"✗ Training failed: {e}")
+        return 1
+    finally:
+        db_pool.close()
+
+if __name__ == "__main__":
+    raise SystemExit(main())
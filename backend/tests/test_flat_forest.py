@@ -0,0 +1,128 @@
+"""
+FlatForest must predict exactly like the sklearn forest it was compiled from
+"""
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from app.services import model_bundle
+from app.services.model_bundle import compile_forest
+
+# Rows per call: one hour, a day, a week and a long range
+ROW_COUNTS = (1, 24, 168, 5000)
+N_FEATURES = 6
+
+def _inputs(rows: int, seed: int = 1) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(rows, N_FEATURES))
+
+def _training_data(rows: int = 1500):
+    X = _inputs(rows, seed=0)
+    # Deep on one side of feature 0 and shallow on the other, so trees
+    # have leaves at very different depths
+    y = np.where(X[:, 0] < 0, 1.0, X[:, 1] * X[:, 2] + np.sin(3 * X[:, 3]))
+    return X, y
+
+@pytest.fixture(scope="module")
+def regressor():
+    X, y = _training_data()
+    return RandomForestRegressor(n_estimators=12, random_state=0).fit(X, y)
+
+@pytest.fixture(scope="module")
+def multi_output_regressor():
+    X, y = _training_data()
+    Y = np.column_stack([y, X[:, 4] - X[:, 5], np.abs(X[:, 0])])
+    return RandomForestRegressor(n_estimators=8, max_depth=10, random_state=0).fit(X, Y)
+
+@pytest.fixture(scope="module")
+def classifier():
+    X, y = _training_data()
+    labels = np.array(["Clear", "Cloudy", "Rain"])[np.digitize(y, [0.0, 1.0])]
+    return RandomForestClassifier(n_estimators=12, min_samples_leaf=2, random_state=0).fit(X, labels)
+
+@pytest.mark.parametrize("rows", ROW_COUNTS)
+def test_regressor_matches_sklearn(regressor, rows):
+    X = _inputs(rows)
+    predicted = compile_forest(regressor).predict(X)
+    assert predicted.shape == (rows,)
+    np.testing.assert_allclose(predicted, regressor.predict(X), rtol=1e-12, atol=1e-12)
+
+@pytest.mark.parametrize("rows", ROW_COUNTS)
+def test_multi_output_regressor_matches_sklearn(multi_output_regressor, rows):
+    X = _inputs(rows)
+    predicted = compile_forest(multi_output_regressor).predict(X)
+    assert predicted.shape == (rows, 3)
+    np.testing.assert_allclose(predicted, multi_output_regressor.predict(X), rtol=1e-12, atol=1e-12)
+
+@pytest.mark.parametrize("rows", ROW_COUNTS)
+def test_classifier_matches_sklearn(classifier, rows):
+    X = _inputs(rows)
+    flat = compile_forest(classifier)
+    np.testing.assert_allclose(flat.predict_proba(X), classifier.predict_proba(X), rtol=1e-12, atol=1e-12)
+    np.testing.assert_array_equal(flat.predict(X), classifier.predict(X))
+
+def test_regressor_has_no_predict_proba(regressor):
+    with pytest.raises(AttributeError):
+        compile_forest(regressor).predict_proba(_inputs(1))
+
+def test_classifier_ties_pick_the_first_class():
+    # Two trees without bootstrap on balanced labels: every row gets
+    # probability 0.5 for both classes
+    X = np.zeros((4, N_FEATURES))
+    forest = RandomForestClassifier(n_estimators=2, bootstrap=False, random_state=0)
+    forest.fit(X, ["Rain", "Clear", "Rain", "Clear"])
+    flat = compile_forest(forest)
+    rows = _inputs(24)
+    np.testing.assert_array_equal(flat.predict_proba(rows), np.full((24, 2), 0.5))
+    np.testing.assert_array_equal(flat.predict(rows), forest.predict(rows))
+    assert set(flat.predict(rows)) == {"Clear"}
+
+def test_classifier_ties_between_trees_match_sklearn():
+    # Bootstrap samples of two rows give trees voting for one class each,
+    # and some rows end up exactly between them
+    X = np.array([[0.0] * N_FEATURES, [1.0] * N_FEATURES])
+    forest = RandomForestClassifier(n_estimators=4, random_state=3).fit(X, ["b", "a"])
+    rows = np.random.default_rng(2).uniform(-1, 2, size=(500, N_FEATURES))
+    flat = compile_forest(forest)
+    assert np.any(forest.predict_proba(rows)[:, 0] == 0.5)
+    np.testing.assert_array_equal(flat.predict(rows), forest.predict(rows))
+
+def test_depth_zero_forest():
+    # Constant inputs: every tree is a single leaf
+    X = np.ones((50, N_FEATURES))
+    y = np.arange(50, dtype=float)
+    forest = RandomForestRegressor(n_estimators=5, random_state=0).fit(X, y)
+    flat = compile_forest(forest)
+    assert flat.max_depth == 0
+    for rows in ROW_COUNTS:
+        X_test = _inputs(rows)
+        np.testing.assert_allclose(flat.predict(X_test), forest.predict(X_test), rtol=1e-12)
+        assert flat.apply(X_test).shape == (5, rows)
+
+def test_mixed_depth_zero_and_deeper_trees():
+    # Bootstrap samples repeating one of the two rows give single-leaf trees
+    X = np.array([[0.0] * N_FEATURES, [1.0] * N_FEATURES])
+    forest = RandomForestRegressor(n_estimators=20, random_state=0).fit(X, [0.0, 1.0])
+    depths = {estimator.tree_.max_depth for estimator in forest.estimators_}
+    assert depths == {0, 1}
+    rows = np.random.default_rng(0).uniform(-1, 2, size=(168, N_FEATURES))
+    np.testing.assert_allclose(compile_forest(forest).predict(rows), forest.predict(rows), rtol=1e-12)
+
+@pytest.mark.parametrize("compact_every", [1, 2, 3, 4, 1000])
+@pytest.mark.parametrize("rows", ROW_COUNTS)
+def test_apply_matches_sklearn_leaves(monkeypatch, regressor, compact_every, rows):
+    # 1000 never drops finished pairs, 1 drops them after every level
+    monkeypatch.setattr(model_bundle, "COMPACT_EVERY", compact_every)
+    flat = compile_forest(regressor)
+    X = _inputs(rows)
+    expected = regressor.apply(X).T + flat.roots[:, None]
+    np.testing.assert_array_equal(flat.apply(X), expected)
+
+@pytest.mark.parametrize("compact_every", [1, 2, 3])
+def test_apply_stops_when_every_pair_reached_a_leaf(monkeypatch, regressor, compact_every):
+    # Rows on the shallow side of feature 0 finish long before max_depth
+    monkeypatch.setattr(model_bundle, "COMPACT_EVERY", compact_every)
+    flat = compile_forest(regressor)
+    X = _inputs(168)
+    X[:, 0] = -5.0
+    assert max(estimator.tree_.max_depth for estimator in regressor.estimators_) > 2 * compact_every
+    np.testing.assert_array_equal(flat.apply(X), regressor.apply(X).T + flat.roots[:, None])
+    np.testing.assert_allclose(flat.predict(X), regressor.predict(X), rtol=1e-12)